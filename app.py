@@ -1,30 +1,67 @@
 # app.py
-from flask import Flask, render_template, request, jsonify, send_file
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# In gevent mode sockets must be patched before anything else imports them, so
+# blocking calls to scrapers, LLM APIs and MongoDB yield instead of pinning a thread
+SERVER_MODE = os.getenv('SERVER_MODE', 'sync').lower()
+if SERVER_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context, g
 from flask_cors import CORS
 from openai import OpenAI
-import os
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from html_parsing import parse_duckduckgo_results, parse_biorxiv_results, extract_paper_abstract
+import pdf_extraction
 import arxiv
 import json
+import re
 import logging
-from urllib.parse import quote_plus, urljoin
+from urllib.parse import urljoin, urlparse, urlunparse
 from datetime import datetime, timedelta
 from io import BytesIO
 from time import sleep
 from functools import wraps
+from contextlib import contextmanager
 import time
-from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import DuplicateKeyError, BulkWriteError
 from bson import ObjectId, json_util
 import certifi
 from anthropic import Anthropic
 from enum import Enum
-from collections import defaultdict
+from collections import defaultdict, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from werkzeug.utils import secure_filename
 from PyPDF2 import PdfReader
 import docx
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 import tempfile
+import math
+import hashlib
+import threading
+import queue
+from multiprocessing import shared_memory
+import bisect
+import base64
+import contextvars
+import random
+try:
+    import fcntl
+except ImportError:
+    # Windows: lock the embedding index with msvcrt instead
+    fcntl = None
+    import msvcrt
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -35,6 +72,122 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['ALLOWED_EXTENSIONS'] = {'pdf', 'doc', 'docx'}
 
+# Configure text extraction
+app.config['EXTRACT_MAX_PAGES'] = 300
+app.config['EXTRACT_MAX_CHARS'] = 500_000
+app.config['EXTRACT_WORKERS'] = os.cpu_count() or 2
+app.config['EXTRACT_BATCH_PAGES'] = 16  # pages handed to a worker at a time
+app.config['EXTRACT_INLINE_BYTES'] = 2 * 1024 * 1024  # smaller PDFs are extracted in-process
+
+# Configure folder result pagination
+app.config['FOLDER_PAGE_SIZE'] = 50
+app.config['FOLDER_MAX_PAGE_SIZE'] = 200
+app.config['SUMMARY_PREVIEW_CHARS'] = 400
+app.config['BULK_MAX_ITEMS'] = 1000
+
+# Configure saved library search
+app.config['SEARCH_CONTENT_CHARS'] = 20_000  # extracted upload text kept for indexing
+app.config['LIBRARY_SEARCH_PAGE_SIZE'] = 20
+
+# Configure the local embedding index for similar-item search
+app.config['EMBEDDING_FOLDER'] = 'embeddings'
+app.config['EMBEDDING_DIM'] = 512
+app.config['EMBEDDING_LSH_TABLES'] = 8
+app.config['EMBEDDING_LSH_BITS'] = 12
+
+# Configure folder chat context retrieval
+app.config['CHAT_CONTEXT_TOKENS'] = 3000
+app.config['CHAT_CONTEXT_CHUNK_WORDS'] = 200
+app.config['CHAT_CONTEXT_OVERLAP_WORDS'] = 40
+
+# Configure HTML scraping: 'targeted' parses only the result elements, 'full' the whole page
+app.config['HTML_PARSE_MODE'] = os.getenv('HTML_PARSE_MODE', 'targeted')
+
+# Configure LLM providers
+app.config['ANTHROPIC_MODEL'] = os.getenv('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229')
+app.config['OPENAI_MODEL'] = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+app.config['LLM_PROVIDER_ORDER'] = ['anthropic', 'openai']  # preferred first
+app.config['LLM_TIMEOUTS'] = {'anthropic': 60.0, 'openai': 30.0}  # seconds per request
+app.config['LLM_MAX_RETRIES'] = 1  # SDK-level retries; fallback and hedging cover the rest
+app.config['LLM_CONCURRENCY'] = {'anthropic': 8, 'openai': 8}
+app.config['LLM_QUEUE_TIMEOUT'] = 10.0  # seconds to wait for a slot when every provider is busy
+app.config['LLM_HEDGE_ENABLED'] = True
+app.config['LLM_HEDGE_MIN_SAMPLES'] = 20  # latency samples needed before hedging at p95
+app.config['LLM_HEDGE_MIN_DELAY'] = 1.0
+app.config['LLM_LATENCY_SAMPLES'] = 200
+app.config['LLM_ERROR_DECAY'] = 0.1  # weight of each outcome in the moving error rate
+app.config['LLM_SWITCH_RATIO'] = 1.5  # how much faster another provider must be to lead
+
+# Configure chat history windowing
+app.config['CHAT_HISTORY_MESSAGES'] = 12
+app.config['CHAT_HISTORY_TOKENS'] = 1500
+app.config['CHAT_SUMMARY_KEEP'] = 6
+app.config['CHAT_HISTORY_PAGE_SIZE'] = 50
+app.config['CHAT_HISTORY_MAX_PAGE_SIZE'] = 200
+
+# Configure rate limiting
+app.config['RATE_LIMIT_MAX_WAIT'] = 10  # seconds a call may queue for a token
+
+# Configure request tracing
+app.config['TRACE_EXPORT_PATH'] = os.getenv('TRACE_EXPORT_PATH')  # JSON lines; unset disables export
+app.config['TRACE_SAMPLE_RATE'] = float(os.getenv('TRACE_SAMPLE_RATE', '0.01'))
+app.config['TRACE_WINDOW'] = 1024  # recent durations kept per series for quantiles
+
+# Configure /metrics; scrapes read a snapshot refreshed in the background
+app.config['METRICS_REFRESH_INTERVAL'] = int(os.getenv('METRICS_REFRESH_INTERVAL', '60'))  # seconds
+
+# Configure federated search settings
+app.config['SEARCH_DEADLINE'] = 8.0  # seconds to wait for each engine
+app.config['SEARCH_MAX_WORKERS'] = 16
+app.config['MAX_RESULTS_PER_SEARCH'] = 5  # results per engine per page
+app.config['SEARCH_MAX_PAGE_SIZE'] = 25
+app.config['SEARCH_MAX_DEPTH'] = 100  # deepest result offset reachable by paging
+app.config['SEARCH_PREFETCH'] = True  # warm the cache with the next page in the background
+app.config['SEARCH_PREFETCH_WORKERS'] = 4
+app.config['BIORXIV_PAGE_SIZE'] = 10
+
+# Configure per-engine circuit breakers and adaptive concurrency
+app.config['BREAKER_FAILURE_THRESHOLD'] = 5  # consecutive failures before opening
+app.config['BREAKER_RESET_TIMEOUT'] = 30  # seconds before probing an open breaker
+app.config['ENGINE_CONCURRENCY'] = {'initial': 4, 'min': 1, 'max': 16}
+app.config['ENGINE_LATENCY_TARGET'] = 3.0  # seconds; slower calls shrink the limit
+
+# Configure search result cache (TTLs in seconds)
+app.config['SEARCH_CACHE_TTLS'] = {
+    'duckduckgo': 10 * 60,
+    'arxiv': 60 * 60,
+    'biorxiv': 60 * 60,
+    'semantic_scholar': 30 * 60
+}
+app.config['SEARCH_CACHE_EMPTY_TTL'] = 2 * 60  # queries with no matches are re-checked sooner
+app.config['SEARCH_CACHE_MAX_BYTES'] = 32 * 1024 * 1024
+
+# Configure outbound HTTP connection pooling
+app.config['HTTP_POOL_CONNECTIONS'] = 10  # hosts kept per session
+app.config['HTTP_POOL_MAXSIZE'] = 20  # keep-alive connections per host
+app.config['HTTP_CONNECT_TIMEOUT'] = 3.05
+app.config['HTTP_READ_TIMEOUT'] = 10
+app.config['HTTP_RETRIES'] = 2
+app.config['HTTP_RETRY_BACKOFF'] = 0.5
+
+# Configure PDF proxy
+app.config['PDF_PROXY_MAX_BYTES'] = 100 * 1024 * 1024
+app.config['PDF_PROXY_TIMEOUT'] = 120  # total seconds per download
+app.config['PDF_PROXY_CHUNK_SIZE'] = 64 * 1024
+app.config['PDF_CACHE_ENABLED'] = True
+app.config['PDF_CACHE_FOLDER'] = 'pdf_cache'
+app.config['PDF_CACHE_MAX_BYTES'] = 1024 * 1024 * 1024  # least recently served PDFs are evicted past this
+
+# Configure background summary jobs
+app.config['SUMMARY_JOB_WORKERS'] = 4
+app.config['SUMMARY_JOB_MAX_ATTEMPTS'] = 3
+app.config['SUMMARY_JOB_BACKOFF'] = 5  # seconds, doubled on each retry
+app.config['SUMMARY_JOB_LEASE'] = 10 * 60  # seconds before a running job is retried
+
+# Configure paper summary cache; bump the version prefix whenever the summary prompt changes
+app.config['SUMMARY_CACHE_TTL'] = 30 * 24 * 60 * 60
+app.config['SUMMARY_PROMPT_VERSION'] = f"v2:{app.config['ANTHROPIC_MODEL']}"
+
 # Set up logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -46,42 +199,385 @@ class AIProvider(str, Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
 
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = ('trace_id', 'span_id', 'parent', 'kind', 'name', 'attributes',
+                 'started_at', 'duration', 'outcome', 'sampled', 'children')
+
+    def __init__(self, kind, name, parent, sampled, attributes=None):
+        self.trace_id = parent.trace_id if parent else os.urandom(8).hex()
+        self.span_id = os.urandom(4).hex()
+        self.parent = parent
+        self.kind = kind
+        self.name = name
+        self.attributes = attributes or {}
+        self.started_at = time.time()
+        self.duration = None
+        self.outcome = 'ok'
+        self.sampled = sampled
+        self.children = []
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'kind': self.kind,
+            'name': self.name,
+            'start': self.started_at,
+            'duration_ms': round(self.duration * 1000, 3) if self.duration is not None else None,
+            'outcome': self.outcome,
+            'attributes': self.attributes,
+            'children': [child.to_dict() for child in list(self.children)]
+        }
+
+class Tracer:
+    """In-process request tracing with latency histograms.
+
+    Spans nest through a context variable, so the Mongo, search, HTTP and LLM
+    calls made while serving a request become children of its route span.
+    Work handed to executors keeps its parent when submitted through
+    ``contextvars.copy_context().run``. Every finished span feeds a histogram
+    and a window of recent durations per (kind, name), exported in Prometheus
+    text format with p50/p95/p99. When ``export_path`` is set, a sampled
+    fraction of traces is appended there as JSON lines by a background writer.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, sample_rate, export_path, window):
+        self.sample_rate = sample_rate
+        self.export_path = export_path
+        self.current = contextvars.ContextVar('current_span', default=None)
+        self.series = defaultdict(lambda: {
+            'buckets': [0] * (len(self.BUCKETS) + 1),
+            'count': 0,
+            'sum': 0.0,
+            'errors': 0,
+            'bytes': 0,
+            'recent': deque(maxlen=window)
+        })
+        self.lock = threading.Lock()
+        self.exports = None
+        if export_path:
+            self.exports = queue.Queue(maxsize=1000)
+            threading.Thread(target=self._write_exports, name='trace-export', daemon=True).start()
+
+    def start(self, kind, name, **attributes):
+        """Open a span as the current one; returns ``(span, token)`` for ``end``."""
+        parent = self.current.get()
+        sampled = parent.sampled if parent else (self.exports is not None and random.random() < self.sample_rate)
+        span = Span(kind, name, parent, sampled, attributes)
+        return span, self.current.set(span)
+
+    def end(self, span, token, duration):
+        try:
+            self.current.reset(token)
+        except ValueError:
+            # Ended from a different context, e.g. after a streamed response
+            self.current.set(span.parent)
+        self.finish(span, duration)
+
+    @contextmanager
+    def span(self, kind, name, **attributes):
+        span, token = self.start(kind, name, **attributes)
+        started = time.monotonic()
+        try:
+            yield span
+        except Exception:
+            span.outcome = 'error'
+            raise
+        finally:
+            self.end(span, token, time.monotonic() - started)
+
+    def record(self, kind, name, duration, outcome='ok', **attributes):
+        """Record an already-timed operation as a child of the current span."""
+        parent = self.current.get()
+        span = Span(kind, name, parent, parent.sampled if parent else False, attributes)
+        span.outcome = outcome
+        self.finish(span, duration)
+
+    def finish(self, span, duration):
+        span.duration = duration
+        with self.lock:
+            series = self.series[(span.kind, span.name)]
+            series['buckets'][bisect.bisect_left(self.BUCKETS, duration)] += 1
+            series['count'] += 1
+            series['sum'] += duration
+            series['errors'] += int(span.outcome != 'ok')
+            series['bytes'] += span.attributes.get('bytes') or 0
+            series['recent'].append(duration)
+
+        if not span.sampled:
+            return
+        if span.parent is not None:
+            span.parent.children.append(span)
+            return
+        try:
+            self.exports.put_nowait(json.dumps(span.to_dict(), default=str))
+        except queue.Full:
+            pass
+
+    def _write_exports(self):
+        while True:
+            lines = [self.exports.get()]
+            while not self.exports.empty() and len(lines) < 100:
+                lines.append(self.exports.get_nowait())
+            try:
+                with open(self.export_path, 'a') as export_file:
+                    export_file.write('\n'.join(lines) + '\n')
+            except OSError as e:
+                logger.error(f"Trace export failed: {str(e)}")
+
+    def totals(self, kind, names):
+        """Combined count, errors and recent latency quantiles over several series."""
+        with self.lock:
+            series = [self.series[(kind, name)] for name in names if (kind, name) in self.series]
+            recent = sorted(duration for entry in series for duration in entry['recent'])
+            totals = {
+                'count': sum(entry['count'] for entry in series),
+                'errors': sum(entry['errors'] for entry in series)
+            }
+        for fraction in self.QUANTILES:
+            value = recent[min(len(recent) - 1, int(fraction * len(recent)))] if recent else 0.0
+            totals[f"p{int(fraction * 100)}_ms"] = round(value * 1000, 1)
+        return totals
+
+    @staticmethod
+    def _labels(**labels):
+        escaped = (
+            (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in labels.items()
+        )
+        return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+    def prometheus(self):
+        """Render span histograms, recent quantiles, errors and bytes in Prometheus text format."""
+        with self.lock:
+            snapshot = {
+                key: {**series, 'buckets': list(series['buckets']), 'recent': sorted(series['recent'])}
+                for key, series in self.series.items()
+            }
+
+        histogram = [
+            '# HELP research_span_duration_seconds Duration of traced operations.',
+            '# TYPE research_span_duration_seconds histogram'
+        ]
+        quantiles = [
+            '# HELP research_span_latency_seconds Latency quantiles over recent traced operations.',
+            '# TYPE research_span_latency_seconds gauge'
+        ]
+        errors = [
+            '# HELP research_span_errors_total Traced operations that failed.',
+            '# TYPE research_span_errors_total counter'
+        ]
+        transferred = [
+            '# HELP research_span_bytes_total Bytes returned by traced operations, where known.',
+            '# TYPE research_span_bytes_total counter'
+        ]
+        for (kind, name), series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS + ('+Inf',), series['buckets']):
+                cumulative += count
+                histogram.append(
+                    f"research_span_duration_seconds_bucket{self._labels(kind=kind, name=name, le=bound)} {cumulative}"
+                )
+            labels = self._labels(kind=kind, name=name)
+            histogram.append(f"research_span_duration_seconds_sum{labels} {series['sum']:.6f}")
+            histogram.append(f"research_span_duration_seconds_count{labels} {series['count']}")
+            recent = series['recent']
+            for fraction in self.QUANTILES:
+                value = recent[min(len(recent) - 1, int(fraction * len(recent)))] if recent else 0.0
+                quantiles.append(
+                    f"research_span_latency_seconds{self._labels(kind=kind, name=name, quantile=fraction)} {value:.6f}"
+                )
+            errors.append(f"research_span_errors_total{labels} {series['errors']}")
+            transferred.append(f"research_span_bytes_total{labels} {series['bytes']}")
+
+        return '\n'.join(histogram + quantiles + errors + transferred) + '\n'
+
+tracer = Tracer(
+    app.config['TRACE_SAMPLE_RATE'],
+    app.config['TRACE_EXPORT_PATH'],
+    app.config['TRACE_WINDOW']
+)
+
+class MongoSpanListener(monitoring.CommandListener):
+    """Records each MongoDB command as a span under the current request.
+
+    Command events are published on the calling thread, so the current span
+    is the command's parent.
+    """
+
+    def __init__(self):
+        self.collections = {}
+        self.lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        with self.lock:
+            self.collections[(event.request_id, event.connection_id)] = collection if isinstance(collection, str) else None
+
+    def _finish(self, event, outcome):
+        with self.lock:
+            collection = self.collections.pop((event.request_id, event.connection_id), None)
+        name = f"{event.command_name} {collection}" if collection else event.command_name
+        tracer.record('mongo', name, event.duration_micros / 1_000_000, outcome)
+
+    def succeeded(self, event):
+        self._finish(event, 'ok')
+
+    def failed(self, event):
+        self._finish(event, 'error')
+
 # Create uploads directory if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+if app.config['PDF_CACHE_ENABLED']:
+    os.makedirs(os.path.join(app.config['PDF_CACHE_FOLDER'], 'urls'), exist_ok=True)
+
+class LocalTokenBuckets:
+    """In-process token buckets holding (tokens, last_refill) per key."""
 
-class RateLimiter:
     def __init__(self):
-        self.calls = defaultdict(list)
-        
-    def can_call(self, key, calls_per_second=1, burst_limit=5):
-        now = datetime.now()
-        min_interval = timedelta(seconds=1.0/calls_per_second)
-        
-        # Clean old calls
-        self.calls[key] = [
-            call_time for call_time in self.calls[key]
-            if now - call_time < timedelta(seconds=1)
-        ]
-        
-        # Check burst limit
-        if len(self.calls[key]) >= burst_limit:
-            return False
-            
-        # Check rate limit
-        if self.calls[key] and (now - self.calls[key][-1]) < min_interval:
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, key, rate, burst):
+        """Take one token and return the seconds until it becomes available.
+
+        Tokens may go negative: each caller reserves the next free slot, so
+        waiters are served in arrival order.
+        """
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate) - 1
+            self.buckets[key] = (tokens, now)
+        return max(0.0, -tokens / rate)
+
+    def refund(self, key):
+        with self.lock:
+            tokens, updated = self.buckets[key]
+            self.buckets[key] = (tokens + 1, updated)
+
+class MongoTokenBuckets:
+    """Token buckets shared by every worker through MongoDB.
+
+    Refill and reservation happen in one atomic pipeline update that uses the
+    server clock, so workers on different hosts agree on the bucket state.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def reserve(self, key, rate, burst):
+        elapsed_seconds = {'$divide': [
+            {'$subtract': ['$$NOW', {'$ifNull': ['$updated_at', '$$NOW']}]},
+            1000
+        ]}
+        refilled = {'$min': [
+            burst,
+            {'$add': [{'$ifNull': ['$tokens', burst]}, {'$multiply': [elapsed_seconds, rate]}]}
+        ]}
+        bucket = self.collection.find_one_and_update(
+            {'_id': key},
+            [{'$set': {'tokens': {'$subtract': [refilled, 1]}, 'updated_at': '$$NOW'}}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return max(0.0, -bucket['tokens'] / rate)
+
+    def refund(self, key):
+        self.collection.update_one({'_id': key}, {'$inc': {'tokens': 1}})
+
+class TokenBucketRateLimiter:
+    """Token-bucket rate limiter with fair queuing and wait-time histograms.
+
+    Callers reserve a slot and sleep exactly until it opens rather than
+    polling. A reservation that would wait longer than the caller's deadline
+    is handed back and rejected.
+    """
+
+    WAIT_BUCKETS = (0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalTokenBuckets()
+        self.histograms = defaultdict(lambda: [0] * (len(self.WAIT_BUCKETS) + 1))
+        self.rejections = defaultdict(int)
+        self.lock = threading.Lock()
+        self.queued = contextvars.ContextVar('rate_limit_queued', default=None)
+        self.max_wait = contextvars.ContextVar('rate_limit_max_wait', default=None)
+
+    def reserve(self, key, calls_per_second=1, burst_limit=5, deadline=None):
+        """Reserve a call and return the delay before it may run, or None if rejected."""
+        max_wait = self.max_wait.get()
+        if max_wait is not None:
+            deadline = max_wait if deadline is None else min(deadline, max_wait)
+        delay = self.backend.reserve(key, calls_per_second, burst_limit)
+        with self.lock:
+            if deadline is not None and delay > deadline:
+                self.rejections[key] += 1
+            else:
+                self.histograms[key][bisect.bisect_left(self.WAIT_BUCKETS, delay)] += 1
+        if deadline is not None and delay > deadline:
+            self.backend.refund(key)
+            return None
+        waits = self.queued.get()
+        if waits is not None:
+            waits.append(delay)
+        return delay
+
+    @contextmanager
+    def bounded_wait(self, seconds):
+        """Cap how long reservations made inside the block may wait."""
+        token = self.max_wait.set(seconds)
+        try:
+            yield
+        finally:
+            self.max_wait.reset(token)
+
+    @contextmanager
+    def measure_wait(self):
+        """Collect the delays of reservations made inside the block."""
+        waits = []
+        token = self.queued.set(waits)
+        try:
+            yield waits
+        finally:
+            self.queued.reset(token)
+
+    def acquire(self, key, calls_per_second=1, burst_limit=5, deadline=None):
+        delay = self.reserve(key, calls_per_second, burst_limit, deadline)
+        if delay is None:
             return False
-            
-        self.calls[key].append(now)
+        if delay:
+            time.sleep(delay)
         return True
 
-rate_limiter = RateLimiter()
+    def get_stats(self):
+        labels = [f"le_{bound}" for bound in self.WAIT_BUCKETS] + ['le_inf']
+        with self.lock:
+            return {
+                key: {
+                    'wait_histogram': dict(zip(labels, counts)),
+                    'rejections': self.rejections[key]
+                }
+                for key, counts in self.histograms.items()
+            }
+
+rate_limiter = TokenBucketRateLimiter()
 
 def rate_limit(calls_per_second=1, burst_limit=5):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            while not rate_limiter.can_call(func.__name__, calls_per_second, burst_limit):
-                time.sleep(0.1)
+            if not rate_limiter.acquire(func.__name__, calls_per_second, burst_limit,
+                                        deadline=app.config['RATE_LIMIT_MAX_WAIT']):
+                raise RateLimitExceeded(f"Rate limit for {func.__name__} exceeded the maximum wait")
             return func(*args, **kwargs)
         return wrapper
     return decorator
@@ -90,6 +586,14 @@ class APIError(Exception):
     """Custom exception for API-related errors"""
     pass
 
+class RateLimitExceeded(APIError):
+    """Raised when a call would queue longer than the rate limiter allows"""
+    pass
+
+class UpstreamUnavailable(APIError):
+    """Raised when a call is shed because its upstream is unhealthy or saturated"""
+    pass
+
 def handle_api_error(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -103,6 +607,127 @@ def handle_api_error(func):
             raise
     return wrapper
 
+def content_length(response):
+    """Declared body size in bytes, or None when the header is absent or malformed"""
+    try:
+        length = int(response.headers.get('Content-Length', ''))
+    except (TypeError, ValueError):
+        return None
+    return length if length >= 0 else None
+
+class HTTPPool:
+    """Per-host keep-alive sessions for outbound requests.
+
+    Each host gets its own ``requests.Session`` with a pooled adapter, so TCP
+    and TLS connections are reused between calls. Idempotent requests are
+    retried with exponential backoff on connection errors and 429/5xx.
+    """
+
+    def __init__(self, pool_connections, pool_maxsize, connect_timeout, read_timeout,
+                 retries, backoff_factor):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.sessions = {}
+        self.stats = defaultdict(lambda: defaultdict(float))
+        self.lock = threading.Lock()
+
+    def _create_session(self):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET', 'HEAD'],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def session_for(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.sessions:
+                self.sessions[host] = self._create_session()
+            return host, self.sessions[host]
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        host, session = self.session_for(url)
+
+        started = time.monotonic()
+        with tracer.span('http', host) as span:
+            try:
+                response = session.get(url, **kwargs)
+            except requests.exceptions.RequestException:
+                self._record(host, time.monotonic() - started, error=True)
+                raise
+            try:
+                self._record(host, time.monotonic() - started, error=response.status_code >= 400)
+                span.set(status=response.status_code)
+                length = content_length(response)
+                if length is not None:
+                    span.set(bytes=length)
+                if response.status_code >= 400:
+                    span.outcome = 'error'
+            except Exception:
+                # Streamed responses hold a pooled connection until closed
+                response.close()
+                raise
+        return response
+
+    def _record(self, host, elapsed, error=False):
+        with self.lock:
+            host_stats = self.stats[host]
+            host_stats['requests'] += 1
+            host_stats['errors'] += int(error)
+            host_stats['total_latency'] += elapsed
+            host_stats['max_latency'] = max(host_stats['max_latency'], elapsed)
+
+    def get_stats(self):
+        with self.lock:
+            stats = {}
+            for host, host_stats in self.stats.items():
+                requests_made = int(host_stats['requests'])
+                stats[host] = {
+                    'requests': requests_made,
+                    'errors': int(host_stats['errors']),
+                    'connections_opened': self._connections_opened(self.sessions.get(host)),
+                    'avg_latency_ms': round(host_stats['total_latency'] / requests_made * 1000, 1) if requests_made else 0.0,
+                    'max_latency_ms': round(host_stats['max_latency'] * 1000, 1)
+                }
+            return stats
+
+    @staticmethod
+    def _connections_opened(session):
+        if session is None:
+            return 0
+        pools = session.get_adapter('https://').poolmanager.pools
+        return sum(
+            getattr(pools.get(key), 'num_connections', 0)
+            for key in pools.keys()
+        )
+
+http_pool = HTTPPool(
+    app.config['HTTP_POOL_CONNECTIONS'],
+    app.config['HTTP_POOL_MAXSIZE'],
+    app.config['HTTP_CONNECT_TIMEOUT'],
+    app.config['HTTP_READ_TIMEOUT'],
+    app.config['HTTP_RETRIES'],
+    app.config['HTTP_RETRY_BACKOFF']
+)
+
+# arxiv.Client keeps its own session and paging state, so share a single one
+arxiv_client = arxiv.Client()
+
 # Load environment variables and initialize APIs
 def initialize_apis():
     load_dotenv()
@@ -136,7 +761,8 @@ try:
         serverSelectionTimeoutMS=5000,
         connectTimeoutMS=5000,
         socketTimeoutMS=5000,
-        tlsCAFile=certifi.where()
+        tlsCAFile=certifi.where(),
+        event_listeners=[MongoSpanListener()]
     )
     
     # Test connection
@@ -145,65 +771,171 @@ try:
     
     # Create indexes
     db.folders.create_index([("name", 1)], unique=True)
-    db.saved_results.create_index([("folder_id", 1)])
-    db.chat_messages.create_index([("folder_id", 1)])
+    db.saved_results.create_index([("folder_id", 1), ("saved_at", 1), ("_id", 1)])
+    # Compound index serves the newest-first history window and keyset paging;
+    # the timestamp index backs the age-based cleanup
+    db.chat_messages.create_index([("folder_id", 1), ("timestamp", 1), ("_id", 1)])
     db.chat_messages.create_index([("timestamp", 1)])
+    db.summary_jobs.create_index([("folder_id", 1), ("status", 1)])
+    db.saved_results.create_index([("document_hash", 1)], sparse=True)
+    db.paper_summaries.create_index([("paper_id", 1)])
+    db.paper_summaries.create_index([("expires_at", 1)], expireAfterSeconds=0)
+    
+    # Weighted full-text index for searching the saved library
+    db.saved_results.create_index(
+        [
+            ("title", "text"),
+            ("description", "text"),
+            ("ai_summary", "text"),
+            ("custom_notes", "text"),
+            ("search_content", "text")
+        ],
+        weights={'title': 10, 'ai_summary': 5, 'custom_notes': 5, 'description': 3, 'search_content': 1},
+        name='library_text'
+    )
+    db.saved_results.create_index([("engine", 1), ("saved_at", -1)])
+
+    # One saved copy of each URL per folder. Uploads share the '#' placeholder
+    # URL, and the partial filter leaves them out.
+    try:
+        db.saved_results.create_index(
+            [("folder_id", 1), ("url", 1)],
+            unique=True,
+            partialFilterExpression={'url': {'$gt': '#'}}
+        )
+    except Exception as e:
+        logger.warning(f"Could not create unique (folder_id, url) index, check for duplicates: {str(e)}")
     
     logger.info("Successfully connected to MongoDB Atlas")
 except Exception as e:
     logger.error(f"Failed to connect to MongoDB Atlas: {str(e)}")
     raise
 
+class MetricsSnapshot:
+    """Document counts and per-feature traffic for /metrics, kept off the request path.
+
+    Counts start from ``estimated_document_count`` (collection metadata, not
+    a scan) and are adjusted in place as routes insert and delete documents.
+    A background thread re-reads the estimates every ``interval`` seconds to
+    correct drift, and derives request rates for each feature from the
+    tracer's route counters. Scrapes only copy the last snapshot.
+    """
+
+    COLLECTIONS = ('folders', 'saved_results', 'chat_messages')
+    FEATURE_ROUTES = {
+        'search': ('POST /search', 'POST /search/<engine>'),
+        'summary': ('POST /summarize', 'POST /summarize/stream'),
+        'upload': ('POST /api/folders/upload',),
+        'chat': ('POST /api/chat/message', 'POST /api/chat/message/stream')
+    }
+
+    def __init__(self, database, interval):
+        self.database = database
+        self.interval = interval
+        self.counts = dict.fromkeys(self.COLLECTIONS)
+        self.features = {}
+        self.previous = {}
+        self.refreshed_at = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread:
+                return
+            self.thread = threading.Thread(target=self._run, name='metrics-refresh', daemon=True)
+            self.thread.start()
+
+    def adjust(self, collection, delta):
+        if not delta:
+            return
+        with self.lock:
+            if self.counts[collection] is not None:
+                self.counts[collection] = max(0, self.counts[collection] + delta)
+
+    def refresh(self):
+        counts = {}
+        for collection in self.COLLECTIONS:
+            try:
+                counts[collection] = self.database[collection].estimated_document_count()
+            except Exception as e:
+                logger.error(f"Metrics count for {collection} failed: {str(e)}")
+
+        now = time.monotonic()
+        features = {}
+        for feature, routes in self.FEATURE_ROUTES.items():
+            totals = tracer.totals('route', routes)
+            last_count, last_time = self.previous.get(feature, (totals['count'], now - self.interval))
+            totals['per_minute'] = round((totals['count'] - last_count) * 60 / max(now - last_time, 1e-6), 2)
+            self.previous[feature] = (totals['count'], now)
+            features[feature] = totals
+
+        with self.lock:
+            self.counts.update(counts)
+            self.features = features
+            self.refreshed_at = datetime.utcnow()
+
+    def _run(self):
+        while True:
+            with tracer.span('internal', 'metrics_refresh'):
+                self.refresh()
+            time.sleep(self.interval)
+
+    def get_stats(self):
+        self.start()
+        with self.lock:
+            return {
+                'counts': dict(self.counts),
+                'features': {feature: dict(totals) for feature, totals in self.features.items()},
+                'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None
+            }
+
+metrics_snapshot = MetricsSnapshot(db, app.config['METRICS_REFRESH_INTERVAL'])
+
+# Share rate limits across workers when RATE_LIMIT_BACKEND=mongodb
+if os.getenv('RATE_LIMIT_BACKEND', 'memory').lower() == 'mongodb':
+    rate_limiter.backend = MongoTokenBuckets(db.rate_limits)
+    logger.info("Rate limiter using MongoDB token buckets")
+
 class SearchEngines:
     @staticmethod
     @handle_api_error
-    def duckduckgo(query):
+    def duckduckgo(query, offset=0, limit=5):
         try:
-            url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
+            url = "https://html.duckduckgo.com/html/"
+            params = {'q': query}
+            if offset:
+                # The HTML endpoint pages by result offset
+                params.update({'s': offset, 'dc': offset + 1})
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http_pool.get(url, params=params, headers=headers)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            results = []
-            
-            for result in soup.select('.result')[:5]:
-                title_elem = result.select_one('.result__title')
-                snippet_elem = result.select_one('.result__snippet')
-                url_elem = result.select_one('.result__url')
-                
-                if title_elem and snippet_elem:
-                    title = title_elem.get_text(strip=True)
-                    description = snippet_elem.get_text(strip=True)
-                    url = url_elem.get('href') if url_elem else '#'
-                    
-                    results.append({
-                        'title': title,
-                        'description': description,
-                        'url': url
-                    })
+            results = parse_duckduckgo_results(
+                response.text, limit, app.config['HTML_PARSE_MODE']
+            )
             
             return results
         except Exception as e:
             logger.error(f"DuckDuckGo search error: {str(e)}")
-            return []
+            raise APIError(f"DuckDuckGo search failed: {str(e)}")
 
     @staticmethod
     @rate_limit(calls_per_second=1)
     @handle_api_error
-    def arxiv(query):
+    def arxiv(query, offset=0, limit=5):
         try:
-            client = arxiv.Client()
+            # max_results counts from the first result, so it includes the offset
             search = arxiv.Search(
                 query=query,
-                max_results=5,
+                max_results=offset + limit,
                 sort_by=arxiv.SortCriterion.Relevance
             )
             
             results = []
-            for paper in client.results(search):
+            for paper in arxiv_client.results(search, offset=offset):
                 try:
                     result = {
                         'title': paper.title,
@@ -211,7 +943,8 @@ class SearchEngines:
                         'url': paper.entry_id,
                         'pdf_url': paper.pdf_url,
                         'authors': ', '.join([author.name for author in paper.authors]),
-                        'published': paper.published.strftime('%Y-%m-%d')
+                        'published': paper.published.strftime('%Y-%m-%d'),
+                        'doi': paper.doi
                     }
                     results.append(result)
                 except Exception as e:
@@ -221,85 +954,70 @@ class SearchEngines:
             return results
         except Exception as e:
             logger.error(f"arXiv search error: {str(e)}")
-            return []
+            raise APIError(f"arXiv search failed: {str(e)}")
 
     @staticmethod
     @rate_limit(calls_per_second=1)
     @handle_api_error
-    def biorxiv(query):
+    def biorxiv(query, offset=0, limit=5):
         try:
             base_url = "https://www.biorxiv.org/search"
-            params = {
-                'text': query,
-                'sort': 'relevance',
-                'page': 0
-            }
-            
+            page_size = app.config['BIORXIV_PAGE_SIZE']
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.get(base_url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # bioRxiv pages are fixed-size, so a window may span two of them
             results = []
+            page, skip = divmod(offset, page_size)
+            while len(results) < limit:
+                # A short page would be cached as the last one, so fail instead
+                if results and not rate_limiter.acquire('biorxiv', 1, 5, deadline=app.config['RATE_LIMIT_MAX_WAIT']):
+                    raise RateLimitExceeded("Rate limit for biorxiv exceeded the maximum wait")
+                params = {
+                    'text': query,
+                    'sort': 'relevance',
+                    'page': page
+                }
+                response = http_pool.get(base_url, params=params, headers=headers)
+                response.raise_for_status()
+                
+                wanted = skip + limit - len(results)
+                page_results = parse_biorxiv_results(
+                    response.text, wanted, app.config['HTML_PARSE_MODE'],
+                    on_error=lambda e: logger.error(f"Error processing bioRxiv paper: {str(e)}")
+                )
+                results.extend(page_results[skip:])
+                if len(page_results) < min(wanted, page_size):
+                    break
+                page += 1
+                skip = 0
             
-            for article in soup.select('.highwire-article-citation')[:5]:
-                try:
-                    title_elem = article.select_one('.highwire-cite-title')
-                    title = title_elem.get_text(strip=True) if title_elem else 'No title available'
-                    
-                    link = title_elem.find('a')['href'] if title_elem and title_elem.find('a') else ''
-                    full_url = f"https://www.biorxiv.org{link}" if link else '#'
-                    
-                    authors_elem = article.select_one('.highwire-citation-authors')
-                    authors = authors_elem.get_text(strip=True) if authors_elem else 'No authors listed'
-                    
-                    abstract_elem = article.select_one('.highwire-cite-snippet')
-                    abstract = abstract_elem.get_text(strip=True) if abstract_elem else 'No abstract available'
-                    
-                    date_elem = article.select_one('.highwire-cite-metadata-date')
-                    date = date_elem.get_text(strip=True) if date_elem else 'Date not available'
-                    
-                    pdf_url = f"{full_url}.full.pdf" if full_url != '#' else None
-                    
-                    result = {
-                        'title': title,
-                        'description': abstract[:200] + '...' if len(abstract) > 200 else abstract,
-                        'url': full_url,
-                        'pdf_url': pdf_url,
-                        'authors': authors,
-                        'published': date
-                    }
-                    
-                    results.append(result)
-                except Exception as e:
-                    logger.error(f"Error processing bioRxiv paper: {str(e)}")
-                    continue
-            
-            return results
+            return results[:limit]
+        except RateLimitExceeded:
+            raise
         except Exception as e:
             logger.error(f"bioRxiv search error: {str(e)}")
-            return []
+            raise APIError(f"bioRxiv search failed: {str(e)}")
 
     @staticmethod
     @rate_limit(calls_per_second=1)
     @handle_api_error
-    def semantic_scholar(query):
+    def semantic_scholar(query, offset=0, limit=5):
         try:
             url = "https://api.semanticscholar.org/graph/v1/paper/search"
             params = {
                 'query': query,
-                'limit': 5,
-                'fields': 'title,abstract,authors,year,citationCount,url,openAccessPdf,tldr'
+                'offset': offset,
+                'limit': limit,
+                'fields': 'title,abstract,authors,year,citationCount,url,openAccessPdf,tldr,externalIds'
             }
             
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
 
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = http_pool.get(url, params=params, headers=headers)
             response.raise_for_status()
             
             data = response.json()
@@ -327,7 +1045,9 @@ class SearchEngines:
                             'pdf_url': paper.get('openAccessPdf', {}).get('url'),
                             'authors': ', '.join(authors) or 'Authors not available',
                             'published': str(paper.get('year', 'Year not available')),
-                            'citations': paper.get('citationCount', 0)
+                            'citations': paper.get('citationCount', 0),
+                            'doi': (paper.get('externalIds') or {}).get('DOI'),
+                            'arxiv_id': (paper.get('externalIds') or {}).get('ArXiv')
                         }
                         results.append(result)
                     except Exception as e:
@@ -337,132 +1057,1605 @@ class SearchEngines:
             return results
         except Exception as e:
             logger.error(f"Semantic Scholar search error: {str(e)}")
-            return []
-
-# Flask Routes
-@app.route('/')
-def index():
-    return render_template('index.html')
+            raise APIError(f"Semantic Scholar search failed: {str(e)}")
 
-@app.route('/folders')
-def folders():
-    return render_template('folders.html')
+class SearchResultCache:
+    """TTL/LRU cache for search results with an optional MongoDB second tier.
 
-@app.route('/search/<engine>', methods=['POST'])
-@handle_api_error
-def search(engine):
-    query = request.form.get('query', '')
-    logger.info(f"Search request received for engine: {engine}, query: {query}")
-    
-    search_functions = {
-        'duckduckgo': SearchEngines.duckduckgo,
-        'arxiv': SearchEngines.arxiv,
-        'biorxiv': SearchEngines.biorxiv,
-        'semantic_scholar': SearchEngines.semantic_scholar
-    }
-    
-    if engine not in search_functions:
-        return jsonify({
-            'success': False,
-            'error': 'Invalid search engine'
-        }), 400
+    Entries are keyed by (engine, normalized query, offset, limit). The memory
+    tier evicts least-recently-used entries once its estimated size exceeds
+    ``max_bytes``. When a collection is given, entries are also written there
+    so they survive restarts and are shared between worker processes.
+    """
 
-    try:
-        results = search_functions[engine](query)
-        logger.info(f"Search completed for {engine}. Found {len(results)} results.")
-        
-        return jsonify({
-            'success': True,
-            'results': results,
-            'engine': engine
-        })
-    except APIError as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    def __init__(self, ttls, max_bytes, collection=None, default_ttl=600, empty_ttl=120):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.empty_ttl = empty_ttl
+        self.max_bytes = max_bytes
+        self.collection = collection
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stats = defaultdict(int)
 
-@app.route('/api/chat/history/<folder_id>', methods=['GET'])
-def get_chat_history(folder_id):
-    try:
-        if not ObjectId.is_valid(folder_id):
-            return jsonify({
-                'success': False,
-                'error': 'Invalid folder ID format'
-            }), 400
+    @staticmethod
+    def make_key(engine, query, limit, offset=0):
+        normalized = ' '.join(query.lower().split())
+        return f"{engine}:{offset}:{limit}:{normalized}"
 
-        messages = list(db.chat_messages.find(
-            {'folder_id': ObjectId(folder_id)}
-        ).sort('timestamp', 1))
+    def get(self, engine, query, limit, offset=0):
+        key = self.make_key(engine, query, limit, offset)
+        now = time.time()
 
-        processed_messages = []
-        for message in messages:
-            processed_message = {
-                'id': str(message['_id']),
-                'content': message['content'],
-                'type': message['type'],
-                'timestamp': message['timestamp'].isoformat(),
-                'ai_provider': message.get('ai_provider', 'unknown')
-            }
-            processed_messages.append(processed_message)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                expires_at, size, results = entry
+                if expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return results
+                self._remove(key)
 
-        return jsonify({
-            'success': True,
-            'messages': processed_messages
-        })
+        if self.collection is not None:
+            try:
+                doc = self.collection.find_one({
+                    '_id': key,
+                    'expires_at': {'$gt': datetime.utcnow()}
+                })
+                if doc:
+                    with self.lock:
+                        self.stats['mongo_hits'] += 1
+                        remaining = (doc['expires_at'] - datetime.utcnow()).total_seconds()
+                        self._store(key, doc['results'], now + remaining)
+                    return doc['results']
+            except Exception as e:
+                logger.error(f"Search cache lookup failed: {str(e)}")
 
-    except Exception as e:
-        logger.error(f"Error fetching chat history: {str(e)}")
-        return json.loads(json_util.dumps({
-            'success': False,
-            'error': str(e)
-        })), 500
+        with self.lock:
+            self.stats['misses'] += 1
+        return None
 
-@app.route('/api/chat/message', methods=['POST'])
-def send_chat_message():
-    try:
-        data = request.get_json()
-        message = data.get('message')
-        folder_id = data.get('folderId')
-        folder_contents = data.get('folderContents', [])
-        
-        logger.debug(f"Received message request for folder: {folder_id}")
-        logger.debug(f"Folder contents received: {folder_contents}")
-        
-        if not message or not folder_id:
-            return jsonify({
-                'success': False,
-                'error': 'Message and folder ID are required'
-            }), 400
+    def contains(self, engine, query, limit, offset=0):
+        """Whether an unexpired entry is in the memory tier, without counting a lookup."""
+        key = self.make_key(engine, query, limit, offset)
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and entry[0] > time.time()
 
-        # Create context from folder contents
-        context = "\n".join([
-            f"Title: {item.get('title', '')}\n"
-            f"Summary: {item.get('ai_summary', '')}\n"
-            f"Notes: {item.get('custom_notes', '')}\n"
-            f"Description: {item.get('description', '')}\n"
-            for item in folder_contents
-        ])
-
-        # Get chat history for context
-        chat_history = list(db.chat_messages.find(
-            {'folder_id': ObjectId(folder_id)}
-        ).sort('timestamp', 1).limit(5))  # Get last 5 messages for context
-        
-        chat_context = "\n".join([
-            f"{'User' if msg['type'] == 'user' else 'Assistant'}: {msg['content']}"
-            for msg in chat_history
-        ])
+    def set(self, engine, query, limit, results, offset=0):
+        # Upstream errors raise instead of returning, so an empty list is a
+        # real answer; keep it for less time in case the index catches up
+        key = self.make_key(engine, query, limit, offset)
+        ttl = self.ttls.get(engine, self.default_ttl)
+        if not results:
+            ttl = min(ttl, self.empty_ttl)
 
-        # Customized prompt for research analysis
-        prompt = f"""You are a highly knowledgeable research assistant analyzing the contents of a research folder. 
-Your expertise spans academic research, scientific papers, and data analysis.
+        with self.lock:
+            self._store(key, results, time.time() + ttl)
 
-Research Materials in Current Folder:
-{context}
+        if self.collection is not None:
+            try:
+                self.collection.replace_one(
+                    {'_id': key},
+                    {
+                        '_id': key,
+                        'engine': engine,
+                        'results': results,
+                        'expires_at': datetime.utcnow() + timedelta(seconds=ttl)
+                    },
+                    upsert=True
+                )
+            except Exception as e:
+                logger.error(f"Search cache write failed: {str(e)}")
 
-Previous Conversation:
-{chat_context}
+    def _store(self, key, results, expires_at):
+        if key in self.entries:
+            self._remove(key)
+        size = len(json.dumps(results, default=str))
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (expires_at, size, results)
+        self.size += size
+        while self.size > self.max_bytes:
+            oldest_key = next(iter(self.entries))
+            self._remove(oldest_key)
+            self.stats['evictions'] += 1
+
+    def _remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
+
+    def get_stats(self):
+        with self.lock:
+            hits = self.stats['memory_hits'] + self.stats['mongo_hits']
+            lookups = hits + self.stats['misses']
+            return {
+                'hits': hits,
+                'memory_hits': self.stats['memory_hits'],
+                'mongo_hits': self.stats['mongo_hits'],
+                'misses': self.stats['misses'],
+                'evictions': self.stats['evictions'],
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self.entries),
+                'size_bytes': self.size
+            }
+
+def init_search_cache():
+    """Create the search cache, backed by MongoDB when SEARCH_CACHE_BACKEND=mongodb"""
+    collection = None
+    if os.getenv('SEARCH_CACHE_BACKEND', 'memory').lower() == 'mongodb':
+        collection = db.search_cache
+        collection.create_index([("expires_at", 1)], expireAfterSeconds=0)
+        logger.info("Search cache using MongoDB second tier")
+
+    return SearchResultCache(
+        app.config['SEARCH_CACHE_TTLS'],
+        app.config['SEARCH_CACHE_MAX_BYTES'],
+        collection=collection,
+        empty_ttl=app.config['SEARCH_CACHE_EMPTY_TTL']
+    )
+
+search_cache = init_search_cache()
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for one upstream.
+
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    until ``reset_timeout`` has passed, then lets a single probe through.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def release_probe(self):
+        """Give back a half-open probe that ended without an outcome."""
+        with self.lock:
+            self.probing = False
+
+    def record_success(self):
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def get_state(self):
+        with self.lock:
+            return {'state': self.state, 'consecutive_failures': self.failures}
+
+class AIMDLimiter:
+    """Adaptive concurrency limit using additive increase, multiplicative decrease.
+
+    Each fast success grows the limit by roughly one per window of calls;
+    a failure or a call slower than ``latency_target`` halves it.
+    """
+
+    def __init__(self, initial, minimum, maximum, latency_target):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def try_acquire(self, headroom=0):
+        """Take a slot, leaving at least ``headroom`` slots free for other callers."""
+        with self.lock:
+            if self.in_flight >= int(self.limit) - headroom:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency=None, success=True):
+        with self.lock:
+            self.in_flight -= 1
+            if latency is None:
+                return
+            if success and latency <= self.latency_target:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            else:
+                self.limit = max(self.minimum, self.limit / 2)
+
+    def get_state(self):
+        with self.lock:
+            return {'limit': int(self.limit), 'in_flight': self.in_flight}
+
+class UpstreamGuard:
+    """Circuit breaker plus adaptive concurrency limit for one search engine."""
+
+    def __init__(self, name):
+        concurrency = app.config['ENGINE_CONCURRENCY']
+        self.name = name
+        self.breaker = CircuitBreaker(
+            app.config['BREAKER_FAILURE_THRESHOLD'],
+            app.config['BREAKER_RESET_TIMEOUT']
+        )
+        self.limiter = AIMDLimiter(
+            concurrency['initial'],
+            concurrency['min'],
+            concurrency['max'],
+            app.config['ENGINE_LATENCY_TARGET']
+        )
+        self.rejections = 0
+
+    def reject(self, reason):
+        with self.limiter.lock:
+            self.rejections += 1
+        raise UpstreamUnavailable(f"{self.name} is {reason}")
+
+    def call(self, func, *args, **kwargs):
+        if not self.breaker.allow():
+            self.reject('temporarily unavailable')
+        if not self.limiter.try_acquire():
+            self.breaker.release_probe()
+            self.reject('at its concurrency limit')
+        return self._run(func, *args, **kwargs)
+
+    def call_background(self, func, *args, **kwargs):
+        """Make a call only with capacity to spare, for work no user is waiting on.
+
+        Never takes a half-open probe, leaves a concurrency slot free and
+        fails rather than queueing for a rate-limit token. Refusals are not
+        counted as rejections.
+        """
+        if self.breaker.get_state()['state'] != 'closed':
+            raise UpstreamUnavailable(f"{self.name} is temporarily unavailable")
+        if not self.limiter.try_acquire(headroom=1):
+            raise UpstreamUnavailable(f"{self.name} has no spare concurrency")
+        with rate_limiter.bounded_wait(0):
+            return self._run(func, *args, **kwargs)
+
+    def _run(self, func, *args, **kwargs):
+        # Time spent queued in the local rate limiter says nothing about the
+        # upstream, so only the remainder feeds the concurrency limit
+        started = time.monotonic()
+        with rate_limiter.measure_wait() as waits:
+            try:
+                result = func(*args, **kwargs)
+            except RateLimitExceeded:
+                self.limiter.release()
+                self.breaker.release_probe()
+                raise
+            except Exception:
+                self.limiter.release(time.monotonic() - started - sum(waits), success=False)
+                self.breaker.record_failure()
+                raise
+        self.limiter.release(time.monotonic() - started - sum(waits))
+        self.breaker.record_success()
+        return result
+
+    def get_state(self):
+        return {
+            **self.breaker.get_state(),
+            **self.limiter.get_state(),
+            'rejections': self.rejections
+        }
+
+def cached_search(engine, query, offset=0, limit=None, background=False):
+    """Run one page of an engine search through the shared result cache.
+
+    ``background`` calls only use spare engine capacity and never wait for
+    a rate-limit token.
+    """
+    limit = limit or app.config['MAX_RESULTS_PER_SEARCH']
+    results = search_cache.get(engine, query, limit, offset)
+    if results is not None:
+        logger.debug(f"Search cache hit for {engine} at {offset}: {query}")
+        return results
+
+    with tracer.span('search', engine, offset=offset) as span:
+        guard = engine_guards[engine]
+        call = guard.call_background if background else guard.call
+        results = call(SEARCH_FUNCTIONS[engine], query, offset, limit)
+        span.set(results=len(results))
+    search_cache.set(engine, query, limit, results, offset)
+    return results
+
+def next_offset(offset, limit, results):
+    """Offset of the following page, or None when this one was the last."""
+    following = offset + limit
+    if len(results) < limit or following >= app.config['SEARCH_MAX_DEPTH']:
+        return None
+    return following
+
+def encode_search_cursor(query, limit, offsets):
+    raw = json.dumps({'q': query, 'n': limit, 'o': offsets}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_search_cursor(cursor):
+    """Return ``(query, limit, {engine: offset})``; raises ValueError on bad input."""
+    data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    if not isinstance(data, dict):
+        raise ValueError('Malformed cursor')
+    query, limit, offsets = data.get('q'), data.get('n'), data.get('o')
+    # bool is an int subclass, so rule it out explicitly
+    if not isinstance(query, str) or not isinstance(offsets, dict) \
+            or not isinstance(limit, int) or isinstance(limit, bool) \
+            or any(not isinstance(offset, int) or isinstance(offset, bool) for offset in offsets.values()):
+        raise ValueError('Malformed cursor')
+    if any(engine not in SEARCH_FUNCTIONS or not 0 <= offset < app.config['SEARCH_MAX_DEPTH']
+           for engine, offset in offsets.items()) \
+            or not 0 < limit <= app.config['SEARCH_MAX_PAGE_SIZE']:
+        raise ValueError('Cursor out of range')
+    return query, limit, offsets
+
+class SearchPrefetcher:
+    """Warms the search cache with the next page while the user reads this one.
+
+    Runs on its own small pool and skips pages that are already cached or
+    being fetched. Prefetches go through the engine guards as background
+    calls, so they are dropped rather than queued whenever an engine has no
+    concurrency slot or rate-limit token to spare.
+    """
+
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search-prefetch')
+        self.in_flight = set()
+        self.lock = threading.Lock()
+        self.stats = defaultdict(int)
+
+    def schedule(self, engine, query, offset, limit):
+        if not app.config['SEARCH_PREFETCH'] or offset is None:
+            return
+        if search_cache.contains(engine, query, limit, offset):
+            return
+        key = search_cache.make_key(engine, query, limit, offset)
+        with self.lock:
+            if key in self.in_flight:
+                return
+            self.in_flight.add(key)
+            self.stats['scheduled'] += 1
+        self.executor.submit(self._fetch, key, engine, query, offset, limit)
+
+    def _fetch(self, key, engine, query, offset, limit):
+        try:
+            cached_search(engine, query, offset, limit, background=True)
+            with self.lock:
+                self.stats['completed'] += 1
+        except (UpstreamUnavailable, RateLimitExceeded):
+            with self.lock:
+                self.stats['skipped'] += 1
+        except Exception as e:
+            logger.debug(f"Prefetch of {engine} at {offset} skipped: {str(e)}")
+            with self.lock:
+                self.stats['failed'] += 1
+        finally:
+            with self.lock:
+                self.in_flight.discard(key)
+
+    def get_stats(self):
+        with self.lock:
+            return {**self.stats, 'in_flight': len(self.in_flight)}
+
+SEARCH_FUNCTIONS = {
+    'duckduckgo': SearchEngines.duckduckgo,
+    'arxiv': SearchEngines.arxiv,
+    'biorxiv': SearchEngines.biorxiv,
+    'semantic_scholar': SearchEngines.semantic_scholar
+}
+
+engine_guards = {engine: UpstreamGuard(engine) for engine in SEARCH_FUNCTIONS}
+search_prefetcher = SearchPrefetcher(app.config['SEARCH_PREFETCH_WORKERS'])
+
+# Shared pool for fanning one query out to every engine
+search_executor = ThreadPoolExecutor(
+    max_workers=app.config['SEARCH_MAX_WORKERS'],
+    thread_name_prefix='search'
+)
+
+def federated_search(query, engines, deadline, offsets=None, limit=None):
+    """Run a query against several engines concurrently.
+
+    ``offsets`` maps engines to the result offset of the page to fetch.
+    Waits at most ``deadline`` seconds. Engines that have not finished by then
+    are reported in ``timed_out`` and their results are dropped.
+    """
+    offsets = offsets or {}
+    futures = {
+        engine: search_executor.submit(
+            contextvars.copy_context().run, cached_search, engine, query, offsets.get(engine, 0), limit
+        )
+        for engine in engines
+    }
+    wait(futures.values(), timeout=deadline)
+
+    results = {}
+    errors = {}
+    timed_out = []
+    for engine, future in futures.items():
+        if not future.done():
+            future.cancel()
+            timed_out.append(engine)
+            continue
+        try:
+            results[engine] = future.result()
+        except Exception as e:
+            logger.error(f"Federated search error for {engine}: {str(e)}")
+            errors[engine] = str(e)
+
+    return results, errors, timed_out
+
+# Engine fallbacks for missing fields; never preferred over a real value
+PLACEHOLDER_VALUES = {
+    None, '', '#', 'No title', 'No title available', 'No abstract available', 'No summary available',
+    'No authors listed', 'Authors not available', 'Date not available', 'Year not available'
+}
+
+def result_identity_keys(result):
+    """Canonical keys a search result can be matched on across engines."""
+    keys = set()
+    for field in ('url', 'pdf_url'):
+        if result.get(field) and result[field] != '#':
+            keys.add(canonical_paper_id(result[field]))
+    if result.get('doi'):
+        keys.add(canonical_paper_id(f"https://doi.org/{result['doi']}"))
+    if result.get('arxiv_id'):
+        keys.add(canonical_paper_id(f"https://arxiv.org/abs/{result['arxiv_id']}"))
+
+    # Short titles ("Introduction", "Editorial") are too generic to match on
+    words = re.sub(r'[^a-z0-9]+', ' ', (result.get('title') or '').lower()).split()
+    if len(words) >= 4:
+        keys.add(f"title:{hashlib.sha1(' '.join(words).encode('utf-8')).hexdigest()[:16]}")
+    return keys
+
+def merge_result_fields(merged, result):
+    """Fill placeholder fields in ``merged`` from another engine's copy of the paper."""
+    for field, value in result.items():
+        if value in PLACEHOLDER_VALUES:
+            continue
+        if field == 'citations':
+            merged['citations'] = max(merged.get('citations') or 0, value or 0)
+        elif field == 'pdf_url' and 'arxiv.org' in value and 'arxiv.org' not in (merged.get('pdf_url') or ''):
+            # arXiv PDFs are direct downloads; other open-access links often are not
+            merged['pdf_url'] = value
+        elif field == 'description' and len(value) > len(merged.get('description') or ''):
+            merged['description'] = value
+        elif merged.get(field) in PLACEHOLDER_VALUES:
+            merged[field] = value
+
+def merge_search_results(results_by_engine, rrf_k=60):
+    """Deduplicate results across engines and rank them by reciprocal-rank fusion.
+
+    Results that share any canonical key (arXiv ID, DOI or normalized title
+    hash) are merged into one entry. Matching is transitive: results are
+    grouped with a union-find over their keys, so a result sharing a DOI with
+    one and a title with another joins all three. Each entry scores
+    ``sum(1 / (rrf_k + rank))`` over the engines that returned it and lists
+    them in ``engines``.
+    """
+    items = [
+        (engine, rank, result)
+        for engine, engine_results in results_by_engine.items()
+        for rank, result in enumerate(engine_results, start=1)
+    ]
+    parents = list(range(len(items)))
+
+    def find(position):
+        while parents[position] != position:
+            parents[position] = parents[parents[position]]
+            position = parents[position]
+        return position
+
+    key_owner = {}
+    for position, (_, _, result) in enumerate(items):
+        for key in result_identity_keys(result):
+            if key in key_owner:
+                # The earlier item stays the root, so entries keep first-seen order
+                first, second = sorted((find(key_owner[key]), find(position)))
+                parents[second] = first
+            else:
+                key_owner[key] = position
+
+    merged = []
+    entries = {}
+    for position, (engine, rank, result) in enumerate(items):
+        root = find(position)
+        if root not in entries:
+            entries[root] = {**result, 'engine': engine, 'engines': [], 'sources': {}, 'rrf_score': 0.0}
+            merged.append(entries[root])
+        entry = entries[root]
+        if engine not in entry['engines']:
+            entry['engines'].append(engine)
+            entry['sources'][engine] = result.get('url')
+            entry['rrf_score'] += 1.0 / (rrf_k + rank)
+        merge_result_fields(entry, result)
+
+    for entry in merged:
+        entry['rrf_score'] = round(entry['rrf_score'], 6)
+    return sorted(merged, key=lambda entry: entry['rrf_score'], reverse=True)
+
+class EmbeddingIndex:
+    """Local embedding store for saved results with an LSH lookup.
+
+    Texts are embedded on CPU with signed feature hashing over word unigrams
+    and bigrams, so no model download or network access is needed. Vectors
+    are kept in a memory-mapped float16 matrix (``vectors.f16``) with one row
+    per ``ids.log`` line; removed IDs are listed in ``deleted.log``. Random
+    hyperplane signatures bucket rows across several hash tables, and
+    candidates from matching buckets are re-ranked by exact cosine
+    similarity. The files are appended under a file lock, and other
+    processes pick up the new rows on their next query.
+
+    ``rebuild`` writes a compacted copy of the files as a new generation,
+    named in the ``generation`` file; readers switch to it on their next
+    refresh.
+    """
+
+    FILE_PATTERN = re.compile(r'^(vectors|ids|deleted)(?:-(\d+))?\.(f16|log)$')
+
+    def __init__(self, folder, dim, tables, bits, seed=42):
+        self.folder = folder
+        self.dim = dim
+        self.tables = tables
+        self.bits = bits
+        # A fixed seed keeps signatures identical across processes and restarts
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((tables, bits, dim)).astype(np.float32)
+        self.bit_weights = (1 << np.arange(bits)).astype(np.int64)
+        self.generation_path = os.path.join(folder, 'generation')
+        self.lock_path = os.path.join(folder, '.lock')
+        self.lock = threading.Lock()
+
+        os.makedirs(folder, exist_ok=True)
+        self.generation = None
+        self.refresh()
+
+    def paths(self, generation):
+        """``(vectors, ids, deleted)`` file paths for one generation."""
+        suffix = f"-{generation}" if generation else ''
+        return tuple(
+            os.path.join(self.folder, name)
+            for name in (f"vectors{suffix}.f16", f"ids{suffix}.log", f"deleted{suffix}.log")
+        )
+
+    def read_generation(self):
+        try:
+            with open(self.generation_path, 'r') as generation_file:
+                return int(generation_file.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the cross-process file lock on the index."""
+        with open(self.lock_path, 'a+b') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+                return
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def tokenize(text):
+        words = re.findall(r'[a-z0-9]+', (text or '').lower())
+        return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, text):
+        """Hash unigram and bigram counts into a unit-length vector."""
+        counts = defaultdict(int)
+        for feature in self.tokenize(text):
+            counts[feature] += 1
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in counts.items():
+            digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dim] += sign * (1.0 + np.log(count))
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def signatures(self, vectors):
+        """Return a (tables, n) array of bucket keys for row vectors."""
+        projections = np.einsum('tbd,nd->tnb', self.planes, vectors.astype(np.float32))
+        return (projections > 0).astype(np.int64) @ self.bit_weights
+
+    def _open_vectors(self):
+        rows = os.path.getsize(self.vectors_path) // (2 * self.dim)
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='r', shape=(rows, self.dim)) if rows else None
+
+    def _use_generation(self, generation):
+        self.generation = generation
+        self.vectors_path, self.ids_path, self.deleted_path = self.paths(generation)
+        for path in (self.vectors_path, self.ids_path, self.deleted_path):
+            open(path, 'ab').close()
+        self.row_ids = []
+        self.rows = {}
+        self.buckets = [defaultdict(list) for _ in range(self.tables)]
+        self.vectors = None
+        self.ids_offset = 0
+        self.deleted_size = 0
+
+    def refresh(self):
+        """Load rows and deletions written since the last refresh."""
+        with self.lock:
+            generation = self.read_generation()
+            if generation != self.generation:
+                self._use_generation(generation)
+
+            if os.path.getsize(self.ids_path) != self.ids_offset:
+                with open(self.ids_path, 'r', encoding='utf-8') as ids_file:
+                    ids_file.seek(self.ids_offset)
+                    new_ids = ids_file.read().splitlines()
+                    self.ids_offset = ids_file.tell()
+                self._open_vectors()
+                start = len(self.row_ids)
+                self.row_ids.extend(new_ids)
+                if new_ids:
+                    keys = self.signatures(np.asarray(self.vectors[start:start + len(new_ids)]))
+                    for offset, result_id in enumerate(new_ids):
+                        row = start + offset
+                        self.rows[result_id] = row
+                        for table in range(self.tables):
+                            self.buckets[table][keys[table, offset]].append(row)
+
+            if os.path.getsize(self.deleted_path) != self.deleted_size:
+                with open(self.deleted_path, 'r', encoding='utf-8') as deleted_file:
+                    deleted = deleted_file.read().splitlines()
+                    self.deleted_size = deleted_file.tell()
+                for line in deleted:
+                    result_id, _, row = line.partition('\t')
+                    if self.rows.get(result_id) == int(row):
+                        del self.rows[result_id]
+
+    def upsert(self, result_id, text):
+        vector = self.embed(text).astype(np.float16)
+        with self.exclusive():
+            self.refresh()
+            with open(self.vectors_path, 'ab') as vectors_file:
+                vectors_file.write(vector.tobytes())
+            with open(self.ids_path, 'a', encoding='utf-8') as ids_file:
+                ids_file.write(f"{result_id}\n")
+            self.refresh()
+
+    def remove(self, result_ids):
+        with self.exclusive():
+            self.refresh()
+            with open(self.deleted_path, 'a', encoding='utf-8') as deleted_file:
+                for result_id in result_ids:
+                    if result_id in self.rows:
+                        deleted_file.write(f"{result_id}\t{self.rows[result_id]}\n")
+            self.refresh()
+
+    def rebuild(self, texts, stale=()):
+        """Compact the files into a new generation, embedding ``texts`` afresh.
+
+        Keeps the latest vector of every live ID except those in ``stale``,
+        drops superseded and deleted rows, and adds or replaces the IDs in
+        ``texts`` (result_id -> text).
+        """
+        embedded = {result_id: self.embed(text).astype(np.float16) for result_id, text in texts.items()}
+        with self.exclusive():
+            self.refresh()
+            with self.lock:
+                kept = [
+                    (result_id, row) for result_id, row in self.rows.items()
+                    if result_id not in embedded and result_id not in stale
+                ]
+                vectors = self.vectors
+                generation = self.generation + 1
+
+            vectors_path, ids_path, deleted_path = self.paths(generation)
+            with open(vectors_path, 'wb') as vectors_file, open(ids_path, 'w', encoding='utf-8') as ids_file:
+                for result_id, row in kept:
+                    vectors_file.write(np.asarray(vectors[row], dtype=np.float16).tobytes())
+                    ids_file.write(f"{result_id}\n")
+                for result_id, vector in embedded.items():
+                    vectors_file.write(vector.tobytes())
+                    ids_file.write(f"{result_id}\n")
+            open(deleted_path, 'wb').close()
+
+            temp_path = f"{self.generation_path}.tmp"
+            with open(temp_path, 'w') as generation_file:
+                generation_file.write(str(generation))
+            os.replace(temp_path, self.generation_path)
+            self.refresh()
+
+        # Readers still mapping old files keep them open; Windows refuses those deletes
+        for name in os.listdir(self.folder):
+            match = self.FILE_PATTERN.match(name)
+            if match and int(match.group(2) or 0) != generation:
+                try:
+                    os.remove(os.path.join(self.folder, name))
+                except OSError:
+                    pass
+        return len(kept) + len(embedded)
+
+    def live_ids(self):
+        self.refresh()
+        with self.lock:
+            return set(self.rows)
+
+    def vector_for(self, result_id):
+        self.refresh()
+        row = self.rows.get(result_id)
+        return None if row is None else np.asarray(self.vectors[row], dtype=np.float32)
+
+    def vectors_for(self, result_ids):
+        """Stacked vectors for the indexed IDs among ``result_ids``, or None if there are none."""
+        result_ids = list(result_ids)
+        self.refresh()
+        with self.lock:
+            rows = [self.rows[result_id] for result_id in result_ids if result_id in self.rows]
+            vectors = self.vectors
+        if not rows:
+            return None
+        return np.asarray(vectors[np.asarray(rows, dtype=np.int64)], dtype=np.float32)
+
+    def query(self, vector, limit=10, exclude=(), within=None):
+        """Return up to ``limit`` (result_id, score) pairs closest to ``vector``.
+
+        ``within`` restricts the search to those result ids, which are scored
+        directly instead of through the LSH buckets.
+        """
+        self.refresh()
+        with self.lock:
+            if within is not None:
+                live = {self.rows[result_id] for result_id in within if result_id in self.rows}
+            else:
+                keys = self.signatures(vector[np.newaxis, :])[:, 0]
+                candidates = set()
+                for table in range(self.tables):
+                    candidates.update(self.buckets[table].get(keys[table], ()))
+                live = {row for row in candidates if self.rows.get(self.row_ids[row]) == row}
+                # Too few LSH candidates: fall back to scanning every live row
+                if len(live) < limit * 4:
+                    live = set(self.rows.values())
+            rows = np.fromiter(live, dtype=np.int64)
+            row_ids = self.row_ids
+            vectors = self.vectors
+
+        if not len(rows):
+            return []
+        scores = np.asarray(vectors[rows], dtype=np.float32) @ vector
+        order = np.argsort(-scores)
+        matches = []
+        for index in order:
+            result_id = row_ids[rows[index]]
+            if result_id in exclude:
+                continue
+            matches.append((result_id, float(scores[index])))
+            if len(matches) == limit:
+                break
+        return matches
+
+    def get_stats(self):
+        with self.lock:
+            return {'rows': len(self.row_ids), 'live': len(self.rows), 'generation': self.generation}
+
+def init_embedding_index():
+    if np is None:
+        logger.warning("NumPy not installed, similar-item search disabled")
+        return None
+    try:
+        return EmbeddingIndex(
+            app.config['EMBEDDING_FOLDER'],
+            app.config['EMBEDDING_DIM'],
+            app.config['EMBEDDING_LSH_TABLES'],
+            app.config['EMBEDDING_LSH_BITS']
+        )
+    except Exception as e:
+        logger.error(f"Embedding index initialization error: {str(e)}")
+        return None
+
+embedding_index = init_embedding_index()
+
+def embedding_text(result):
+    return "\n".join(filter(None, [
+        result.get('title'),
+        result.get('description'),
+        result.get('ai_summary'),
+        result.get('custom_notes'),
+        (result.get('search_content') or '')[:5000]
+    ]))
+
+def index_saved_results(query):
+    """Embed (or re-embed) the saved results matching a MongoDB query."""
+    if embedding_index is None:
+        return
+    try:
+        fields = {'title': 1, 'description': 1, 'ai_summary': 1, 'custom_notes': 1, 'search_content': 1}
+        for result in db.saved_results.find(query, fields):
+            embedding_index.upsert(str(result['_id']), embedding_text(result))
+    except Exception as e:
+        logger.error(f"Error updating embedding index: {str(e)}")
+
+def unindex_saved_results(result_ids):
+    if embedding_index is None:
+        return
+    try:
+        embedding_index.remove([str(result_id) for result_id in result_ids])
+    except Exception as e:
+        logger.error(f"Error removing from embedding index: {str(e)}")
+
+def rebuild_embedding_index():
+    """Embed saved results missing from the index and compact its files.
+
+    Skipped when every saved result is indexed and at most half the stored
+    rows are superseded or deleted.
+    """
+    if embedding_index is None:
+        return
+    try:
+        indexed = embedding_index.live_ids()
+        saved = {str(item['_id']) for item in db.saved_results.find({}, {'_id': 1})}
+        missing = saved - indexed
+        stats = embedding_index.get_stats()
+        if not missing and stats['rows'] <= 2 * stats['live']:
+            return
+
+        texts = {}
+        fields = {'title': 1, 'description': 1, 'ai_summary': 1, 'custom_notes': 1, 'search_content': 1}
+        missing = [ObjectId(result_id) for result_id in missing]
+        for start in range(0, len(missing), 500):
+            for result in db.saved_results.find({'_id': {'$in': missing[start:start + 500]}}, fields):
+                texts[str(result['_id'])] = embedding_text(result)
+
+        rows = embedding_index.rebuild(texts, stale=indexed - saved)
+        logger.info(f"Rebuilt embedding index: {rows} rows, {len(texts)} embedded")
+    except Exception as e:
+        logger.error(f"Error rebuilding embedding index: {str(e)}")
+
+def rank_by_folder(results, folder_id):
+    """Sort search results by similarity to the centroid of a folder's items."""
+    if embedding_index is None or not ObjectId.is_valid(folder_id):
+        return results
+
+    folder_vectors = embedding_index.vectors_for(
+        str(item['_id']) for item in db.saved_results.find({'folder_id': ObjectId(folder_id)}, {'_id': 1})
+    )
+    if folder_vectors is None:
+        return results
+
+    centroid = np.mean(folder_vectors, axis=0)
+    centroid /= np.linalg.norm(centroid) or 1.0
+    for result in results:
+        text = f"{result.get('title', '')}\n{result.get('description', '')}"
+        result['folder_relevance'] = round(float(embedding_index.embed(text) @ centroid), 4)
+    return sorted(results, key=lambda result: result['folder_relevance'], reverse=True)
+
+@app.before_request
+def start_request_span():
+    rule = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.request_span = tracer.start('route', f"{request.method} {rule}")
+    g.request_started = time.monotonic()
+
+@app.after_request
+def tag_request_span(response):
+    if 'request_span' in g:
+        span, _ = g.request_span
+        # Streamed responses have no length; their span ends once the stream is drained
+        span.set(status=response.status_code, bytes=response.calculate_content_length() or 0)
+        if response.status_code >= 500:
+            span.outcome = 'error'
+    return response
+
+@app.teardown_request
+def end_request_span(exc):
+    request_span = g.pop('request_span', None)
+    if request_span:
+        span, token = request_span
+        if exc is not None:
+            span.outcome = 'error'
+        tracer.end(span, token, time.monotonic() - g.pop('request_started'))
+
+# Flask Routes
+@app.route('/')
+def index():
+    return render_template('index.html')
+
+@app.route('/folders')
+def folders():
+    return render_template('folders.html')
+
+def search_page_params(form):
+    """Read ``query``, ``page_size`` and ``cursor`` from a search form.
+
+    Returns ``(query, limit, offsets)``, where offsets come from the cursor
+    (``next_cursor`` of the previous page) and are empty for a first page.
+    Raises ValueError for a malformed cursor or page size.
+    """
+    if form.get('cursor'):
+        return decode_search_cursor(form['cursor'])
+    limit = int(form.get('page_size', app.config['MAX_RESULTS_PER_SEARCH']))
+    if not 0 < limit <= app.config['SEARCH_MAX_PAGE_SIZE']:
+        raise ValueError('Page size out of range')
+    return form.get('query', ''), limit, {}
+
+@app.route('/search/<engine>', methods=['POST'])
+@handle_api_error
+def search(engine):
+    """Search one engine a page at a time.
+
+    Pass ``next_cursor`` from the response back as ``cursor`` for the next
+    page, which is prefetched in the background and usually served from cache.
+    """
+    if engine not in SEARCH_FUNCTIONS:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid search engine'
+        }), 400
+
+    try:
+        query, limit, offsets = search_page_params(request.form)
+    except (ValueError, KeyError, TypeError):
+        return jsonify({
+            'success': False,
+            'error': 'Invalid cursor or page size'
+        }), 400
+    offset = offsets.get(engine, 0)
+    logger.info(f"Search request received for engine: {engine}, query: {query}, offset: {offset}")
+
+    try:
+        results = cached_search(engine, query, offset, limit)
+        logger.info(f"Search completed for {engine}. Found {len(results)} results.")
+        following = next_offset(offset, limit, results)
+        search_prefetcher.schedule(engine, query, following, limit)
+        if request.form.get('folder_id'):
+            results = rank_by_folder([dict(result) for result in results], request.form['folder_id'])
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'engine': engine,
+            'next_cursor': encode_search_cursor(query, limit, {engine: following}) if following is not None else None
+        })
+    except APIError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/search', methods=['POST'])
+def search_all():
+    """Send one query to every requested engine concurrently.
+
+    Results are deduplicated across engines and returned as one list ranked
+    by reciprocal-rank fusion; send ``merge=false`` for per-engine lists.
+    Deduplication is per page. ``next_cursor`` continues every engine that
+    has more results (or timed out) from where this page stopped; pass it
+    back as ``cursor``.
+    """
+    try:
+        query, limit, offsets = search_page_params(request.form)
+    except (ValueError, KeyError, TypeError):
+        return jsonify({
+            'success': False,
+            'error': 'Invalid cursor or page size'
+        }), 400
+    engines = list(offsets) if offsets else request.form.getlist('engines') or list(SEARCH_FUNCTIONS)
+    logger.info(f"Federated search request received for engines: {engines}, query: {query}, offsets: {offsets}")
+
+    invalid_engines = [engine for engine in engines if engine not in SEARCH_FUNCTIONS]
+    if invalid_engines:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid search engine: {', '.join(invalid_engines)}"
+        }), 400
+
+    try:
+        deadline = float(request.form.get('deadline', app.config['SEARCH_DEADLINE']))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Deadline must be a number of seconds'
+        }), 400
+    deadline = min(max(deadline, 0.1), app.config['SEARCH_DEADLINE'])
+
+    started = time.monotonic()
+    results, errors, timed_out = federated_search(query, engines, deadline, offsets, limit)
+    elapsed = time.monotonic() - started
+
+    following = {engine: offsets.get(engine, 0) for engine in timed_out}
+    for engine, engine_results in results.items():
+        engine_offset = next_offset(offsets.get(engine, 0), limit, engine_results)
+        if engine_offset is not None:
+            following[engine] = engine_offset
+            search_prefetcher.schedule(engine, query, engine_offset, limit)
+    if request.form.get('merge', 'true').lower() != 'false':
+        results = merge_search_results(results)
+        if request.form.get('folder_id'):
+            results = rank_by_folder(results, request.form['folder_id'])
+    elif request.form.get('folder_id'):
+        results = {
+            engine: rank_by_folder([dict(result) for result in engine_results], request.form['folder_id'])
+            for engine, engine_results in results.items()
+        }
+    logger.info(
+        f"Federated search completed in {elapsed:.2f}s. "
+        f"Results: {len(results)}, timed out: {timed_out}, failed: {list(errors)}"
+    )
+
+    return jsonify({
+        'success': True,
+        'results': results,
+        'errors': errors,
+        'timed_out': timed_out,
+        'elapsed': round(elapsed, 3),
+        'next_cursor': encode_search_cursor(query, limit, following) if following else None
+    })
+
+def page_limit(args, default, maximum):
+    """``limit`` from the query string, clamped to ``1..maximum``.
+
+    Raises ValueError when it is not an integer.
+    """
+    return max(1, min(int(args.get('limit', default)), maximum))
+
+def encode_history_cursor(message):
+    raw = f"{message['timestamp'].isoformat()}|{message['_id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_history_cursor(cursor):
+    timestamp, message_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+    return datetime.fromisoformat(timestamp), ObjectId(message_id)
+
+def history_after(timestamp, message_id):
+    """Keyset filter for chat messages strictly after ``(timestamp, _id)``."""
+    return {'$or': [
+        {'timestamp': {'$gt': timestamp}},
+        {'timestamp': timestamp, '_id': {'$gt': message_id}}
+    ]}
+
+@app.route('/api/chat/history/<folder_id>', methods=['GET'])
+def get_chat_history(folder_id):
+    """Return a page of chat history, newest page first.
+
+    Messages within a page are in chronological order. Pass ``next_cursor``
+    back as ``before`` to fetch the next older page.
+    """
+    try:
+        if not ObjectId.is_valid(folder_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid folder ID format'
+            }), 400
+
+        try:
+            limit = page_limit(
+                request.args, app.config['CHAT_HISTORY_PAGE_SIZE'], app.config['CHAT_HISTORY_MAX_PAGE_SIZE']
+            )
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid limit'
+            }), 400
+
+        query = {'folder_id': ObjectId(folder_id)}
+        before = request.args.get('before')
+        if before:
+            try:
+                timestamp, message_id = decode_history_cursor(before)
+            except Exception:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid cursor'
+                }), 400
+            query['$or'] = [
+                {'timestamp': {'$lt': timestamp}},
+                {'timestamp': timestamp, '_id': {'$lt': message_id}}
+            ]
+
+        # Fetch one extra row to learn whether an older page exists
+        messages = list(db.chat_messages.find(query).sort(
+            [('timestamp', -1), ('_id', -1)]
+        ).limit(limit + 1))
+        next_cursor = encode_history_cursor(messages[limit - 1]) if len(messages) > limit else None
+        messages = messages[:limit][::-1]
+
+        processed_messages = []
+        for message in messages:
+            processed_message = {
+                'id': str(message['_id']),
+                'content': message['content'],
+                'type': message['type'],
+                'timestamp': message['timestamp'].isoformat(),
+                'ai_provider': message.get('ai_provider', 'unknown')
+            }
+            processed_messages.append(processed_message)
+
+        return jsonify({
+            'success': True,
+            'messages': processed_messages,
+            'next_cursor': next_cursor
+        })
+
+    except Exception as e:
+        logger.error(f"Error fetching chat history: {str(e)}")
+        return json.loads(json_util.dumps({
+            'success': False,
+            'error': str(e)
+        })), 500
+
+class LLMProviderHealth:
+    """Recent latency, error rate, circuit breaker and concurrency slots for one LLM provider."""
+
+    def __init__(self, concurrency, samples, error_decay):
+        self.breaker = CircuitBreaker(
+            app.config['BREAKER_FAILURE_THRESHOLD'],
+            app.config['BREAKER_RESET_TIMEOUT']
+        )
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.latencies = defaultdict(lambda: deque(maxlen=samples))
+        self.error_rate = 0.0
+        self.error_decay = error_decay
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        acquired = self.slots.acquire(timeout=timeout) if timeout else self.slots.acquire(blocking=False)
+        if acquired:
+            with self.lock:
+                self.in_flight += 1
+        return acquired
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def record(self, key, latency=None, success=True):
+        with self.lock:
+            self.error_rate = self.error_rate * (1 - self.error_decay) + (0.0 if success else self.error_decay)
+            if success and latency is not None:
+                self.latencies[key].append(latency)
+        if success:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def percentile(self, key, fraction, min_samples=1):
+        with self.lock:
+            samples = sorted(self.latencies[key])
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def expected_latency(self, key):
+        """Median latency inflated by the recent error rate, or None without samples."""
+        median = self.percentile(key, 0.5)
+        if median is None:
+            return None
+        return median / max(0.05, 1 - self.error_rate)
+
+    def get_state(self):
+        with self.lock:
+            latencies = {
+                f"{route}/{kind}": samples
+                for (route, kind), samples in self.latencies.items()
+            }
+            state = {
+                'in_flight': self.in_flight,
+                'concurrency': self.concurrency,
+                'error_rate': round(self.error_rate, 3)
+            }
+        state['latency_p95_ms'] = {
+            key: round(sorted(samples)[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000, 1)
+            for key, samples in latencies.items() if samples
+        }
+        return {**state, **self.breaker.get_state()}
+
+class LLMGateway:
+    """Single entry point for LLM calls across Claude and OpenAI.
+
+    Prompts are split into a static part (``system`` plus ``instructions``)
+    and a dynamic ``prompt``, and the static part is sent first. No cache
+    markers are set: every static part here is well under the providers'
+    minimum cacheable prefix (about 1024 tokens). Cache reads and writes are
+    still counted whenever a provider reports them in its usage.
+
+    Providers are tried in ``LLM_PROVIDER_ORDER`` unless another one's recent
+    median latency, inflated by its error rate, is ``LLM_SWITCH_RATIO`` times
+    better. Each provider has its own timeout, concurrency slots and circuit
+    breaker; a saturated or open provider is skipped. When the first provider
+    has not answered (or streamed its first token) within its observed p95,
+    the next one is started as a hedge and whichever answers first wins.
+    Failures fall through to the next provider immediately.
+
+    Token counts, cache reads and writes, and latency (time to first token
+    for streams) are recorded per route and provider. ``input_tokens``
+    excludes cache reads for both providers.
+    """
+
+    LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, anthropic_client, openai_client, anthropic_model, openai_model):
+        retries = app.config['LLM_MAX_RETRIES']
+        self.anthropic_client = anthropic_client.with_options(max_retries=retries)
+        self.openai_client = openai_client.with_options(max_retries=retries)
+        self.anthropic_model = anthropic_model
+        self.openai_model = openai_model
+        self.order = [AIProvider(provider) for provider in app.config['LLM_PROVIDER_ORDER']]
+        self.timeouts = app.config['LLM_TIMEOUTS']
+        self.health = {
+            provider: LLMProviderHealth(
+                app.config['LLM_CONCURRENCY'][provider.value],
+                app.config['LLM_LATENCY_SAMPLES'],
+                app.config['LLM_ERROR_DECAY']
+            )
+            for provider in self.order
+        }
+        self.executor = ThreadPoolExecutor(
+            max_workers=sum(health.concurrency for health in self.health.values()),
+            thread_name_prefix='llm'
+        )
+        self.stats = defaultdict(lambda: {
+            'calls': 0,
+            'errors': 0,
+            'cancelled': 0,
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'cache_read_tokens': 0,
+            'cache_write_tokens': 0,
+            'total_latency': 0.0,
+            'latency_histogram': [0] * (len(self.LATENCY_BUCKETS) + 1),
+            'first_token_histogram': [0] * (len(self.LATENCY_BUCKETS) + 1)
+        })
+        self.hedges = defaultdict(lambda: {'hedged': 0, 'hedge_wins': 0})
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def join_static(system, instructions):
+        return f"{system}\n\n{instructions}" if instructions else system
+
+    def anthropic_request(self, prompt, system, instructions, max_tokens, temperature):
+        return {
+            'model': self.anthropic_model,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'timeout': self.timeouts[AIProvider.ANTHROPIC.value],
+            'system': self.join_static(system, instructions),
+            'messages': [{'role': 'user', 'content': prompt}]
+        }
+
+    def openai_request(self, prompt, system, instructions, max_tokens, temperature):
+        return {
+            'model': self.openai_model,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'timeout': self.timeouts[AIProvider.OPENAI.value],
+            'messages': [
+                {'role': 'system', 'content': self.join_static(system, instructions)},
+                {'role': 'user', 'content': prompt}
+            ]
+        }
+
+    def record(self, route, provider, latency, usage=None, first_token=None, error=False, cancelled=False):
+        with self.lock:
+            stats = self.stats[(route, provider)]
+            if cancelled:
+                stats['cancelled'] += 1
+                return
+            stats['calls'] += 1
+            if error:
+                stats['errors'] += 1
+                return
+            stats['total_latency'] += latency
+            stats['latency_histogram'][bisect.bisect_left(self.LATENCY_BUCKETS, latency)] += 1
+            if first_token is not None:
+                stats['first_token_histogram'][bisect.bisect_left(self.LATENCY_BUCKETS, first_token)] += 1
+            for field, count in (usage or {}).items():
+                stats[field] += count or 0
+
+    @staticmethod
+    def anthropic_usage(usage):
+        return {
+            'input_tokens': getattr(usage, 'input_tokens', 0),
+            'output_tokens': getattr(usage, 'output_tokens', 0),
+            'cache_read_tokens': getattr(usage, 'cache_read_input_tokens', 0),
+            'cache_write_tokens': getattr(usage, 'cache_creation_input_tokens', 0)
+        }
+
+    @staticmethod
+    def openai_usage(usage):
+        if usage is None:
+            return {}
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = (getattr(details, 'cached_tokens', 0) or 0) if details else 0
+        return {
+            'input_tokens': usage.prompt_tokens - cached,
+            'output_tokens': usage.completion_tokens,
+            'cache_read_tokens': cached
+        }
+
+    def runners(self, streaming, prompt, system, openai_system, instructions,
+                max_tokens, openai_max_tokens, temperature):
+        """Per-provider generators that yield text and return the usage dict."""
+        anthropic_args = self.anthropic_request(prompt, system, instructions, max_tokens, temperature)
+        openai_args = self.openai_request(prompt, openai_system or system, instructions, openai_max_tokens, temperature)
+
+        def anthropic_complete(cancelled):
+            response = self.anthropic_client.messages.create(**anthropic_args)
+            yield response.content[0].text
+            return self.anthropic_usage(response.usage)
+
+        def anthropic_stream(cancelled):
+            with self.anthropic_client.messages.stream(**anthropic_args) as stream:
+                for text in stream.text_stream:
+                    if cancelled.is_set():
+                        return None
+                    yield text
+                return self.anthropic_usage(stream.get_final_message().usage)
+
+        def openai_complete(cancelled):
+            response = self.openai_client.chat.completions.create(**openai_args)
+            yield response.choices[0].message.content
+            return self.openai_usage(response.usage)
+
+        def openai_stream(cancelled):
+            usage = None
+            stream = self.openai_client.chat.completions.create(
+                **openai_args,
+                stream=True,
+                stream_options={'include_usage': True}
+            )
+            try:
+                for chunk in stream:
+                    if cancelled.is_set():
+                        return None
+                    if chunk.usage:
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.close()
+            return self.openai_usage(usage)
+
+        if streaming:
+            return {AIProvider.ANTHROPIC: anthropic_stream, AIProvider.OPENAI: openai_stream}
+        return {AIProvider.ANTHROPIC: anthropic_complete, AIProvider.OPENAI: openai_complete}
+
+    def rank_providers(self, key):
+        """Configured order, unless another provider is clearly faster lately."""
+        primary = self.order[0]
+        for candidate in self.order[1:]:
+            primary_latency = self.health[primary].expected_latency(key)
+            candidate_latency = self.health[candidate].expected_latency(key)
+            if primary_latency is not None and candidate_latency is not None \
+                    and primary_latency > app.config['LLM_SWITCH_RATIO'] * candidate_latency:
+                primary = candidate
+        return [primary] + [provider for provider in self.order if provider != primary]
+
+    def hedge_delay(self, provider, key):
+        if not app.config['LLM_HEDGE_ENABLED']:
+            return None
+        p95 = self.health[provider].percentile(key, 0.95, app.config['LLM_HEDGE_MIN_SAMPLES'])
+        if p95 is None:
+            return None
+        return max(app.config['LLM_HEDGE_MIN_DELAY'], p95)
+
+    def run_attempt(self, route, key, provider, runner, events, cancelled):
+        with tracer.span('llm', f"{provider.value} {route}") as span:
+            self._run_attempt(route, key, provider, runner, events, cancelled, span)
+
+    def _run_attempt(self, route, key, provider, runner, events, cancelled, span):
+        health = self.health[provider]
+        started = time.monotonic()
+        first_token = None
+        usage = None
+        output_bytes = 0
+        try:
+            iterator = runner(cancelled)
+            while True:
+                try:
+                    text = next(iterator)
+                except StopIteration as stop:
+                    usage = stop.value
+                    break
+                if first_token is None:
+                    first_token = time.monotonic() - started
+                output_bytes += len(text.encode('utf-8'))
+                events.put((provider, 'token', text))
+        except Exception as e:
+            if cancelled.is_set():
+                # A cancel says nothing about health; free a half-open probe
+                span.outcome = 'cancelled'
+                health.breaker.release_probe()
+                self.record(route, provider, 0, cancelled=True)
+            else:
+                span.outcome = 'error'
+                health.record(key, success=False)
+                self.record(route, provider, time.monotonic() - started, error=True)
+                events.put((provider, 'error', e))
+            return
+        finally:
+            health.release()
+
+        span.set(bytes=output_bytes, first_token_ms=round(first_token * 1000, 1) if first_token is not None else None)
+        if cancelled.is_set() and usage is None:
+            # Stream abandoned part way; a finished losing attempt still counts
+            span.outcome = 'cancelled'
+            health.breaker.release_probe()
+            self.record(route, provider, 0, cancelled=True)
+            return
+        span.set(**(usage or {}))
+        latency = time.monotonic() - started
+        health.record(key, first_token if first_token is not None else latency)
+        self.record(route, provider, latency, usage,
+                    first_token if key[1] == 'stream' else None)
+        events.put((provider, 'done', None))
+
+    def launch(self, route, key, provider, runner, events, cancelled, wait_for_slot=False):
+        """Start one attempt; returns ``started``, ``saturated`` or ``unavailable``."""
+        health = self.health[provider]
+        if not health.acquire(app.config['LLM_QUEUE_TIMEOUT'] if wait_for_slot else None):
+            return 'saturated'
+        if not health.breaker.allow():
+            health.release()
+            return 'unavailable'
+        self.executor.submit(
+            contextvars.copy_context().run, self.run_attempt, route, key, provider, runner, events, cancelled
+        )
+        return 'started'
+
+    def attempts(self, route, streaming, runners):
+        """Yield ``(provider, text)`` from whichever provider answers first."""
+        key = (route, 'stream' if streaming else 'complete')
+        candidates = self.rank_providers(key)
+        events = queue.Queue()
+        cancelled = {}
+        live = []
+        hedged = set()
+        committed = None
+
+        def start_next():
+            # Saturated providers are only waited on when nothing else is running
+            for wait_for_slot in (False, True):
+                if wait_for_slot and live:
+                    return None
+                for provider in list(candidates):
+                    flag = threading.Event()
+                    outcome = self.launch(route, key, provider, runners[provider], events, flag, wait_for_slot)
+                    if outcome == 'started':
+                        candidates.remove(provider)
+                        cancelled[provider] = flag
+                        live.append(provider)
+                        return provider
+                    if outcome == 'unavailable' or wait_for_slot:
+                        candidates.remove(provider)
+            return None
+
+        try:
+            primary = start_next()
+            if primary is None:
+                raise UpstreamUnavailable('No LLM provider is available')
+            hedge_delay = self.hedge_delay(primary, key)
+            hedge_at = time.monotonic() + hedge_delay if hedge_delay is not None else None
+
+            while True:
+                timeout = None
+                if committed is None and hedge_at is not None and candidates:
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                try:
+                    provider, kind, value = events.get(timeout=timeout)
+                except queue.Empty:
+                    hedge_at = None
+                    hedge = start_next()
+                    if hedge is not None:
+                        hedged.add(hedge)
+                        with self.lock:
+                            self.hedges[route]['hedged'] += 1
+                        logger.info(f"Hedging {route} on {hedge.value} after {hedge_delay:.2f}s")
+                    continue
+
+                if committed is not None and provider != committed:
+                    continue
+                if kind == 'error':
+                    live.remove(provider)
+                    if provider == committed:
+                        raise value
+                    logger.error(f"LLM provider {provider.value} failed on {route}: {str(value)}")
+                    if not live and start_next() is None:
+                        raise value
+                    continue
+
+                if committed is None:
+                    committed = provider
+                    for other, flag in cancelled.items():
+                        if other != provider:
+                            flag.set()
+                    if provider in hedged:
+                        with self.lock:
+                            self.hedges[route]['hedge_wins'] += 1
+                if kind == 'done':
+                    return
+                yield provider, value
+        finally:
+            # Stops losing attempts, and the winner too if the caller went away
+            for flag in cancelled.values():
+                flag.set()
+
+    def complete(self, route, prompt, system, openai_system=None, instructions=None,
+                 max_tokens=1000, openai_max_tokens=500, temperature=0.7):
+        """Return ``(provider, text)``. Raises if every provider fails."""
+        runners = self.runners(False, prompt, system, openai_system, instructions,
+                               max_tokens, openai_max_tokens, temperature)
+        provider_used = None
+        chunks = []
+        for provider_used, text in self.attempts(route, False, runners):
+            chunks.append(text)
+        return provider_used, ''.join(chunks)
+
+    def stream(self, route, prompt, system, openai_system=None, instructions=None,
+               max_tokens=1000, openai_max_tokens=500, temperature=0.7):
+        """Yield ``(provider, text)`` chunks from the first provider to start streaming.
+
+        Falling back or hedging only happens before the first token; errors
+        after it are raised to the caller.
+        """
+        runners = self.runners(True, prompt, system, openai_system, instructions,
+                               max_tokens, openai_max_tokens, temperature)
+        yield from self.attempts(route, True, runners)
+
+    def get_stats(self):
+        labels = [f"le_{bound}" for bound in self.LATENCY_BUCKETS] + ['le_inf']
+        with self.lock:
+            routes = defaultdict(dict)
+            for (route, provider), route_stats in self.stats.items():
+                succeeded = route_stats['calls'] - route_stats['errors']
+                routes[route][provider.value] = {
+                    'calls': route_stats['calls'],
+                    'errors': route_stats['errors'],
+                    'cancelled': route_stats['cancelled'],
+                    'input_tokens': route_stats['input_tokens'],
+                    'output_tokens': route_stats['output_tokens'],
+                    'cache_read_tokens': route_stats['cache_read_tokens'],
+                    'cache_write_tokens': route_stats['cache_write_tokens'],
+                    'avg_latency_ms': round(route_stats['total_latency'] / succeeded * 1000, 1) if succeeded else 0.0,
+                    'latency_histogram': dict(zip(labels, route_stats['latency_histogram'])),
+                    'first_token_histogram': dict(zip(labels, route_stats['first_token_histogram']))
+                }
+            for route, hedge_stats in self.hedges.items():
+                routes[route].update(hedge_stats)
+        return {
+            'routes': dict(routes),
+            'providers': {provider.value: health.get_state() for provider, health in self.health.items()}
+        }
+
+llm_gateway = LLMGateway(
+    anthropic_client,
+    openai_client,
+    app.config['ANTHROPIC_MODEL'],
+    app.config['OPENAI_MODEL']
+)
+
+CHAT_SYSTEM_PROMPT = "You are a specialized research assistant with expertise in academic analysis and scientific research. You excel at synthesizing information, identifying patterns, and providing insightful, well-structured responses."
+CHAT_OPENAI_SYSTEM_PROMPT = "You are a specialized research assistant with expertise in academic analysis and scientific research."
+CHAT_INSTRUCTIONS = """You are a highly knowledgeable research assistant analyzing the contents of a research folder.
+Your expertise spans academic research, scientific papers, and data analysis.
 
 Your capabilities and responsibilities include:
 
@@ -490,78 +2683,379 @@ Your capabilities and responsibilities include:
    - Identifying conflicting results
    - Suggesting resolutions for contradictions
 
-5. Research Support:
-   - Suggesting related research areas
-   - Recommending additional sources
-   - Helping formulate research questions
-   - Providing literature review insights
+5. Research Support:
+   - Suggesting related research areas
+   - Recommending additional sources
+   - Helping formulate research questions
+   - Providing literature review insights
+
+Each request gives the research materials in the current folder, the previous conversation and the user's question.
+
+Please provide a detailed, well-structured response that:
+- Directly addresses the user's question
+- References specific papers and findings where relevant
+- Maintains academic rigor and precision
+- Indicates any limitations in the available information
+- Suggests follow-up areas if needed
+
+Format your response with clear sections, bullet points where appropriate, and specific references to the research materials."""
+SUMMARY_SYSTEM_PROMPT = "You are a research assistant specializing in creating clear, accurate summaries of academic papers. Focus on extracting and explaining the key points concisely."
+SUMMARY_OPENAI_SYSTEM_PROMPT = "You are a helpful AI assistant specializing in summarizing academic papers clearly and concisely."
+SUMMARY_INSTRUCTIONS = """Please provide a concise summary of the research paper given by the user.
+
+Please format the summary in the following structure:
+1. Main objective: (2-3 sentences about the paper's main goal)
+2. Key findings: (2-3 sentences about the main results)
+3. Significance: (2-3 sentences about why this matters)
+4. Disruption: (2-3 sentences about how this might be disruptive to current processes)"""
+
+def sse_event(data, event=None):
+    """Format a server-sent event with a JSON payload."""
+    prefix = f"event: {event}\n" if event else ''
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def touch_folder(folder_ids):
+    """Bump ``updated_at`` on folders whose contents changed.
+
+    Per-folder caches compare against this timestamp, which keeps them
+    consistent across worker processes.
+    """
+    if not isinstance(folder_ids, (list, set, tuple)):
+        folder_ids = [folder_ids]
+    try:
+        db.folders.update_many(
+            {'_id': {'$in': [ObjectId(folder_id) for folder_id in folder_ids]}},
+            {'$set': {'updated_at': datetime.utcnow()}}
+        )
+    except Exception as e:
+        logger.error(f"Error touching folders: {str(e)}")
+
+class FolderContextBuilder:
+    """Retrieval-based chat context for a folder.
+
+    Folder items are split into overlapping word chunks and scored against
+    the question with BM25. The best chunks are packed into a token budget,
+    approximating 4 characters per token. Chunked folders are cached per
+    process and rebuilt when the folder's ``updated_at`` changes.
+    """
+
+    def __init__(self, chunk_words, overlap_words, max_folders=64, k1=1.5, b=0.75):
+        self.chunk_words = chunk_words
+        self.overlap_words = overlap_words
+        self.max_folders = max_folders
+        self.k1 = k1
+        self.b = b
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def terms(text):
+        return re.findall(r'[a-z0-9]+', (text or '').lower())
+
+    def chunk_item(self, item):
+        header = "\n".join(filter(None, [
+            f"Title: {item.get('title', '')}",
+            f"Summary: {item['ai_summary']}" if item.get('ai_summary') else None,
+            f"Notes: {item['custom_notes']}" if item.get('custom_notes') else None,
+            f"Description: {item['description']}" if item.get('description') else None
+        ]))
+        chunks = [header]
+        words = (item.get('search_content') or '').split()
+        step = self.chunk_words - self.overlap_words
+        for start in range(0, len(words), step):
+            chunks.append(' '.join(words[start:start + self.chunk_words]))
+            if start + self.chunk_words >= len(words):
+                break
+        return chunks
+
+    def load(self, folder_id):
+        folder = db.folders.find_one({'_id': ObjectId(folder_id)}, {'updated_at': 1})
+        version = folder.get('updated_at') if folder else None
+        with self.lock:
+            cached = self.cache.get(folder_id)
+            if cached and cached['version'] == version:
+                self.cache.move_to_end(folder_id)
+                return cached
+
+        chunks = []
+        items = db.saved_results.find(
+            {'folder_id': ObjectId(folder_id)},
+            {'title': 1, 'ai_summary': 1, 'custom_notes': 1, 'description': 1, 'search_content': 1}
+        ).sort([('saved_at', 1), ('_id', 1)])
+        for item_index, item in enumerate(items):
+            for chunk_index, text in enumerate(self.chunk_item(item)):
+                term_counts = defaultdict(int)
+                for term in self.terms(text):
+                    term_counts[term] += 1
+                chunks.append({
+                    'item': item_index,
+                    'title': item.get('title', ''),
+                    'position': chunk_index,
+                    'text': text,
+                    'terms': term_counts,
+                    'length': sum(term_counts.values())
+                })
+
+        document_frequency = defaultdict(int)
+        for chunk in chunks:
+            for term in chunk['terms']:
+                document_frequency[term] += 1
+        entry = {
+            'version': version,
+            'chunks': chunks,
+            'df': document_frequency,
+            'avg_length': (sum(chunk['length'] for chunk in chunks) / len(chunks)) if chunks else 0
+        }
+
+        with self.lock:
+            self.cache[folder_id] = entry
+            self.cache.move_to_end(folder_id)
+            while len(self.cache) > self.max_folders:
+                self.cache.popitem(last=False)
+        return entry
+
+    def invalidate(self, folder_id):
+        with self.lock:
+            self.cache.pop(folder_id, None)
+
+    def score(self, entry, chunk, query_terms):
+        total = len(entry['chunks'])
+        score = 0.0
+        for term in query_terms:
+            frequency = chunk['terms'].get(term)
+            if not frequency:
+                continue
+            idf = math.log(1 + (total - entry['df'][term] + 0.5) / (entry['df'][term] + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * chunk['length'] / (entry['avg_length'] or 1))
+            score += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return score
+
+    def build(self, folder_id, question, token_budget):
+        """Return the folder context for a question, within ``token_budget`` tokens."""
+        entry = self.load(folder_id)
+        query_terms = set(self.terms(question))
+        ranked = sorted(
+            entry['chunks'],
+            # Item headers first among equals, so broad questions still see every item
+            key=lambda chunk: (self.score(entry, chunk, query_terms), chunk['position'] == 0),
+            reverse=True
+        )
+
+        budget = token_budget * 4
+        selected = []
+        for chunk in ranked:
+            if len(chunk['text']) + 2 > budget:
+                continue
+            selected.append(chunk)
+            budget -= len(chunk['text']) + 2
+
+        # Present the chosen chunks in folder order, grouped by item
+        selected.sort(key=lambda chunk: (chunk['item'], chunk['position']))
+        sections = []
+        last_item = None
+        for chunk in selected:
+            if chunk['position'] and chunk['item'] != last_item:
+                sections.append(f"Title: {chunk['title']}")
+            sections.append(chunk['text'])
+            last_item = chunk['item']
+        return "\n\n".join(sections)
+
+folder_context = FolderContextBuilder(
+    app.config['CHAT_CONTEXT_CHUNK_WORDS'],
+    app.config['CHAT_CONTEXT_OVERLAP_WORDS']
+)
+
+def format_chat_turn(message):
+    return f"{'User' if message['type'] == 'user' else 'Assistant'}: {message['content']}"
+
+def load_chat_window(folder_id):
+    """Return prompt lines for a folder's conversation so far.
+
+    Turns already folded into the folder's rolling summary are represented
+    by that summary; the newest remaining turns follow verbatim, trimmed
+    oldest-first to ``CHAT_HISTORY_TOKENS`` (about 4 characters per token).
+    The newest turn is always kept, cut to the budget if it is longer.
+    """
+    folder = db.folders.find_one({'_id': ObjectId(folder_id)}, {'chat_summary': 1}) or {}
+    summary = folder.get('chat_summary') or {}
+
+    query = {'folder_id': ObjectId(folder_id)}
+    if summary.get('through_id'):
+        query.update(history_after(summary['through_timestamp'], summary['through_id']))
+    recent = db.chat_messages.find(query, {'content': 1, 'type': 1}).sort(
+        [('timestamp', -1), ('_id', -1)]
+    ).limit(app.config['CHAT_HISTORY_MESSAGES'])
+
+    budget = app.config['CHAT_HISTORY_TOKENS'] * 4
+    lines = []
+    for message in recent:
+        line = format_chat_turn(message)
+        if len(line) > budget:
+            if not lines:
+                lines.append(line[:budget - 3] + '...')
+            break
+        lines.append(line)
+        budget -= len(line) + 1
+    lines.reverse()
+
+    if summary.get('text'):
+        lines.insert(0, f"Summary of earlier conversation: {summary['text']}")
+    return lines
+
+def summarize_chat_turns(previous_summary, turns):
+    """Fold older chat turns into the running summary. Raises if both providers fail."""
+    prompt = (
+        "Update the running summary of a research conversation with the turns below. "
+        "Keep the questions asked, conclusions reached, papers referenced and open threads. "
+        "Reply with the updated summary only, in at most 200 words.\n\n"
+        f"Current summary:\n{previous_summary or '(none)'}\n\n"
+        "New turns:\n" + "\n".join(format_chat_turn(turn) for turn in turns)
+    )
+    _, summary = llm_gateway.complete(
+        'chat_summary', prompt, CHAT_SYSTEM_PROMPT, CHAT_OPENAI_SYSTEM_PROMPT,
+        max_tokens=400, openai_max_tokens=400, temperature=0.3
+    )
+    return summary
+
+class ChatHistorySummarizer:
+    """Background roll-up of older chat turns into a per-folder summary.
+
+    Once more than ``CHAT_HISTORY_MESSAGES`` turns sit after the summary
+    boundary, all but the newest ``CHAT_SUMMARY_KEEP`` are folded into the
+    summary stored on the folder, so prompt size stays constant however long
+    the conversation runs. The boundary is updated with a compare-and-set,
+    so concurrent workers cannot fold the same turns twice.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat-summary')
+        self.in_flight = set()
+        self.lock = threading.Lock()
+
+    def schedule(self, folder_id):
+        with self.lock:
+            if folder_id in self.in_flight:
+                return
+            self.in_flight.add(folder_id)
+        self.executor.submit(self.roll, folder_id)
+
+    def roll(self, folder_id):
+        try:
+            folder = db.folders.find_one({'_id': ObjectId(folder_id)}, {'chat_summary': 1})
+            if not folder:
+                return
+            summary = folder.get('chat_summary') or {}
+            query = {'folder_id': ObjectId(folder_id)}
+            if summary.get('through_id'):
+                query.update(history_after(summary['through_timestamp'], summary['through_id']))
+
+            pending = db.chat_messages.count_documents(query, limit=app.config['CHAT_HISTORY_MESSAGES'] + 1)
+            if pending <= app.config['CHAT_HISTORY_MESSAGES']:
+                return
+
+            turns = list(db.chat_messages.find(query, {'content': 1, 'type': 1, 'timestamp': 1}).sort(
+                [('timestamp', 1), ('_id', 1)]
+            ).limit(pending - app.config['CHAT_SUMMARY_KEEP']))
+            text = summarize_chat_turns(summary.get('text'), turns)
+
+            db.folders.update_one(
+                {'_id': ObjectId(folder_id), 'chat_summary.through_id': summary.get('through_id')},
+                {'$set': {'chat_summary': {
+                    'text': text,
+                    'through_timestamp': turns[-1]['timestamp'],
+                    'through_id': turns[-1]['_id'],
+                    'updated_at': datetime.utcnow()
+                }}}
+            )
+            logger.info(f"Folded {len(turns)} chat turns into the summary for folder {folder_id}")
+        except Exception as e:
+            logger.error(f"Error summarizing chat history for folder {folder_id}: {str(e)}")
+        finally:
+            with self.lock:
+                self.in_flight.discard(folder_id)
+
+chat_summarizer = ChatHistorySummarizer()
+
+def build_chat_prompt(message, folder_id):
+    """Build the per-request part of the chat prompt; ``CHAT_INSTRUCTIONS`` is the static part."""
+    # Pull the folder passages most relevant to the question
+    context = folder_context.build(folder_id, message, app.config['CHAT_CONTEXT_TOKENS'])
+
+    # Rolling summary of older turns plus the most recent ones verbatim
+    chat_context = "\n".join(load_chat_window(folder_id))
 
-Current User Question: {message}
+    return f"""Research Materials in Current Folder:
+{context}
 
-Please provide a detailed, well-structured response that:
-- Directly addresses the user's question
-- References specific papers and findings where relevant
-- Maintains academic rigor and precision
-- Indicates any limitations in the available information
-- Suggests follow-up areas if needed
+Previous Conversation:
+{chat_context}
 
-Format your response with clear sections, bullet points where appropriate, and specific references to the research materials."""
+Current User Question: {message}"""
+
+def save_chat_exchange(folder_id, message, ai_response, provider_used):
+    """Persist a user message and the assistant's reply."""
+    timestamp = datetime.utcnow()
+    message_data = {
+        'folder_id': ObjectId(folder_id),
+        'timestamp': timestamp,
+        'ai_provider': provider_used
+    }
+    
+    # Save user message
+    db.chat_messages.insert_one({
+        **message_data,
+        'content': message,
+        'type': 'user'
+    })
+    
+    # Save assistant response
+    db.chat_messages.insert_one({
+        **message_data,
+        'content': ai_response,
+        'type': 'assistant'
+    })
+    metrics_snapshot.adjust('chat_messages', 2)
+    chat_summarizer.schedule(folder_id)
+
+@app.route('/api/chat/message', methods=['POST'])
+def send_chat_message():
+    try:
+        data = request.get_json()
+        message = data.get('message')
+        folder_id = data.get('folderId')
+        
+        logger.debug(f"Received message request for folder: {folder_id}")
+        
+        if not message or not folder_id:
+            return jsonify({
+                'success': False,
+                'error': 'Message and folder ID are required'
+            }), 400
+
+        with tracer.span('internal', 'build_chat_prompt'):
+            prompt = build_chat_prompt(message, folder_id)
 
         try:
-            # Use Claude for research chat
-            response = anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=1000,
-                temperature=0.7,
-                system="You are a specialized research assistant with expertise in academic analysis and scientific research. You excel at synthesizing information, identifying patterns, and providing insightful, well-structured responses.",
-                messages=[{"role": "user", "content": prompt}]
+            provider_used, ai_response = llm_gateway.complete(
+                'chat', prompt, CHAT_SYSTEM_PROMPT, CHAT_OPENAI_SYSTEM_PROMPT, instructions=CHAT_INSTRUCTIONS
             )
-            ai_response = response.content[0].text
-            provider_used = AIProvider.ANTHROPIC
-            
         except Exception as e:
-            logger.error(f"Anthropic API error: {str(e)}")
-            # Fallback to OpenAI
-            try:
-                response = openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a specialized research assistant with expertise in academic analysis and scientific research."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=500,
-                    temperature=0.7
-                )
-                ai_response = response.choices[0].message.content
-                provider_used = AIProvider.OPENAI
-            except Exception as openai_error:
-                logger.error(f"OpenAI API error: {str(openai_error)}")
-                return jsonify({
-                    'success': False,
-                    'error': 'Failed to generate response from both AI providers'
-                }), 500
+            logger.error(f"Chat generation failed: {str(e)}")
+            return jsonify({
+                'success': False,
+                'error': 'Failed to generate response from both AI providers'
+            }), 500
 
         # Save messages to database
-        timestamp = datetime.utcnow()
-        message_data = {
-            'folder_id': ObjectId(folder_id),
-            'timestamp': timestamp,
-            'ai_provider': provider_used
-        }
-        
-        # Save user message
-        db.chat_messages.insert_one({
-            **message_data,
-            'content': message,
-            'type': 'user'
-        })
-        
-        # Save assistant response
-        db.chat_messages.insert_one({
-            **message_data,
-            'content': ai_response,
-            'type': 'assistant'
-        })
+        with tracer.span('internal', 'save_chat_exchange'):
+            save_chat_exchange(folder_id, message, ai_response, provider_used)
 
         return jsonify({
             'success': True,
@@ -576,6 +3070,52 @@ Format your response with clear sections, bullet points where appropriate, and s
             'error': str(e)
         }), 500
 
+@app.route('/api/chat/message/stream', methods=['POST'])
+def stream_chat_message():
+    """Stream the assistant reply as server-sent events.
+
+    Emits ``data: {"token": ...}`` per chunk, then a ``done`` event once the
+    exchange has been saved, or an ``error`` event if generation fails.
+    """
+    try:
+        data = request.get_json()
+        message = data.get('message')
+        folder_id = data.get('folderId')
+
+        if not message or not folder_id:
+            return jsonify({
+                'success': False,
+                'error': 'Message and folder ID are required'
+            }), 400
+
+        with tracer.span('internal', 'build_chat_prompt'):
+            prompt = build_chat_prompt(message, folder_id)
+    except Exception as e:
+        logger.error(f"Error processing chat message: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    def generate():
+        chunks = []
+        provider_used = None
+        try:
+            for provider_used, text in llm_gateway.stream(
+                'chat', prompt, CHAT_SYSTEM_PROMPT, CHAT_OPENAI_SYSTEM_PROMPT, instructions=CHAT_INSTRUCTIONS
+            ):
+                chunks.append(text)
+                yield sse_event({'token': text})
+
+            with tracer.span('internal', 'save_chat_exchange'):
+                save_chat_exchange(folder_id, message, ''.join(chunks), provider_used)
+            yield sse_event({'provider': provider_used}, event='done')
+        except Exception as e:
+            logger.error(f"Error streaming chat message: {str(e)}")
+            yield sse_event({'error': 'Failed to generate response from both AI providers'}, event='error')
+
+    return sse_response(generate())
+
 # Folder Management Routes
 @app.route('/api/folders', methods=['GET'])
 def get_folders():
@@ -613,6 +3153,7 @@ def create_folder():
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         })
+        metrics_snapshot.adjust('folders', 1)
         
         return jsonify({
             'success': True,
@@ -626,18 +3167,103 @@ def create_folder():
             'error': str(e)
         }), 500
 
+def encode_results_cursor(result):
+    raw = f"{result['saved_at'].isoformat()}|{result['_id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_results_cursor(cursor):
+    saved_at, result_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+    return datetime.fromisoformat(saved_at), ObjectId(result_id)
+
+def list_view_projection():
+    """Projection for folder list views: no upload text, summary cut to a preview."""
+    preview_chars = app.config['SUMMARY_PREVIEW_CHARS']
+    summary = {'$ifNull': ['$ai_summary', '']}
+    return {
+        'folder_id': 1,
+        'url': 1,
+        'title': 1,
+        'description': 1,
+        'custom_notes': 1,
+        'engine': 1,
+        'content_type': 1,
+        'saved_at': 1,
+        'last_modified': 1,
+        'ai_summary': {'$substrCP': [summary, 0, preview_chars]},
+        'ai_summary_truncated': {'$gt': [{'$strLenCP': summary}, preview_chars]}
+    }
+
+def serialize_result(result):
+    result['id'] = str(result['_id'])
+    result['folder_id'] = str(result['folder_id'])
+    del result['_id']
+    return result
+
 @app.route('/api/folders/<folder_id>/results', methods=['GET'])
 def get_folder_results(folder_id):
+    """List a folder's saved results, oldest first, one page at a time.
+
+    Query parameters: ``limit``, ``cursor`` (``next_cursor`` from the previous
+    page), ``view`` (``list`` by default, ``full`` for every field) and
+    ``format=ndjson`` to stream one result per line, followed by a final
+    ``{"next_cursor": ...}`` line.
+    """
     try:
-        results = list(db.saved_results.find({'folder_id': ObjectId(folder_id)}))
-        for result in results:
-            result['id'] = str(result['_id'])
-            result['folder_id'] = str(result['folder_id'])
-            del result['_id']
+        if not ObjectId.is_valid(folder_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid folder ID format'
+            }), 400
+
+        try:
+            limit = page_limit(request.args, app.config['FOLDER_PAGE_SIZE'], app.config['FOLDER_MAX_PAGE_SIZE'])
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid limit'
+            }), 400
+
+        query = {'folder_id': ObjectId(folder_id)}
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                saved_at, last_id = decode_results_cursor(cursor)
+            except Exception:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid cursor'
+                }), 400
+            query['$or'] = [
+                {'saved_at': {'$gt': saved_at}},
+                {'saved_at': saved_at, '_id': {'$gt': last_id}}
+            ]
+
+        projection = {'search_content': 0} if request.args.get('view') == 'full' else list_view_projection()
+        # Fetch one extra row to learn whether another page exists
+        results = db.saved_results.find(query, projection).sort(
+            [('saved_at', 1), ('_id', 1)]
+        ).limit(limit + 1)
+
+        if request.args.get('format') == 'ndjson':
+            def generate():
+                last = None
+                for index, result in enumerate(results):
+                    if index == limit:
+                        yield app.json.dumps({'next_cursor': encode_results_cursor(last)}) + "\n"
+                        return
+                    last = dict(result)
+                    yield app.json.dumps(serialize_result(result)) + "\n"
+                yield app.json.dumps({'next_cursor': None}) + "\n"
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        results = list(results)
+        next_cursor = encode_results_cursor(results[limit - 1]) if len(results) > limit else None
         
         return jsonify({
             'success': True,
-            'results': results
+            'results': [serialize_result(result) for result in results[:limit]],
+            'next_cursor': next_cursor
         })
     except Exception as e:
         logger.error(f"Error fetching folder results: {str(e)}")
@@ -646,71 +3272,493 @@ def get_folder_results(folder_id):
             'error': str(e)
         }), 500
 
-@app.route('/api/folders/save', methods=['POST'])
-def save_to_folder():
-    try:
-        data = request.get_json()
-        logger.debug(f"Received save request data: {data}")
-        
-        folder_id = data.get('folderId')
-        result_data = data.get('result', {})
-        
-        if not folder_id or not result_data:
+@app.route('/api/folders/<folder_id>/results/<result_id>', methods=['GET'])
+def get_folder_result(folder_id, result_id):
+    """Fetch a single saved result with all of its fields."""
+    try:
+        if not ObjectId.is_valid(folder_id) or not ObjectId.is_valid(result_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid ID format'
+            }), 400
+
+        result = db.saved_results.find_one({
+            '_id': ObjectId(result_id),
+            'folder_id': ObjectId(folder_id)
+        }, {'search_content': 0})
+        if not result:
+            return jsonify({
+                'success': False,
+                'error': 'Content not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'result': serialize_result(result)
+        })
+    except Exception as e:
+        logger.error(f"Error fetching folder result: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def is_saveable_url(url):
+    """Whether a URL can identify a saved result; uploads all share '#'."""
+    return isinstance(url, str) and url.strip() not in ('', '#')
+
+def result_upsert_spec(folder_id, result_data):
+    """Return the (filter, update) pair that upserts a saved result on (folder_id, url).
+
+    Editable fields are only overwritten when the item carries them, so
+    re-saving a search result keeps an existing summary and notes.
+    """
+    now = datetime.utcnow()
+    on_insert = {
+        'title': result_data.get('title'),
+        'engine': result_data.get('engine', ''),
+        'saved_at': now
+    }
+    for optional_field in ('authors', 'published', 'pdf_url'):
+        if result_data.get(optional_field):
+            on_insert[optional_field] = result_data[optional_field]
+
+    updates = {'last_modified': now}
+    for editable_field in ('description', 'ai_summary', 'custom_notes'):
+        if editable_field in result_data:
+            updates[editable_field] = result_data[editable_field]
+        else:
+            on_insert[editable_field] = ''
+
+    return (
+        {'folder_id': ObjectId(folder_id), 'url': result_data.get('url')},
+        {
+            '$set': updates,
+            '$setOnInsert': on_insert
+        }
+    )
+
+@app.route('/api/folders/save', methods=['POST'])
+def save_to_folder():
+    try:
+        data = request.get_json()
+        logger.debug(f"Received save request data: {data}")
+        
+        folder_id = data.get('folderId')
+        result_data = data.get('result', {})
+        
+        if not folder_id or not result_data:
+            return jsonify({
+                'success': False,
+                'error': 'Folder ID and result data are required'
+            }), 400
+
+        if not is_saveable_url(result_data.get('url')):
+            return jsonify({
+                'success': False,
+                'error': 'A result URL is required'
+            }), 400
+        
+        # Single round-trip upsert; the unique index prevents racing duplicates
+        query, update = result_upsert_spec(folder_id, result_data)
+        update_result = db.saved_results.update_one(query, update, upsert=True)
+        
+        if update_result.upserted_id:
+            logger.info(f"Inserted new document with ID: {update_result.upserted_id}")
+            metrics_snapshot.adjust('saved_results', 1)
+            message = 'Result saved successfully'
+        else:
+            logger.info(f"Updated existing document: {update_result.modified_count} modified")
+            message = 'Result updated successfully'
+        index_saved_results(query)
+        touch_folder(folder_id)
+        
+        return jsonify({
+            'success': True,
+            'message': message
+        })
+    except Exception as e:
+        logger.error(f"Error saving to folder: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def parse_braced_value(text, start):
+    """Return (value, end) for a BibTeX {...} or "..." value starting at text[start]."""
+    closing = '}' if text[start] == '{' else '"'
+    depth = 0
+    for index in range(start, len(text)):
+        char = text[index]
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+        if (closing == '}' and depth == 0) or (closing == '"' and char == '"' and index > start and depth == 0):
+            return text[start + 1:index], index + 1
+    return text[start + 1:], len(text)
+
+BIBTEX_FIELD_PATTERN = re.compile(r'\s*([\w-]+)\s*=\s*')
+
+def parse_bibtex(text):
+    """Parse BibTeX entries into lists of lowercase field dicts."""
+    entries = []
+    position = 0
+    while True:
+        at = text.find('@', position)
+        if at == -1:
+            break
+        brace = text.find('{', at)
+        if brace == -1:
+            break
+        body, position = parse_braced_value(text, brace)
+        fields = {}
+        # Skip the citation key, then read "name = value" pairs
+        cursor = body.find(',') + 1 if ',' in body else len(body)
+        while cursor < len(body):
+            match = BIBTEX_FIELD_PATTERN.match(body, cursor)
+            if not match:
+                break
+            cursor = match.end()
+            if cursor < len(body) and body[cursor] in '{"':
+                value, cursor = parse_braced_value(body, cursor)
+            else:
+                end = body.find(',', cursor)
+                end = len(body) if end == -1 else end
+                value, cursor = body[cursor:end], end
+            fields[match.group(1).lower()] = re.sub(r'[{}]', '', ' '.join(value.split()))
+            comma = body.find(',', cursor)
+            cursor = len(body) if comma == -1 else comma + 1
+        if fields:
+            entries.append(fields)
+    return entries
+
+RIS_FIELDS = {
+    'TI': 'title', 'T1': 'title', 'UR': 'url', 'DO': 'doi', 'AB': 'abstract',
+    'N2': 'abstract', 'AU': 'author', 'A1': 'author', 'PY': 'year', 'Y1': 'year'
+}
+
+def parse_ris(text):
+    """Parse RIS records into field dicts using BibTeX-style field names."""
+    entries = []
+    fields = {}
+    for line in text.splitlines():
+        match = re.match(r'^([A-Z][A-Z0-9])\s{2}-\s?(.*)$', line)
+        if not match:
+            continue
+        tag, value = match.group(1), match.group(2).strip()
+        if tag == 'ER':
+            if fields:
+                entries.append(fields)
+            fields = {}
+        elif tag in RIS_FIELDS:
+            name = RIS_FIELDS[tag]
+            if name == 'author' and 'author' in fields:
+                fields['author'] += f" and {value}"
+            else:
+                fields.setdefault(name, value)
+    if fields:
+        entries.append(fields)
+    return entries
+
+def citation_to_result(fields):
+    """Map BibTeX/RIS fields onto a saved result."""
+    url = fields.get('url')
+    if not url and fields.get('doi'):
+        url = f"https://doi.org/{fields['doi']}"
+    if not url and fields.get('eprint'):
+        url = f"https://arxiv.org/abs/{fields['eprint']}"
+    return {
+        'title': fields.get('title'),
+        'url': url,
+        'description': fields.get('abstract', ''),
+        'authors': fields.get('author', '').replace(' and ', ', '),
+        'published': fields.get('year', ''),
+        'engine': 'import'
+    }
+
+def parse_import_file(file):
+    """Read an uploaded BibTeX, RIS or JSON file into a list of results."""
+    text = file.read().decode('utf-8', errors='replace')
+    file_format = (request.form.get('format') or file.filename.rsplit('.', 1)[-1]).lower()
+
+    if file_format in ('bib', 'bibtex'):
+        return [citation_to_result(fields) for fields in parse_bibtex(text)]
+    if file_format == 'ris':
+        return [citation_to_result(fields) for fields in parse_ris(text)]
+    if file_format == 'json':
+        data = json.loads(text)
+        return data.get('results', []) if isinstance(data, dict) else data
+    raise ValueError(f"Unsupported import format: {file_format}")
+
+@app.route('/api/folders/<folder_id>/bulk', methods=['POST'])
+def bulk_save_to_folder(folder_id):
+    """Save many results to a folder as one ordered bulk upsert.
+
+    Accepts JSON ``{"results": [...]}`` or a multipart ``file`` in BibTeX,
+    RIS or JSON format. Returns an outcome per input item: ``inserted``,
+    ``updated``, ``skipped``, ``failed`` or ``not_processed``.
+    """
+    try:
+        if not ObjectId.is_valid(folder_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid folder ID format'
+            }), 400
+
+        if 'file' in request.files:
+            items = parse_import_file(request.files['file'])
+        else:
+            items = (request.get_json() or {}).get('results', [])
+
+        if not items:
+            return jsonify({
+                'success': False,
+                'error': 'No results provided'
+            }), 400
+        if len(items) > app.config['BULK_MAX_ITEMS']:
+            return jsonify({
+                'success': False,
+                'error': f"At most {app.config['BULK_MAX_ITEMS']} results per request"
+            }), 400
+
+        outcomes = [None] * len(items)
+        operations = []
+        operation_items = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not is_saveable_url(item.get('url')) or not item.get('title'):
+                outcomes[index] = {'index': index, 'status': 'skipped', 'error': 'Title and URL are required'}
+                continue
+            operations.append(UpdateOne(*result_upsert_spec(folder_id, item), upsert=True))
+            operation_items.append(index)
+
+        if operations:
+            try:
+                details = db.saved_results.bulk_write(operations, ordered=True).bulk_api_result
+                processed = len(operations)
+            except BulkWriteError as e:
+                details = e.details
+                error = details['writeErrors'][0]
+                processed = error['index']
+                outcomes[operation_items[error['index']]] = {
+                    'index': operation_items[error['index']],
+                    'status': 'failed',
+                    'error': error.get('errmsg', 'Write failed')
+                }
+
+            upserted = {entry['index']: entry['_id'] for entry in details.get('upserted', [])}
+            metrics_snapshot.adjust('saved_results', len(upserted))
+            for op_index, item_index in enumerate(operation_items):
+                if outcomes[item_index]:
+                    continue
+                if op_index >= processed:
+                    outcomes[item_index] = {'index': item_index, 'status': 'not_processed'}
+                elif op_index in upserted:
+                    outcomes[item_index] = {'index': item_index, 'status': 'inserted', 'id': str(upserted[op_index])}
+                else:
+                    outcomes[item_index] = {'index': item_index, 'status': 'updated'}
+
+        summary = defaultdict(int)
+        for outcome in outcomes:
+            summary[outcome['status']] += 1
+        logger.info(f"Bulk save to folder {folder_id}: {dict(summary)}")
+        if operations:
+            index_saved_results({
+                'folder_id': ObjectId(folder_id),
+                'url': {'$in': [items[index]['url'] for index in operation_items]}
+            })
+            touch_folder(folder_id)
+
+        return jsonify({
+            'success': True,
+            'summary': summary,
+            'results': outcomes
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error in bulk save: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/library/search', methods=['GET'])
+def search_library():
+    """Full-text search over all saved results, with facet counts.
+
+    Query parameters: ``q`` (required), optional ``folder_id``, ``engine``,
+    ``date_from``/``date_to`` (ISO dates on ``saved_at``), ``limit`` and
+    ``page``. Facets cover engine, folder and saved month for the filtered
+    matches.
+    """
+    try:
+        query_text = request.args.get('q', '').strip()
+        if not query_text:
+            return jsonify({
+                'success': False,
+                'error': 'Search query is required'
+            }), 400
+
+        match = {'$text': {'$search': query_text}}
+        if request.args.get('folder_id'):
+            if not ObjectId.is_valid(request.args['folder_id']):
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid folder ID format'
+                }), 400
+            match['folder_id'] = ObjectId(request.args['folder_id'])
+        if request.args.get('engine'):
+            match['engine'] = request.args['engine']
+
+        try:
+            date_range = {}
+            if request.args.get('date_from'):
+                date_range['$gte'] = datetime.fromisoformat(request.args['date_from'])
+            if request.args.get('date_to'):
+                date_range['$lte'] = datetime.fromisoformat(request.args['date_to'])
+            limit = page_limit(request.args, app.config['LIBRARY_SEARCH_PAGE_SIZE'], 100)
+            page = max(int(request.args.get('page', 0)), 0)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid date, limit or page'
+            }), 400
+        if date_range:
+            match['saved_at'] = date_range
+
+        projection = list_view_projection()
+        projection['score'] = 1
+        facets = list(db.saved_results.aggregate([
+            {'$match': match},
+            {'$addFields': {'score': {'$meta': 'textScore'}}},
+            {'$facet': {
+                'results': [
+                    {'$sort': {'score': -1, '_id': 1}},
+                    {'$skip': page * limit},
+                    {'$limit': limit},
+                    {'$project': projection}
+                ],
+                'engines': [
+                    {'$group': {'_id': '$engine', 'count': {'$sum': 1}}},
+                    {'$sort': {'count': -1}}
+                ],
+                'folders': [
+                    {'$group': {'_id': '$folder_id', 'count': {'$sum': 1}}},
+                    {'$sort': {'count': -1}}
+                ],
+                'months': [
+                    {'$group': {
+                        '_id': {'$dateToString': {'format': '%Y-%m', 'date': '$saved_at'}},
+                        'count': {'$sum': 1}
+                    }},
+                    {'$sort': {'_id': -1}}
+                ],
+                'total': [{'$count': 'count'}]
+            }}
+        ]))[0]
+
+        folder_names = {
+            folder['_id']: folder['name']
+            for folder in db.folders.find(
+                {'_id': {'$in': [facet['_id'] for facet in facets['folders']]}},
+                {'name': 1}
+            )
+        }
+
+        return jsonify({
+            'success': True,
+            'results': [serialize_result(result) for result in facets['results']],
+            'total': facets['total'][0]['count'] if facets['total'] else 0,
+            'facets': {
+                'engine': [{'value': f['_id'], 'count': f['count']} for f in facets['engines']],
+                'folder': [
+                    {'value': str(f['_id']), 'name': folder_names.get(f['_id'], ''), 'count': f['count']}
+                    for f in facets['folders']
+                ],
+                'month': [{'value': f['_id'], 'count': f['count']} for f in facets['months']]
+            }
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid search parameter: {str(e)}"
+        }), 400
+    except Exception as e:
+        logger.error(f"Error searching library: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/folders/<folder_id>/results/<result_id>/similar', methods=['GET'])
+def get_similar_results(folder_id, result_id):
+    """Find the saved results in a folder that are most similar to one of its items."""
+    try:
+        if not ObjectId.is_valid(folder_id) or not ObjectId.is_valid(result_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid folder or result ID format'
+            }), 400
+
+        if embedding_index is None:
+            return jsonify({
+                'success': False,
+                'error': 'Similar-item search is not available'
+            }), 503
+
+        members = {
+            str(item['_id'])
+            for item in db.saved_results.find({'folder_id': ObjectId(folder_id)}, {'_id': 1})
+        }
+        if result_id not in members:
+            return jsonify({
+                'success': False,
+                'error': 'Result not found in folder'
+            }), 404
+
+        vector = embedding_index.vector_for(result_id)
+        if vector is None:
             return jsonify({
                 'success': False,
-                'error': 'Folder ID and result data are required'
+                'error': 'Content not found in the similarity index'
+            }), 404
+
+        try:
+            limit = page_limit(request.args, 10, 50)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid limit'
             }), 400
-        
-        # Create save data with explicit field mapping
-        save_data = {
-            'folder_id': ObjectId(folder_id),
-            'url': result_data.get('url'),
-            'title': result_data.get('title'),
-            'description': result_data.get('description', ''),
-            'ai_summary': result_data.get('ai_summary', ''),
-            'custom_notes': result_data.get('custom_notes', ''),
-            'engine': result_data.get('engine', ''),
-            'saved_at': datetime.utcnow(),
-            'last_modified': datetime.utcnow()
+        matches = embedding_index.query(vector, limit, exclude={result_id}, within=members)
+        scores = {ObjectId(match_id): score for match_id, score in matches}
+        items = {
+            item['_id']: item
+            for item in db.saved_results.find({'_id': {'$in': list(scores)}}, list_view_projection())
         }
-        
-        logger.debug(f"Processed save data: {save_data}")
-        
-        # Check for existing entry
-        existing_result = db.saved_results.find_one({
-            'folder_id': ObjectId(folder_id),
-            'url': result_data.get('url')
-        })
-        
-        if existing_result:
-            # Update existing document
-            update_result = db.saved_results.update_one(
-                {'_id': existing_result['_id']},
-                {'$set': {
-                    'description': save_data['description'],
-                    'ai_summary': save_data['ai_summary'],
-                    'custom_notes': save_data['custom_notes'],
-                    'last_modified': save_data['last_modified']
-                }}
-            )
-            logger.info(f"Updated existing document: {update_result.modified_count} modified")
-            message = 'Result updated successfully'
-        else:
-            # Insert new document
-            insert_result = db.saved_results.insert_one(save_data)
-            logger.info(f"Inserted new document with ID: {insert_result.inserted_id}")
-            message = 'Result saved successfully'
-        
+
+        similar = []
+        for match_id, score in scores.items():
+            if match_id in items:
+                item = serialize_result(items[match_id])
+                item['similarity'] = round(score, 4)
+                similar.append(item)
+
         return jsonify({
             'success': True,
-            'message': message
+            'results': similar
         })
     except Exception as e:
-        logger.error(f"Error saving to folder: {str(e)}")
+        logger.error(f"Error finding similar results: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
+
 @app.route('/api/folders/<folder_id>/results/<result_id>', methods=['DELETE'])
 def delete_folder_content(folder_id, result_id):
     try:
@@ -720,6 +3768,9 @@ def delete_folder_content(folder_id, result_id):
         })
 
         if result.deleted_count:
+            metrics_snapshot.adjust('saved_results', -result.deleted_count)
+            unindex_saved_results([result_id])
+            touch_folder(folder_id)
             return jsonify({'success': True})
         
         return jsonify({
@@ -738,13 +3789,19 @@ def delete_folder_content(folder_id, result_id):
 def delete_folder(folder_id):
     try:
         # Delete all related content first
-        db.saved_results.delete_many({'folder_id': ObjectId(folder_id)})
-        db.chat_messages.delete_many({'folder_id': ObjectId(folder_id)})
+        result_ids = [item['_id'] for item in db.saved_results.find({'folder_id': ObjectId(folder_id)}, {'_id': 1})]
+        deleted_results = db.saved_results.delete_many({'folder_id': ObjectId(folder_id)})
+        metrics_snapshot.adjust('saved_results', -deleted_results.deleted_count)
+        unindex_saved_results(result_ids)
+        folder_context.invalidate(folder_id)
+        deleted_messages = db.chat_messages.delete_many({'folder_id': ObjectId(folder_id)})
+        metrics_snapshot.adjust('chat_messages', -deleted_messages.deleted_count)
         
         # Delete the folder itself
         result = db.folders.delete_one({'_id': ObjectId(folder_id)})
         
         if result.deleted_count:
+            metrics_snapshot.adjust('folders', -result.deleted_count)
             return jsonify({'success': True})
             
         return jsonify({
@@ -759,6 +3816,144 @@ def delete_folder(folder_id):
             'error': str(e)
         }), 500
 
+ARXIV_ID_PATTERN = re.compile(r'arxiv\.org/(?:abs|pdf)/([a-z\-]+/\d{7}|\d{4}\.\d{4,5})(?:v\d+)?', re.IGNORECASE)
+DOI_PATTERN = re.compile(r'(10\.\d{4,9}/[^\s?#]+)')
+
+def canonical_paper_id(url):
+    """Map a paper URL to a stable ID (arXiv ID, DOI or normalized URL)."""
+    arxiv_match = ARXIV_ID_PATTERN.search(url)
+    if arxiv_match:
+        return f"arxiv:{arxiv_match.group(1).lower()}"
+
+    doi_match = DOI_PATTERN.search(url)
+    if doi_match:
+        doi = doi_match.group(1).lower()
+        # bioRxiv links append a version and page suffix to the DOI
+        doi = re.sub(r'(\.full(\.pdf)?|\.abstract|\.pdf)$', '', doi)
+        doi = re.sub(r'v\d+$', '', doi)
+        return f"doi:{doi}"
+
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parsed.path.rstrip('/')
+    return f"url:{urlunparse(('https', host, path, '', parsed.query, ''))}"
+
+class SummaryCache:
+    """Persistent cache of LLM paper summaries.
+
+    Entries are keyed by canonical paper ID and prompt version, so changing
+    the prompt or model naturally misses old entries. Expiry is handled by a
+    TTL index on ``expires_at``.
+    """
+
+    def __init__(self, collection, ttl, version):
+        self.collection = collection
+        self.ttl = ttl
+        self.version = version
+        self.stats = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def _count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def get(self, paper_id):
+        try:
+            entry = self.collection.find_one({
+                '_id': f"{paper_id}|{self.version}",
+                'expires_at': {'$gt': datetime.utcnow()}
+            })
+        except Exception as e:
+            logger.error(f"Summary cache lookup failed: {str(e)}")
+            entry = None
+        self._count('hits' if entry else 'misses')
+        return entry['summary'] if entry else None
+
+    def set(self, paper_id, summary):
+        try:
+            now = datetime.utcnow()
+            self.collection.replace_one(
+                {'_id': f"{paper_id}|{self.version}"},
+                {
+                    'paper_id': paper_id,
+                    'version': self.version,
+                    'summary': summary,
+                    'created_at': now,
+                    'expires_at': now + timedelta(seconds=self.ttl)
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Summary cache write failed: {str(e)}")
+
+    def invalidate(self, paper_id):
+        """Drop cached summaries for a paper across all prompt versions."""
+        result = self.collection.delete_many({'paper_id': paper_id})
+        self._count('invalidations')
+        return result.deleted_count
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'hits': self.stats['hits'],
+                'misses': self.stats['misses'],
+                'invalidations': self.stats['invalidations'],
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0
+            }
+
+summary_cache = SummaryCache(
+    db.paper_summaries,
+    app.config['SUMMARY_CACHE_TTL'],
+    app.config['SUMMARY_PROMPT_VERSION']
+)
+
+@app.route('/summarize/cache', methods=['DELETE'])
+def invalidate_summary():
+    """Remove the cached summary for a paper so the next request regenerates it."""
+    try:
+        data = request.get_json() or {}
+        url = data.get('url')
+        if not url:
+            return jsonify({
+                'success': False,
+                'error': 'URL is required'
+            }), 400
+
+        paper_id = canonical_paper_id(url)
+        deleted = summary_cache.invalidate(paper_id)
+        logger.info(f"Invalidated {deleted} cached summaries for {paper_id}")
+
+        return jsonify({
+            'success': True,
+            'paper_id': paper_id,
+            'deleted': deleted
+        })
+    except Exception as e:
+        logger.error(f"Error invalidating summary cache: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def fetch_paper_content(url):
+    """Fetch a paper page and extract its abstract or TL;DR text."""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+
+    response = http_pool.get(url, headers=headers)
+    response.raise_for_status()
+
+    return extract_paper_abstract(url, response.text, app.config['HTML_PARSE_MODE'])
+
+def build_summary_prompt(title, content):
+    """Build the per-paper part of the summary prompt; ``SUMMARY_INSTRUCTIONS`` is the static part."""
+    return f"""Title: {title}
+Content: {content}"""
+
 @app.route('/summarize', methods=['POST'])
 @handle_api_error
 def summarize_paper():
@@ -783,33 +3978,18 @@ def summarize_paper():
                 'error': 'URL is required'
             }), 400
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        paper_id = canonical_paper_id(url)
+        if not data.get('refresh'):
+            cached_summary = summary_cache.get(paper_id)
+            if cached_summary:
+                logger.info(f"Returning cached summary for {paper_id}")
+                return jsonify({
+                    'success': True,
+                    'summary': cached_summary,
+                    'cached': True
+                })
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        content = ''
-
-        # Extract content based on source
-        if 'arxiv.org' in url:
-            abstract_elem = soup.select_one('.abstract')
-            if abstract_elem:
-                content = abstract_elem.text.replace('Abstract:', '').strip()
-        elif 'biorxiv.org' in url:
-            abstract_elem = soup.select_one('.abstract-content')
-            if abstract_elem:
-                content = abstract_elem.text.strip()
-        else:
-            tldr_elem = soup.select_one('.tldr-abstract-replacement.text-truncator')
-            if tldr_elem:
-                content = tldr_elem.text.strip()
-            else:
-                abstract = soup.find('meta', {'name': 'description'})
-                if abstract and abstract.get('content'):
-                    content = abstract['content']
+        content = fetch_paper_content(url)
 
         if not content:
             return jsonify({
@@ -817,47 +3997,19 @@ def summarize_paper():
                 'error': 'Could not extract paper content'
             }), 400
 
-        prompt = f"""Please provide a concise summary of this research paper:
-        Title: {title}
-        Content: {content}
-        
-        Please format the summary in the following structure:
-        1. Main objective: (2-3 sentences about the paper's main goal)
-        2. Key findings: (2-3 sentences about the main results)
-        3. Significance: (2-3 sentences about why this matters)
-        4. Disruption: (2-3 sentences about how this might be disruptive to current processes)"""
+        prompt = build_summary_prompt(title, content)
 
-        # Use Claude for summarization
-        try:
-            response = anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                messages=[
-                    {"role": "system", "content": "You are a research assistant specializing in creating clear, accurate summaries of academic papers. Focus on extracting and explaining the key points concisely."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
-            summary = response.content[0].text
-        except Exception as e:
-            logger.error(f"Claude API error, falling back to OpenAI: {str(e)}")
-            # Fallback to OpenAI if Claude fails
-            response = openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful AI assistant specializing in summarizing academic papers clearly and concisely."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.7
-            )
-            summary = response.choices[0].message.content
+        _, summary = llm_gateway.complete(
+            'summarize', prompt, SUMMARY_SYSTEM_PROMPT, SUMMARY_OPENAI_SYSTEM_PROMPT, instructions=SUMMARY_INSTRUCTIONS
+        )
 
         logger.info("Successfully generated summary")
+        summary_cache.set(paper_id, summary)
 
         return jsonify({
             'success': True,
-            'summary': summary
+            'summary': summary,
+            'cached': False
         })
 
     except Exception as e:
@@ -867,6 +4019,149 @@ def summarize_paper():
             'error': str(e)
         }), 500
 
+@app.route('/summarize/stream', methods=['POST'])
+def stream_summary():
+    """Stream a paper summary as server-sent events.
+
+    Cached summaries are sent as a single token followed by ``done``.
+    """
+    try:
+        data = request.get_json() or {}
+        url = data.get('url')
+        title = data.get('title', '')
+
+        if not url:
+            return jsonify({
+                'success': False,
+                'error': 'URL is required'
+            }), 400
+
+        paper_id = canonical_paper_id(url)
+        cached_summary = None if data.get('refresh') else summary_cache.get(paper_id)
+        prompt = None
+        if not cached_summary:
+            content = fetch_paper_content(url)
+            if not content:
+                return jsonify({
+                    'success': False,
+                    'error': 'Could not extract paper content'
+                }), 400
+            prompt = build_summary_prompt(title, content)
+    except Exception as e:
+        logger.error(f"Error in stream_summary: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    def generate():
+        if cached_summary:
+            yield sse_event({'token': cached_summary})
+            yield sse_event({'cached': True}, event='done')
+            return
+
+        chunks = []
+        try:
+            for _, text in llm_gateway.stream(
+                'summarize', prompt, SUMMARY_SYSTEM_PROMPT, SUMMARY_OPENAI_SYSTEM_PROMPT, instructions=SUMMARY_INSTRUCTIONS
+            ):
+                chunks.append(text)
+                yield sse_event({'token': text})
+
+            summary_cache.set(paper_id, ''.join(chunks))
+            yield sse_event({'cached': False}, event='done')
+        except Exception as e:
+            logger.error(f"Error streaming summary: {str(e)}")
+            yield sse_event({'error': 'Failed to generate summary'}, event='error')
+
+    return sse_response(generate())
+
+def pdf_cache_index_path(pdf_url):
+    url_key = hashlib.sha256(pdf_url.encode('utf-8')).hexdigest()
+    return os.path.join(app.config['PDF_CACHE_FOLDER'], 'urls', url_key)
+
+def lookup_cached_pdf(pdf_url):
+    """Return the on-disk path of a previously downloaded PDF, if any."""
+    if not app.config['PDF_CACHE_ENABLED']:
+        return None
+    try:
+        with open(pdf_cache_index_path(pdf_url)) as index_file:
+            content_hash = index_file.read().strip()
+        path = os.path.join(app.config['PDF_CACHE_FOLDER'], f"{content_hash}.pdf")
+        # The modification time doubles as last-served time for eviction
+        os.utime(path)
+        return path
+    except OSError:
+        return None
+
+def evict_cached_pdfs():
+    """Delete the least recently served PDFs until the cache fits its byte cap.
+
+    URL index entries for evicted files are left behind; lookups treat them
+    as misses and the next download rewrites them.
+    """
+    entries = []
+    with os.scandir(app.config['PDF_CACHE_FOLDER']) as scan:
+        for entry in scan:
+            if entry.is_file() and entry.name.endswith('.pdf'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= app.config['PDF_CACHE_MAX_BYTES']:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def stream_pdf(response, pdf_url, write_through):
+    """Yield upstream PDF chunks, optionally writing them to the disk cache.
+
+    Stops early if the download exceeds the configured size cap or total
+    timeout. The cache entry is only committed once the full body arrived.
+    """
+    max_bytes = app.config['PDF_PROXY_MAX_BYTES']
+    deadline = time.monotonic() + app.config['PDF_PROXY_TIMEOUT']
+    cache_folder = app.config['PDF_CACHE_FOLDER']
+
+    temp_file = None
+    digest = hashlib.sha256()
+    if write_through:
+        temp_file = tempfile.NamedTemporaryFile(dir=cache_folder, suffix='.part', delete=False)
+
+    received = 0
+    completed = False
+    try:
+        for chunk in response.iter_content(chunk_size=app.config['PDF_PROXY_CHUNK_SIZE']):
+            received += len(chunk)
+            if received > max_bytes:
+                logger.error(f"PDF proxy aborted, {pdf_url} exceeds {max_bytes} bytes")
+                return
+            if time.monotonic() > deadline:
+                logger.error(f"PDF proxy aborted, {pdf_url} exceeded the download timeout")
+                return
+            if temp_file:
+                temp_file.write(chunk)
+                digest.update(chunk)
+            yield chunk
+        completed = True
+    finally:
+        response.close()
+        if temp_file:
+            temp_file.close()
+            if completed and received:
+                content_hash = digest.hexdigest()
+                os.replace(temp_file.name, os.path.join(cache_folder, f"{content_hash}.pdf"))
+                with open(pdf_cache_index_path(pdf_url), 'w') as index_file:
+                    index_file.write(content_hash)
+                logger.info(f"Cached PDF {pdf_url} as {content_hash}")
+                evict_cached_pdfs()
+            else:
+                os.unlink(temp_file.name)
+
 @app.route('/proxy_pdf', methods=['POST'])
 @handle_api_error
 def proxy_pdf():
@@ -876,18 +4171,52 @@ def proxy_pdf():
         
         if not pdf_url:
             return jsonify({'error': 'No URL provided'}), 400
-        
-        response = requests.get(pdf_url, stream=True)
+
+        download_name = f'paper_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+
+        cached_path = lookup_cached_pdf(pdf_url)
+        if cached_path:
+            logger.debug(f"Serving cached PDF for {pdf_url}")
+            # conditional=True lets send_file answer Range requests from disk
+            return send_file(
+                cached_path,
+                mimetype='application/pdf',
+                as_attachment=True,
+                download_name=download_name,
+                conditional=True
+            )
+
+        upstream_headers = {}
+        range_header = request.headers.get('Range')
+        if range_header:
+            upstream_headers['Range'] = range_header
+
+        response = http_pool.get(pdf_url, headers=upstream_headers, stream=True)
         response.raise_for_status()
-        
-        pdf_io = BytesIO(response.content)
-        pdf_io.seek(0)
-        
-        return send_file(
-            pdf_io,
+
+        # None for a missing or malformed upstream length; the streaming size cap still applies
+        declared_length = content_length(response)
+        if declared_length and declared_length > app.config['PDF_PROXY_MAX_BYTES']:
+            response.close()
+            return jsonify({'error': 'PDF exceeds the maximum proxy size'}), 413
+
+        headers = {
+            'Content-Disposition': f'attachment; filename={download_name}',
+            'Accept-Ranges': response.headers.get('Accept-Ranges', 'none')
+        }
+        if declared_length:
+            headers['Content-Length'] = str(declared_length)
+        if response.headers.get('Content-Range'):
+            headers['Content-Range'] = response.headers['Content-Range']
+
+        # Only whole-file responses are safe to store under their content hash
+        write_through = app.config['PDF_CACHE_ENABLED'] and response.status_code == 200
+
+        return Response(
+            stream_with_context(stream_pdf(response, pdf_url, write_through)),
+            status=response.status_code,
             mimetype='application/pdf',
-            as_attachment=True,
-            download_name=f'paper_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+            headers=headers
         )
     
     except Exception as e:
@@ -937,21 +4266,39 @@ def process_uploaded_files(files, folder_id):
             filename = secure_filename(file.filename)
             logger.info(f"Processing file: {filename}")
             
-            # Process file content
-            content = extract_file_content(file, filename)
-            if not content:
+            file.stream.seek(0)
+            data = file.stream.read()
+            document_hash = hashlib.sha256(data).hexdigest()
+
+            # Reuse extraction and summary from an earlier upload of the same bytes
+            document, created = get_or_create_document(document_hash, data, filename)
+            if not document:
                 continue
 
             # Save to MongoDB
-            result_id = save_file_to_db(folder_id, filename, content)
-            if result_id:
-                processed_files.append({
-                    'filename': filename,
-                    'id': str(result_id)
-                })
-                
+            result_id = save_file_to_db(folder_id, filename, document)
+            if not result_id:
+                continue
+            index_saved_results({'_id': result_id})
+            touch_folder(folder_id)
+
+            job_id = None
+            if created or document['summary_status'] == 'failed':
                 # Generate summary asynchronously
-                generate_ai_summary(result_id, content)
+                db.documents.update_one(
+                    {'_id': document_hash},
+                    {'$set': {'summary_status': 'pending'}}
+                )
+                job_id = summary_jobs.enqueue(folder_id, result_id, document['content'], document_hash)
+            else:
+                logger.info(f"Linked {filename} to existing document {document_hash}")
+
+            processed_files.append({
+                'filename': filename,
+                'id': str(result_id),
+                'job_id': str(job_id) if job_id else None,
+                'duplicate': not created
+            })
 
         except Exception as e:
             logger.error(f"Error processing file {file.filename}: {str(e)}")
@@ -959,36 +4306,64 @@ def process_uploaded_files(files, folder_id):
 
     return processed_files
 
-def extract_file_content(file, filename):
-    """Extract text content from uploaded file."""
+def get_or_create_document(document_hash, data, filename):
+    """Return the stored document for a content hash, extracting it on first sight.
+
+    Returns a ``(document, created)`` tuple; document is None if extraction failed.
+    """
+    document = db.documents.find_one({'_id': document_hash})
+    if document:
+        return document, False
+
+    content = extract_file_content(data, filename)
+    if not content:
+        return None, False
+
+    document = {
+        '_id': document_hash,
+        'content': content,
+        'content_type': filename.rsplit('.', 1)[1].lower(),
+        'ai_summary': None,
+        'summary_status': 'pending',
+        'created_at': datetime.utcnow()
+    }
     try:
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            file.save(temp_file.name)
-            file_ext = filename.rsplit('.', 1)[1].lower()
-            
-            content = None
-            if file_ext == 'pdf':
-                content = extract_text_from_pdf(temp_file.name)
-            elif file_ext in ['doc', 'docx']:
-                content = extract_text_from_docx(temp_file.name)
-            
-            os.unlink(temp_file.name)
-            return content
+        db.documents.insert_one(document)
+        return document, True
+    except DuplicateKeyError:
+        # A concurrent upload of the same file won the race
+        return db.documents.find_one({'_id': document_hash}), False
+
+def extract_file_content(data, filename):
+    """Extract text content from uploaded file bytes."""
+    try:
+        file_ext = filename.rsplit('.', 1)[1].lower()
+        
+        content = None
+        if file_ext == 'pdf':
+            content = extract_text_from_pdf(data)
+        elif file_ext in ['doc', 'docx']:
+            content = extract_text_from_docx(BytesIO(data))
+        
+        return content
     except Exception as e:
         logger.error(f"Error extracting content from {filename}: {str(e)}")
         return None
 
-def save_file_to_db(folder_id, filename, content):
-    """Save file information to MongoDB."""
+def save_file_to_db(folder_id, filename, document):
+    """Save file information to MongoDB, linked to its stored document."""
     try:
         file_ext = filename.rsplit('.', 1)[1].lower()
+        content = document['content']
         save_data = {
             'folder_id': ObjectId(folder_id),
             'title': filename,
             'description': f"Uploaded {file_ext.upper()} document",
             'content_type': file_ext,
             'content': content[:1000] + "..." if len(content) > 1000 else content,
-            'ai_summary': "Processing summary...",
+            'search_content': content[:app.config['SEARCH_CONTENT_CHARS']],
+            'document_hash': document['_id'],
+            'ai_summary': document.get('ai_summary') or "Processing summary...",
             'custom_notes': '',
             'engine': 'upload',
             'saved_at': datetime.utcnow(),
@@ -996,117 +4371,333 @@ def save_file_to_db(folder_id, filename, content):
         }
         
         result = db.saved_results.insert_one(save_data)
+        metrics_snapshot.adjust('saved_results', 1)
         return result.inserted_id
     except Exception as e:
         logger.error(f"Error saving file to database: {str(e)}")
         return None
 
-def generate_ai_summary(result_id, content):
-    """Generate AI summary for the uploaded content."""
-    try:
-        summary_prompt = f"Please summarize this document:\n\n{content[:2000]}..."
-        
-        try:
-            # Try Claude first with custom research assistant prompt
-            ai_summary = generate_claude_summary(summary_prompt)
-        except Exception as claude_error:
-            logger.error(f"Claude API error, falling back to OpenAI: {str(claude_error)}")
-            # Fallback to OpenAI
-            ai_summary = generate_openai_summary(summary_prompt)
-
-        # Update MongoDB with summary
-        db.saved_results.update_one(
-            {'_id': result_id},
+UPLOAD_SUMMARY_SYSTEM_PROMPT = """You are a research assistant summarizing a document that was uploaded to a research folder. Write a concise summary of the document covering:
+- its subject and purpose
+- the main findings, arguments or results
+- the methods or evidence used, if any
+- limitations or open questions the document states
+
+Use plain prose in at most 200 words. Only include information found in the document, and reply with the summary alone."""
+UPLOAD_SUMMARY_OPENAI_SYSTEM_PROMPT = "You are a helpful assistant that summarizes documents."
+
+def generate_ai_summary(result_id, content, document_hash=None):
+    """Generate AI summary for the uploaded content.
+
+    When the upload is linked to a stored document, the summary is saved on
+    the document and copied to every saved result that shares it. Raises if
+    both providers fail so the job queue can retry.
+    """
+    summary_prompt = f"Please summarize this document:\n\n{content[:2000]}..."
+    
+    _, ai_summary = llm_gateway.complete(
+        'upload_summary', summary_prompt, UPLOAD_SUMMARY_SYSTEM_PROMPT, UPLOAD_SUMMARY_OPENAI_SYSTEM_PROMPT
+    )
+
+    # Update MongoDB with summary
+    if document_hash:
+        db.documents.update_one(
+            {'_id': document_hash},
+            {'$set': {'ai_summary': ai_summary, 'summary_status': 'completed'}}
+        )
+        db.saved_results.update_many(
+            {'document_hash': document_hash},
             {'$set': {'ai_summary': ai_summary}}
         )
-
-    except Exception as e:
-        logger.error(f"Error generating summary: {str(e)}")
+        index_saved_results({'document_hash': document_hash})
+        touch_folder(db.saved_results.distinct('folder_id', {'document_hash': document_hash}))
+    else:
         db.saved_results.update_one(
             {'_id': result_id},
-            {'$set': {'ai_summary': "Failed to generate summary"}}
+            {'$set': {'ai_summary': ai_summary}}
         )
+        index_saved_results({'_id': result_id})
+        touch_folder(db.saved_results.distinct('folder_id', {'_id': result_id}))
+
+class SummaryJobQueue:
+    """MongoDB-backed job queue for upload summaries.
+
+    Jobs are persisted in ``summary_jobs`` and handed to a fixed pool of
+    worker threads, which bounds concurrent LLM calls. Failed jobs are retried
+    with exponential backoff until ``max_attempts`` is reached. Jobs left
+    queued or stuck running by a previous process are picked up on start.
+    """
+
+    def __init__(self, collection, workers, max_attempts, backoff, lease):
+        self.collection = collection
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.pending = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'summary-worker-{i}', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        self._recover()
+        logger.info(f"Summary job queue started with {self.workers} workers")
 
-def generate_claude_summary(prompt):
-    """Generate summary using Claude with custom research assistant prompt."""
-    response = anthropic_client.messages.create(
-        model="claude-3-sonnet-20240229",
-        messages=[
-            {"role": "system", "content": """You are a helpful research assistant AI tasked with aiding in the creation of a professional research report. Your goal is to collaborate with the user to develop a comprehensive and well-structured report based on the available information and further inquiries.
+    def enqueue(self, folder_id, result_id, content, document_hash=None):
+        self.start()
+        try:
+            now = datetime.utcnow()
+            job = {
+                'folder_id': ObjectId(folder_id),
+                'result_id': result_id,
+                'document_hash': document_hash,
+                'content': content[:2000],
+                'status': 'queued',
+                'attempts': 0,
+                'error': None,
+                'created_at': now,
+                'updated_at': now
+            }
+            job_id = self.collection.insert_one(job).inserted_id
+            self.pending.put(job_id)
+            return job_id
+        except Exception as e:
+            logger.error(f"Error enqueueing summary job: {str(e)}")
+            return None
+
+    def _recover(self):
+        try:
+            stale = datetime.utcnow() - timedelta(seconds=self.lease)
+            for job in self.collection.find(
+                {'$or': [
+                    {'status': 'queued'},
+                    {'status': 'running', 'updated_at': {'$lt': stale}}
+                ]},
+                {'_id': 1}
+            ):
+                self.pending.put(job['_id'])
+        except Exception as e:
+            logger.error(f"Error recovering summary jobs: {str(e)}")
 
-First, review the contents of the research folder:
-<folder_contents>
-{{FOLDER_CONTENTS}}
-</folder_contents>
+    def _claim(self, job_id):
+        stale = datetime.utcnow() - timedelta(seconds=self.lease)
+        return self.collection.find_one_and_update(
+            {
+                '_id': job_id,
+                '$or': [
+                    {'status': 'queued'},
+                    {'status': 'running', 'updated_at': {'$lt': stale}}
+                ]
+            },
+            {
+                '$set': {'status': 'running', 'updated_at': datetime.utcnow()},
+                '$inc': {'attempts': 1}
+            },
+            return_document=ReturnDocument.AFTER
+        )
 
-Next, review the previous chat history to understand the context and progress of the research:
-<chat_history>
-{{CHAT_HISTORY}}
-</chat_history>
+    def _work(self):
+        while True:
+            job_id = self.pending.get()
+            try:
+                job = self._claim(job_id)
+                if job:
+                    self._run(job)
+            except Exception as e:
+                logger.error(f"Summary worker error: {str(e)}")
+            finally:
+                self.pending.task_done()
 
-After reviewing the folder contents and chat history, your task is to:
+    def _run(self, job):
+        try:
+            generate_ai_summary(job['result_id'], job['content'], job.get('document_hash'))
+            self.collection.update_one(
+                {'_id': job['_id']},
+                {
+                    '$set': {'status': 'completed', 'updated_at': datetime.utcnow()},
+                    '$unset': {'content': ''}
+                }
+            )
+        except Exception as e:
+            logger.error(f"Summary job {job['_id']} attempt {job['attempts']} failed: {str(e)}")
+            if job['attempts'] < self.max_attempts:
+                delay = self.backoff * (2 ** (job['attempts'] - 1))
+                self.collection.update_one(
+                    {'_id': job['_id']},
+                    {'$set': {'status': 'queued', 'error': str(e), 'updated_at': datetime.utcnow()}}
+                )
+                timer = threading.Timer(delay, self.pending.put, args=(job['_id'],))
+                timer.daemon = True
+                timer.start()
+            else:
+                self.collection.update_one(
+                    {'_id': job['_id']},
+                    {'$set': {'status': 'failed', 'error': str(e), 'updated_at': datetime.utcnow()}}
+                )
+                if job.get('document_hash'):
+                    db.documents.update_one(
+                        {'_id': job['document_hash']},
+                        {'$set': {'summary_status': 'failed'}}
+                    )
+                    failed_filter = {'document_hash': job['document_hash']}
+                else:
+                    failed_filter = {'_id': job['result_id']}
+                db.saved_results.update_many(
+                    failed_filter,
+                    {'$set': {'ai_summary': "Failed to generate summary"}}
+                )
 
-1. Ask questions to better understand the research topic. Focus on the following areas:
-   - Who uses the topic of research?
-   - Why would they use the topic of research?
-   - What are the potential areas of disruption?
-   - Any other relevant questions that would help clarify the research scope and objectives
+summary_jobs = SummaryJobQueue(
+    db.summary_jobs,
+    app.config['SUMMARY_JOB_WORKERS'],
+    app.config['SUMMARY_JOB_MAX_ATTEMPTS'],
+    app.config['SUMMARY_JOB_BACKOFF'],
+    app.config['SUMMARY_JOB_LEASE']
+)
 
-2. Continue asking questions until you feel you have a comprehensive understanding of the research topic and its implications.
+def serialize_job(job):
+    return {
+        'id': str(job['_id']),
+        'result_id': str(job['result_id']),
+        'folder_id': str(job['folder_id']),
+        'status': job['status'],
+        'attempts': job.get('attempts', 0),
+        'error': job.get('error'),
+        'updated_at': job['updated_at'].isoformat()
+    }
 
-3. Once you believe all necessary questions have been answered, ask the user if they would like to create a formalized outline for the research report.
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    try:
+        if not ObjectId.is_valid(job_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid job ID format'
+            }), 400
 
-4. If the user agrees to create an outline, propose a structure for the research report based on the information gathered. Include main sections and subsections that would effectively organize the research findings.
+        job = db.summary_jobs.find_one({'_id': ObjectId(job_id)}, {'content': 0})
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
 
-Throughout this process, maintain a professional and collaborative tone. Be prepared to adapt your approach based on the user's responses and preferences.
+        return jsonify({
+            'success': True,
+            'job': serialize_job(job)
+        })
+    except Exception as e:
+        logger.error(f"Error fetching job status: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
-Please format your output as follows:
+@app.route('/api/folders/<folder_id>/jobs', methods=['GET'])
+def get_folder_jobs(folder_id):
+    """List summary jobs for a folder that are still queued or running."""
+    try:
+        if not ObjectId.is_valid(folder_id):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid folder ID format'
+            }), 400
 
-<research_assistant>
-[Your questions, comments, and proposed outline go here]
-</research_assistant>
+        jobs = db.summary_jobs.find(
+            {'folder_id': ObjectId(folder_id), 'status': {'$in': ['queued', 'running']}},
+            {'content': 0}
+        )
 
-Begin by introducing yourself and asking your first question about the research topic."""},
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=1000,
-        temperature=0.7
-    )
-    return response.content[0].text
-
-def generate_openai_summary(prompt):
-    """Generate summary using OpenAI as fallback."""
-    response = openai_client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that summarizes documents."},
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=500
-    )
-    return response.choices[0].message.content
+        return jsonify({
+            'success': True,
+            'jobs': [serialize_job(job) for job in jobs]
+        })
+    except Exception as e:
+        logger.error(f"Error fetching folder jobs: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
 # Utility function to check allowed file extensions
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
-def extract_text_from_pdf(file_path):
+# Worker processes do the parsing; these threads only wait on their pipes
+extract_pool = pdf_extraction.ExtractionPool(app.config['EXTRACT_WORKERS'])
+extract_executor = ThreadPoolExecutor(
+    max_workers=app.config['EXTRACT_WORKERS'],
+    thread_name_prefix='pdf-extract'
+)
+
+def iter_pdf_pages(data, max_pages):
+    """Yield page texts in order.
+
+    Small PDFs are extracted in-process. Larger ones are copied once into
+    shared memory and split into page batches for the extraction workers,
+    each of which parses the upload once. The segment is released only
+    after every batch has finished or been cancelled, including when the
+    caller stops reading early.
+    """
+    if len(data) <= app.config['EXTRACT_INLINE_BYTES']:
+        reader = PdfReader(BytesIO(data))
+        for i in range(min(len(reader.pages), max_pages)):
+            yield reader.pages[i].extract_text() or ''
+        return
+
+    segment = shared_memory.SharedMemory(create=True, size=len(data))
+    futures = []
+    try:
+        segment.buf[:len(data)] = data
+        page_count = min(extract_pool.page_count(segment.name, len(data)), max_pages)
+        batch_size = app.config['EXTRACT_BATCH_PAGES']
+        futures = [
+            extract_executor.submit(
+                extract_pool.extract, segment.name, len(data), start, min(start + batch_size, page_count)
+            )
+            for start in range(0, page_count, batch_size)
+        ]
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        segment.close()
+        segment.unlink()
+
+def join_capped(parts, max_chars):
+    """Join text parts with newlines, stopping once max_chars is reached."""
+    pieces = []
+    total = 0
+    for part in parts:
+        if total + len(part) >= max_chars:
+            pieces.append(part[:max_chars - total])
+            break
+        pieces.append(part)
+        total += len(part) + 1
+    return "\n".join(pieces)
+
+def extract_text_from_pdf(data):
     try:
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+        pages = iter_pdf_pages(data, app.config['EXTRACT_MAX_PAGES'])
+        return join_capped(pages, app.config['EXTRACT_MAX_CHARS'])
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         return None
 
-def extract_text_from_docx(file_path):
+def extract_text_from_docx(stream):
     try:
-        doc = docx.Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text
+        doc = docx.Document(stream)
+        paragraphs = (paragraph.text for paragraph in doc.paragraphs)
+        return join_capped(paragraphs, app.config['EXTRACT_MAX_CHARS'])
     except Exception as e:
         logger.error(f"Error extracting text from DOCX: {str(e)}")
         return None
@@ -1131,7 +4722,9 @@ def get_config():
             'summarize': 1,
             'chat': 1
         },
-        'max_results_per_search': 5,
+        'max_results_per_search': app.config['MAX_RESULTS_PER_SEARCH'],
+        'search_max_page_size': app.config['SEARCH_MAX_PAGE_SIZE'],
+        'search_max_depth': app.config['SEARCH_MAX_DEPTH'],
         'features': {
             'pdf_proxy': True,
             'chat': True,
@@ -1170,11 +4763,16 @@ def health_check():
         openai_status = bool(openai_client.api_key)
         anthropic_status = bool(anthropic_client.api_key)
         
+        engine_states = {engine: guard.get_state() for engine, guard in engine_guards.items()}
+        breakers_open = any(state['state'] != 'closed' for state in engine_states.values())
+        
         status = {
-            'status': 'healthy',
+            'status': 'degraded' if breakers_open else 'healthy',
             'mongodb': bool(mongo_status),
             'openai_api': openai_status,
             'anthropic_api': anthropic_status,
+            'search_engines': engine_states,
+            'server_mode': SERVER_MODE,
             'timestamp': datetime.utcnow().isoformat()
         }
         
@@ -1188,14 +4786,30 @@ def health_check():
         }), 500
 
 # Metrics endpoint
+@app.route('/metrics/prometheus')
+def prometheus_metrics():
+    """Traced latency histograms and quantiles in Prometheus text format."""
+    return Response(tracer.prometheus(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/metrics')
 def metrics():
-    """Basic metrics endpoint for monitoring"""
+    """Basic metrics endpoint for monitoring; never queries the database."""
     try:
+        snapshot = metrics_snapshot.get_stats()
         metrics_data = {
-            'folder_count': db.folders.count_documents({}),
-            'saved_results_count': db.saved_results.count_documents({}),
-            'chat_messages_count': db.chat_messages.count_documents({}),
+            'folder_count': snapshot['counts']['folders'],
+            'saved_results_count': snapshot['counts']['saved_results'],
+            'chat_messages_count': snapshot['counts']['chat_messages'],
+            'counts_refreshed_at': snapshot['refreshed_at'],
+            'features': snapshot['features'],
+            'search_cache': search_cache.get_stats(),
+            'http_pool': http_pool.get_stats(),
+            'summary_cache': summary_cache.get_stats(),
+            'rate_limiter': rate_limiter.get_stats(),
+            'search_engines': {engine: guard.get_state() for engine, guard in engine_guards.items()},
+            'search_prefetch': search_prefetcher.get_stats(),
+            'embedding_index': embedding_index.get_stats() if embedding_index else None,
+            'llm': llm_gateway.get_stats(),
             'timestamp': datetime.utcnow().isoformat()
         }
         
@@ -1211,7 +4825,7 @@ def validate_mongodb_connection():
     """Validate MongoDB connection and create required collections"""
     try:
         collections = db.list_collection_names()
-        required_collections = ['folders', 'saved_results', 'chat_messages']
+        required_collections = ['folders', 'saved_results', 'chat_messages', 'summary_jobs', 'documents']
         
         for collection in required_collections:
             if collection not in collections:
@@ -1230,6 +4844,7 @@ def cleanup_old_sessions():
         result = db.chat_messages.delete_many({
             'timestamp': {'$lt': thirty_days_ago}
         })
+        metrics_snapshot.adjust('chat_messages', -result.deleted_count)
         logger.info(f"Cleaned up {result.deleted_count} old chat messages")
     except Exception as e:
         logger.error(f"Session cleanup error: {str(e)}")
@@ -1268,8 +4883,14 @@ def initialize_app():
         if not scheduler:
             logger.warning("Background scheduler initialization failed")
         
-        # Initialize rate limiter
-        rate_limiter = RateLimiter()
+        # Start summary workers and pick up unfinished jobs
+        summary_jobs.start()
+
+        # Take the first metrics snapshot before anything scrapes
+        metrics_snapshot.start()
+
+        # Backfill results saved before the embedding index existed
+        threading.Thread(target=rebuild_embedding_index, name='embedding-rebuild', daemon=True).start()
         
         logger.info("Application initialized successfully")
         return True
@@ -1282,7 +4903,12 @@ if __name__ == '__main__':
     try:
         if initialize_app():
             # Set host to '0.0.0.0' to make it accessible from other machines
-            app.run(host='0.0.0.0', port=5000, debug=True)
+            if SERVER_MODE == 'gevent':
+                from gevent.pywsgi import WSGIServer
+                logger.info("Serving with gevent on 0.0.0.0:5000")
+                WSGIServer(('0.0.0.0', 5000), app).serve_forever()
+            else:
+                app.run(host='0.0.0.0', port=5000, debug=True)
         else:
             logger.error("Failed to initialize application")
             exit(1)
@@ -0,0 +1,157 @@
+"""HTML extraction for scraped search results and paper pages.
+
+Two modes are supported. ``full`` parses the whole page and runs CSS
+selectors over it, as the scrapers originally did. ``targeted`` locates the
+elements carrying an anchor class with a regular expression, cuts out just
+those elements (stopping after ``limit`` of them) and parses only that
+fragment. Both use lxml when it is installed and fall back to the stdlib
+``html.parser`` otherwise.
+
+This module has no Flask or database dependencies so the fixture checker in
+``tools/check_html_fixtures.py`` can run it on its own.
+"""
+import bisect
+import re
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+PARSE_MODES = ('targeted', 'full')
+
+@lru_cache(maxsize=64)
+def class_opening_pattern(class_name):
+    """Opening tags whose class attribute contains ``class_name`` as a whole token."""
+    return re.compile(
+        r'<([a-zA-Z][\w-]*)\b[^>]*?\sclass\s*=\s*(["\'])(?:[^"\']*\s)?'
+        + re.escape(class_name)
+        + r'(?:\s[^"\']*)?\2',
+        re.IGNORECASE
+    )
+
+# Script and style bodies and comments can contain markup-looking strings
+RAW_TEXT_PATTERN = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+
+@lru_cache(maxsize=64)
+def tag_boundary_pattern(tag):
+    return re.compile(r'<(/?)' + re.escape(tag) + r'\b[^>]*?(/?)>', re.IGNORECASE)
+
+def element_end(markup, start, tag):
+    """Offset just past the element opened at ``start``, or the end of the markup if unclosed."""
+    depth = 0
+    for match in tag_boundary_pattern(tag).finditer(markup, start):
+        if match.group(2):
+            if depth == 0:
+                return match.end()
+            continue
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return match.end()
+    return len(markup)
+
+def class_spans(markup, class_name, limit=None):
+    """``(start, end)`` offsets of the first ``limit`` outermost elements with ``class_name``."""
+    raw_text = [(match.start(), match.end()) for match in RAW_TEXT_PATTERN.finditer(markup)]
+    raw_starts = [start for start, _ in raw_text]
+    spans = []
+    for match in class_opening_pattern(class_name).finditer(markup):
+        if spans and match.start() < spans[-1][1]:
+            continue
+        enclosing = bisect.bisect_right(raw_starts, match.start()) - 1
+        if enclosing >= 0 and match.start() < raw_text[enclosing][1]:
+            continue
+        spans.append((match.start(), element_end(markup, match.start(), match.group(1))))
+        if limit is not None and len(spans) >= limit:
+            break
+    return spans
+
+def select_html(markup, selector, limit=None, anchor=None, mode='targeted'):
+    """Return up to ``limit`` elements matching the CSS ``selector``.
+
+    ``anchor`` is a class every match carries; it defaults to the first class
+    in the selector. In ``targeted`` mode only the anchored elements are
+    parsed, so content outside them is never built into a tree.
+    """
+    if mode == 'targeted':
+        anchor = anchor or selector.lstrip('.').split('.')[0].split(' ')[0]
+        # Only a bare class selector can stop early; compound ones may skip anchors
+        spans = class_spans(markup, anchor, limit if selector == f'.{anchor}' else None)
+        if not spans:
+            return []
+        markup = ''.join(markup[start:end] for start, end in spans)
+    soup = BeautifulSoup(markup, HTML_PARSER)
+    matches = soup.select(selector)
+    return matches[:limit] if limit is not None else matches
+
+def meta_content(markup, name):
+    """Content of ``<meta name=...>``, parsing only meta tags."""
+    soup = BeautifulSoup(markup, HTML_PARSER, parse_only=SoupStrainer('meta'))
+    meta = soup.find('meta', {'name': name})
+    return meta['content'] if meta and meta.get('content') else ''
+
+def parse_duckduckgo_results(markup, limit=5, mode='targeted'):
+    results = []
+    for result in select_html(markup, '.result', limit, mode=mode):
+        title_elem = result.select_one('.result__title')
+        snippet_elem = result.select_one('.result__snippet')
+        url_elem = result.select_one('.result__url')
+
+        if title_elem and snippet_elem:
+            results.append({
+                'title': title_elem.get_text(strip=True),
+                'description': snippet_elem.get_text(strip=True),
+                'url': url_elem.get('href') if url_elem else '#'
+            })
+    return results
+
+def parse_biorxiv_results(markup, limit=5, mode='targeted', on_error=None):
+    results = []
+    for article in select_html(markup, '.highwire-article-citation', limit, mode=mode):
+        try:
+            title_elem = article.select_one('.highwire-cite-title')
+            title = title_elem.get_text(strip=True) if title_elem else 'No title available'
+
+            link = title_elem.find('a')['href'] if title_elem and title_elem.find('a') else ''
+            full_url = f"https://www.biorxiv.org{link}" if link else '#'
+
+            authors_elem = article.select_one('.highwire-citation-authors')
+            authors = authors_elem.get_text(strip=True) if authors_elem else 'No authors listed'
+
+            abstract_elem = article.select_one('.highwire-cite-snippet')
+            abstract = abstract_elem.get_text(strip=True) if abstract_elem else 'No abstract available'
+
+            date_elem = article.select_one('.highwire-cite-metadata-date')
+            date = date_elem.get_text(strip=True) if date_elem else 'Date not available'
+
+            results.append({
+                'title': title,
+                'description': abstract[:200] + '...' if len(abstract) > 200 else abstract,
+                'url': full_url,
+                'pdf_url': f"{full_url}.full.pdf" if full_url != '#' else None,
+                'authors': authors,
+                'published': date
+            })
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            continue
+    return results
+
+def extract_paper_abstract(url, markup, mode='targeted'):
+    """Abstract or TL;DR text from an arXiv, bioRxiv or Semantic Scholar page."""
+    if 'arxiv.org' in url:
+        abstract_elem = next(iter(select_html(markup, '.abstract', 1, mode=mode)), None)
+        return abstract_elem.text.replace('Abstract:', '').strip() if abstract_elem else ''
+    if 'biorxiv.org' in url:
+        abstract_elem = next(iter(select_html(markup, '.abstract-content', 1, mode=mode)), None)
+        return abstract_elem.text.strip() if abstract_elem else ''
+
+    tldr_elem = next(iter(select_html(markup, '.tldr-abstract-replacement.text-truncator', 1, mode=mode)), None)
+    if tldr_elem:
+        return tldr_elem.text.strip()
+    return meta_content(markup, 'description')
@@ -0,0 +1,156 @@
+"""PDF text extraction in long-lived worker processes.
+
+Workers run this file as a script (``python pdf_extraction.py``) rather than
+through multiprocessing, whose spawn and forkserver children re-import the
+parent's ``__main__`` -- app.py when the app is started directly. A worker
+therefore imports only PyPDF2 and the standard library.
+
+The parent copies an upload into shared memory once and sends workers
+JSON-line requests naming the segment. A worker copies the bytes out,
+parses them once and reuses that reader for every later batch of pages
+from the same upload.
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from multiprocessing import resource_tracker, shared_memory
+
+from PyPDF2 import PdfReader
+
+# Readers kept per worker; uploads are extracted one file at a time
+READER_CACHE_SIZE = 2
+
+class ExtractionError(Exception):
+    """Raised when a worker could not extract text from a PDF"""
+    pass
+
+def attach_segment(name):
+    """Open a shared memory segment this process does not own."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the segment with this
+        # process's resource tracker, which would unlink it on exit
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+def open_pdf(readers, name, size):
+    reader = readers.get(name)
+    if reader is not None:
+        readers.move_to_end(name)
+        return reader
+    segment = attach_segment(name)
+    try:
+        data = bytes(segment.buf[:size])
+    finally:
+        segment.close()
+    reader = PdfReader(BytesIO(data))
+    readers[name] = reader
+    while len(readers) > READER_CACHE_SIZE:
+        readers.popitem(last=False)
+    return reader
+
+def handle(readers, request):
+    reader = open_pdf(readers, request['segment'], request['size'])
+    if request['op'] == 'count':
+        return {'pages': len(reader.pages)}
+    return {'texts': [reader.pages[i].extract_text() or '' for i in range(request['start'], request['end'])]}
+
+def serve(requests, responses):
+    """Worker loop: one JSON request per line in, one JSON response per line out."""
+    readers = OrderedDict()
+    for line in requests:
+        try:
+            response = handle(readers, json.loads(line))
+        except Exception as e:
+            response = {'error': f"{type(e).__name__}: {e}"}
+        responses.write(json.dumps(response) + '\n')
+        responses.flush()
+
+class ExtractionWorker:
+    """One worker process and its request pipe."""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding='utf-8'
+        )
+
+    def request(self, **request):
+        self.process.stdin.write(json.dumps(request) + '\n')
+        self.process.stdin.flush()
+        line = self.process.stdout.readline()
+        if not line:
+            raise OSError(f"PDF worker {self.process.pid} exited")
+        response = json.loads(line)
+        if 'error' in response:
+            raise ExtractionError(response['error'])
+        return response
+
+    def close(self):
+        self.process.kill()
+        self.process.wait()
+
+class ExtractionPool:
+    """Up to ``size`` workers, started on demand and reused across uploads."""
+
+    def __init__(self, size):
+        self.size = size
+        self.idle = queue.Queue()
+        self.started = 0
+        self.lock = threading.Lock()
+
+    def _checkout(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            start = self.started < self.size
+            if start:
+                self.started += 1
+        if start:
+            try:
+                return ExtractionWorker()
+            except Exception:
+                with self.lock:
+                    self.started -= 1
+                raise
+        return self.idle.get()
+
+    def request(self, **request):
+        worker = self._checkout()
+        try:
+            response = worker.request(**request)
+        except ExtractionError:
+            self.idle.put(worker)
+            raise
+        except Exception:
+            # Broken pipe or garbled reply: replace the worker
+            worker.close()
+            with self.lock:
+                self.started -= 1
+            raise
+        self.idle.put(worker)
+        return response
+
+    def page_count(self, segment, size):
+        return self.request(op='count', segment=segment, size=size)['pages']
+
+    def extract(self, segment, size, start, end):
+        """Text of pages [start, end) of the PDF held in ``segment``."""
+        return self.request(op='extract', segment=segment, size=size, start=start, end=end)['texts']
+
+if __name__ == '__main__':
+    # Keep stray prints from the PDF library out of the response stream
+    responses, sys.stdout = sys.stdout, sys.stderr
+    serve(sys.stdin, responses)
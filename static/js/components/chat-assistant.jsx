@@ -1,6 +1,7 @@
 // static/js/components/chat-assistant.jsx
 import React, { useState, useEffect, useRef } from 'react';
 import { Send, Bot, User } from 'lucide-react';
+import { readEventStream } from '../utils/event-stream.js';
 
 
 const formatMessage = (content) => {
@@ -47,12 +48,15 @@ const FormattedMessage = ({ content, type }) => {
     );
 };
 
-const ChatAssistant = ({ selectedFolder, folderContents }) => {
+const ChatAssistant = ({ selectedFolder }) => {
     const [messages, setMessages] = useState([]);
     const [input, setInput] = useState('');
     const [loading, setLoading] = useState(false);
     const [errorMessage, setErrorMessage] = useState(null);  // Changed from error to errorMessage
+    const [olderCursor, setOlderCursor] = useState(null);
+    const [loadingOlder, setLoadingOlder] = useState(false);
     const messagesEndRef = useRef(null);
+    const skipScrollRef = useRef(false);
 
     const scrollToBottom = () => {
         messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -63,10 +67,16 @@ const ChatAssistant = ({ selectedFolder, folderContents }) => {
             loadChatHistory();
         } else {
             setMessages([]);
+            setOlderCursor(null);
         }
     }, [selectedFolder]);
 
     useEffect(() => {
+        // Prepending older history should not jump to the bottom
+        if (skipScrollRef.current) {
+            skipScrollRef.current = false;
+            return;
+        }
         scrollToBottom();
     }, [messages]);
 
@@ -81,6 +91,7 @@ const ChatAssistant = ({ selectedFolder, folderContents }) => {
             if (data.success) {
                 console.log("Chat history loaded:", data.messages);
                 setMessages(data.messages);
+                setOlderCursor(data.next_cursor);
             } else {
                 throw new Error(data.error || 'Failed to load chat history');
             }
@@ -90,6 +101,31 @@ const ChatAssistant = ({ selectedFolder, folderContents }) => {
         }
     };
 
+    const loadOlderMessages = async () => {
+        if (!selectedFolder || !olderCursor || loadingOlder) return;
+
+        setLoadingOlder(true);
+        try {
+            const response = await fetch(
+                `/api/chat/history/${selectedFolder}?before=${encodeURIComponent(olderCursor)}`
+            );
+            const data = await response.json();
+
+            if (data.success) {
+                skipScrollRef.current = true;
+                setMessages(prev => [...data.messages, ...prev]);
+                setOlderCursor(data.next_cursor);
+            } else {
+                throw new Error(data.error || 'Failed to load chat history');
+            }
+        } catch (err) {
+            console.error('Error loading older messages:', err);
+            setErrorMessage('Failed to load older messages');
+        } finally {
+            setLoadingOlder(false);
+        }
+    };
+
     const handleSend = async () => {
         if (!input.trim() || !selectedFolder) return;
 
@@ -105,30 +141,52 @@ const ChatAssistant = ({ selectedFolder, folderContents }) => {
         setErrorMessage(null);  // Reset error message before new request
 
         try {
-            const response = await fetch('/api/chat/message', {
+            const response = await fetch('/api/chat/message/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream',
                 },
                 body: JSON.stringify({
                     message: input,
                     folderId: selectedFolder,
-                    folderContents: folderContents || [],
                 }),
             });
 
-            const data = await response.json();
-            if (data.success) {
-                const assistantMessage = {
-                    content: data.response,
-                    type: 'assistant',
-                    timestamp: new Date().toISOString(),
-                    provider: data.provider
-                };
-                setMessages(prev => [...prev, assistantMessage]);
-            } else {
+            if (!response.ok) {
+                const data = await response.json();
                 throw new Error(data.error || 'Failed to process message');
             }
+
+            // Append an empty assistant message and grow it as tokens arrive
+            setMessages(prev => [...prev, {
+                content: '',
+                type: 'assistant',
+                timestamp: new Date().toISOString()
+            }]);
+            setLoading(false);
+
+            const updateAssistantMessage = (update) => {
+                setMessages(prev => {
+                    const last = prev[prev.length - 1];
+                    return [...prev.slice(0, -1), { ...last, ...update(last) }];
+                });
+            };
+
+            let streamError = null;
+            await readEventStream(response, (event, data) => {
+                if (event === 'error') {
+                    streamError = data.error;
+                } else if (event === 'done') {
+                    updateAssistantMessage(() => ({ provider: data.provider }));
+                } else if (data.token) {
+                    updateAssistantMessage(last => ({ content: last.content + data.token }));
+                }
+            });
+
+            if (streamError) {
+                throw new Error(streamError);
+            }
         } catch (err) {
             console.error('Error sending message:', err);
             setErrorMessage(err.message);  // Using setErrorMessage
@@ -147,6 +205,17 @@ const ChatAssistant = ({ selectedFolder, folderContents }) => {
             )}
             
             <div className="flex-1 overflow-y-auto mb-4 space-y-4 p-4">
+                {selectedFolder && olderCursor && (
+                    <div className="text-center">
+                        <button
+                            onClick={loadOlderMessages}
+                            disabled={loadingOlder}
+                            className="text-sm text-blue-500 hover:text-blue-700 disabled:text-gray-400"
+                        >
+                            {loadingOlder ? 'Loading...' : 'Load earlier messages'}
+                        </button>
+                    </div>
+                )}
                 {!selectedFolder ? (
                     <div className="text-center text-gray-500 p-4">
                         Select a folder to start chatting about its contents
@@ -1,6 +1,6 @@
 // static/js/components/folder-viewer.jsx
 import React, { useState, useEffect, useRef } from 'react';
-import { ExternalLink, Folder, MessageSquare, Trash2, Upload, Plus } from 'lucide-react';
+import { ExternalLink, Folder, MessageSquare, Trash2, Upload, Plus, Search } from 'lucide-react';
 import ChatAssistant from './chat-assistant';
 
 // Safe link handler component
@@ -36,20 +36,67 @@ const FolderViewer = () => {
     const [error, setError] = useState(null);
     const [showNewFolderInput, setShowNewFolderInput] = useState(false);
     const [newFolderName, setNewFolderName] = useState('');
+    const [pendingResults, setPendingResults] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const fileInputRef = useRef(null);
+    const loadMoreRef = useRef(null);
+    const [libraryQuery, setLibraryQuery] = useState('');
+    const [libraryEngine, setLibraryEngine] = useState('');
+    const [librarySearch, setLibrarySearch] = useState(null);
 
     useEffect(() => {
         fetchFolders();
     }, []);
 
+    // Poll summary jobs while uploads are being summarized in the background
     useEffect(() => {
+        if (!selectedFolder || pendingResults.length === 0) return;
+
+        const interval = setInterval(async () => {
+            try {
+                const response = await fetch(`/api/folders/${selectedFolder}/jobs`);
+                const data = await response.json();
+                if (!data.success) return;
+
+                // Reload only the finished items so loaded pages stay in place
+                const running = new Set(data.jobs.map(job => job.result_id));
+                pendingResults
+                    .filter(resultId => !running.has(resultId))
+                    .forEach(resultId => refreshFolderItem(resultId));
+                setPendingResults(pendingResults.filter(resultId => running.has(resultId)));
+            } catch (error) {
+                console.error('Error polling summary jobs:', error);
+            }
+        }, 3000);
+
+        return () => clearInterval(interval);
+    }, [selectedFolder, pendingResults]);
+
+    useEffect(() => {
+        setPendingResults([]);
         if (selectedFolder) {
             fetchFolderContents(selectedFolder);
         } else {
             setFolderContents([]);
+            setNextCursor(null);
         }
     }, [selectedFolder]);
 
+    // Fetch the next page when the end of the list scrolls into view
+    useEffect(() => {
+        if (!nextCursor || !loadMoreRef.current) return;
+
+        const observer = new IntersectionObserver((entries) => {
+            if (entries[0].isIntersecting) {
+                fetchMoreFolderContents();
+            }
+        });
+        observer.observe(loadMoreRef.current);
+
+        return () => observer.disconnect();
+    }, [nextCursor, selectedFolder]);
+
     const fetchFolders = async () => {
         try {
             setLoading(true);
@@ -77,6 +124,7 @@ const FolderViewer = () => {
             
             if (data.success) {
                 setFolderContents(data.results);
+                setNextCursor(data.next_cursor);
             } else {
                 throw new Error(data.error || 'Failed to fetch folder contents');
             }
@@ -88,6 +136,87 @@ const FolderViewer = () => {
         }
     };
 
+    const fetchMoreFolderContents = async () => {
+        if (!nextCursor || loadingMore) return;
+
+        try {
+            setLoadingMore(true);
+            const response = await fetch(
+                `/api/folders/${selectedFolder}/results?cursor=${encodeURIComponent(nextCursor)}`
+            );
+            const data = await response.json();
+
+            if (data.success) {
+                setFolderContents(prev => [...prev, ...data.results]);
+                setNextCursor(data.next_cursor);
+            } else {
+                throw new Error(data.error || 'Failed to fetch folder contents');
+            }
+        } catch (error) {
+            console.error('Error fetching more folder contents:', error);
+            setError('Failed to load folder contents');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
+    const refreshFolderItem = async (contentId) => {
+        try {
+            const response = await fetch(`/api/folders/${selectedFolder}/results/${contentId}`);
+            const data = await response.json();
+
+            if (data.success) {
+                setFolderContents(prev => prev.map(item =>
+                    item.id === contentId ? { ...item, ...data.result, ai_summary_truncated: false } : item
+                ));
+            }
+        } catch (error) {
+            console.error('Error refreshing folder item:', error);
+        }
+    };
+
+    const handleExpandSummary = async (contentId) => {
+        try {
+            const response = await fetch(`/api/folders/${selectedFolder}/results/${contentId}`);
+            const data = await response.json();
+
+            if (data.success) {
+                setFolderContents(prev => prev.map(item =>
+                    item.id === contentId ? { ...item, ...data.result, ai_summary_truncated: false } : item
+                ));
+            } else {
+                throw new Error(data.error || 'Failed to load summary');
+            }
+        } catch (error) {
+            console.error('Error loading full summary:', error);
+            setError(error.message);
+        }
+    };
+
+    const searchLibrary = async (engine = libraryEngine) => {
+        if (!libraryQuery.trim()) {
+            setLibrarySearch(null);
+            return;
+        }
+
+        try {
+            const params = new URLSearchParams({ q: libraryQuery.trim() });
+            if (engine) params.append('engine', engine);
+            const response = await fetch(`/api/library/search?${params}`);
+            const data = await response.json();
+
+            if (data.success) {
+                setLibraryEngine(engine);
+                setLibrarySearch(data);
+            } else {
+                throw new Error(data.error || 'Failed to search library');
+            }
+        } catch (error) {
+            console.error('Error searching library:', error);
+            setError(error.message);
+        }
+    };
+
     const handleCreateFolder = async () => {
         if (!newFolderName.trim()) {
             setError('Please enter a folder name');
@@ -178,6 +307,7 @@ const FolderViewer = () => {
             const data = await response.json();
             if (data.success) {
                 fetchFolderContents(selectedFolder);
+                setPendingResults(data.files.filter(file => file.job_id).map(file => file.id));
             } else {
                 throw new Error(data.error || 'Failed to upload files');
             }
@@ -330,6 +460,57 @@ const FolderViewer = () => {
                     </div>
                 </div>
 
+                <div className="bg-white rounded-lg shadow-lg p-6">
+                    <h2 className="text-xl font-bold mb-4">Search Library</h2>
+                    <div className="flex space-x-2">
+                        <input
+                            type="text"
+                            value={libraryQuery}
+                            onChange={(e) => setLibraryQuery(e.target.value)}
+                            onKeyPress={(e) => e.key === 'Enter' && searchLibrary('')}
+                            placeholder="Search titles, summaries, notes and uploads..."
+                            className="flex-1 px-3 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500"
+                        />
+                        <button
+                            onClick={() => searchLibrary('')}
+                            className="bg-blue-500 text-white px-4 py-2 rounded hover:bg-blue-600 flex items-center"
+                        >
+                            <Search className="w-4 h-4" />
+                        </button>
+                    </div>
+
+                    {librarySearch && (
+                        <div className="mt-4 space-y-3">
+                            <div className="flex flex-wrap gap-2 text-sm">
+                                <span className="text-gray-500">{librarySearch.total} matches</span>
+                                {librarySearch.facets.engine.map(facet => (
+                                    <button
+                                        key={facet.value}
+                                        onClick={() => searchLibrary(libraryEngine === facet.value ? '' : facet.value)}
+                                        className={`px-2 py-0.5 rounded-full ${
+                                            libraryEngine === facet.value ? 'bg-blue-500 text-white' : 'bg-gray-100 text-gray-700'
+                                        }`}
+                                    >
+                                        {facet.value || 'unknown'} ({facet.count})
+                                    </button>
+                                ))}
+                            </div>
+                            {librarySearch.results.map(item => (
+                                <div
+                                    key={item.id}
+                                    onClick={() => setSelectedFolder(item.folder_id)}
+                                    className="border rounded-lg p-3 cursor-pointer hover:bg-gray-50"
+                                >
+                                    <div className="font-medium text-blue-600">{item.title}</div>
+                                    <div className="text-xs text-gray-500 mt-1">
+                                        {folders.find(folder => folder.id === item.folder_id)?.name} · {item.engine}
+                                    </div>
+                                </div>
+                            ))}
+                        </div>
+                    )}
+                </div>
+
                 {selectedFolder && (
                     <div className="bg-white rounded-lg shadow-lg p-6">
                         <h2 className="text-xl font-bold mb-4">Folder Contents</h2>
@@ -359,7 +540,16 @@ const FolderViewer = () => {
                                         <div className="font-medium text-gray-700">AI Summary:</div>
                                         <div className="text-gray-600 text-sm whitespace-pre-line mt-1">
                                             {item.ai_summary}
+                                            {item.ai_summary_truncated && '...'}
                                         </div>
+                                        {item.ai_summary_truncated && (
+                                            <button
+                                                onClick={() => handleExpandSummary(item.id)}
+                                                className="text-blue-500 hover:text-blue-700 text-sm mt-1"
+                                            >
+                                                Show full summary
+                                            </button>
+                                        )}
                                     </div>
                                 )}
                                 {item.custom_notes && (
@@ -373,6 +563,14 @@ const FolderViewer = () => {
                             </div>
                         ))}
 
+                            {nextCursor && (
+                                <div ref={loadMoreRef} className="flex justify-center py-4">
+                                    {loadingMore && (
+                                        <div className="animate-spin rounded-full h-6 w-6 border-b-2 border-blue-500"></div>
+                                    )}
+                                </div>
+                            )}
+
                             {folderContents.length === 0 && !loading && (
                                 <div className="text-center text-gray-500 py-4">
                                     No items in this folder yet. Add some from the search results!
@@ -384,10 +582,7 @@ const FolderViewer = () => {
             </div>
 
             <div className="bg-white rounded-lg shadow-lg p-6 h-[calc(100vh-2rem)]">
-                <ChatAssistant
-                    selectedFolder={selectedFolder}
-                    folderContents={folderContents}
-                />
+                <ChatAssistant selectedFolder={selectedFolder} />
             </div>
         </div>
     );
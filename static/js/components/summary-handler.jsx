@@ -1,15 +1,17 @@
 // Create a new file: static/js/components/summary-handler.jsx
 import React, { useState } from 'react';
+import { readEventStream } from '../utils/event-stream.js';
 
-export const handleSummarize = async (result) => {
+// Streams the summary; onToken receives the text generated so far
+export const handleSummarize = async (result, onToken = () => {}) => {
     try {
         console.log('Generating summary for:', result.title);
         
-        const response = await fetch('/summarize', {
+        const response = await fetch('/summarize/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
-                'Accept': 'application/json'
+                'Accept': 'text/event-stream'
             },
             body: JSON.stringify({
                 url: result.url,
@@ -23,16 +25,23 @@ export const handleSummarize = async (result) => {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
 
-        const data = await response.json();
-        console.log('Summary response:', data);
+        let summary = '';
+        let streamError = null;
+        await readEventStream(response, (event, data) => {
+            if (event === 'error') {
+                streamError = data.error;
+            } else if (data.token) {
+                summary += data.token;
+                onToken(summary);
+            }
+        });
 
-        if (data.success && data.summary) {
-            return data.summary;
-        } else {
-            throw new Error(data.error || 'Failed to generate summary');
+        if (streamError || !summary) {
+            throw new Error(streamError || 'Failed to generate summary');
         }
+        return summary;
     } catch (error) {
         console.error('Error in handleSummarize:', error);
         throw error;
     }
-};
\ No newline at end of file
+};
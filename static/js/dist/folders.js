@@ -24457,14 +24457,6 @@
     }
   });
 
-  // static/js/folders.js
-  var import_react4 = __toESM(require_react(), 1);
-  var import_client = __toESM(require_client(), 1);
-
-  // static/js/components/folder-viewer.jsx
-  var import_react3 = __toESM(require_react(), 1);
-
-  // node_modules/lucide-react/dist/esm/createLucideIcon.mjs
   var import_react = __toESM(require_react(), 1);
 
   // node_modules/lucide-react/dist/esm/defaultAttributes.mjs
@@ -24520,7 +24512,7 @@
   ]);
 
   // node_modules/lucide-react/dist/esm/icons/external-link.mjs
-  var ExternalLink2 = createLucideIcon$1("ExternalLink", [
+  var ExternalLink = createLucideIcon$1("ExternalLink", [
     [
       "path",
       {
@@ -24533,7 +24525,7 @@
   ]);
 
   // node_modules/lucide-react/dist/esm/icons/folder.mjs
-  var Folder2 = createLucideIcon$1("Folder", [
+  var Folder = createLucideIcon$1("Folder", [
     [
       "path",
       {
@@ -24543,12 +24535,26 @@
     ]
   ]);
 
+  // node_modules/lucide-react/dist/esm/icons/message-square.mjs
+  var MessageSquare = createLucideIcon$1("MessageSquare", [
+    [
+      "path",
+      { d: "M21 15a2 2 0 0 1-2 2H7l-4 4V5a2 2 0 0 1 2-2h14a2 2 0 0 1 2 2z", key: "1lwn4ng" }
+    ]
+  ]);
+
   // node_modules/lucide-react/dist/esm/icons/plus.mjs
   var Plus = createLucideIcon$1("Plus", [
     ["path", { d: "M5 12h14", key: "1ays0h" }],
     ["path", { d: "M12 5v14", key: "s699le" }]
   ]);
 
+  // node_modules/lucide-react/dist/esm/icons/search.mjs
+  var Search = createLucideIcon$1("Search", [
+    ["circle", { cx: "11", cy: "11", r: "8", key: "4ej97u" }],
+    ["path", { d: "m21 21-4.3-4.3", key: "1qie3q" }]
+  ]);
+
   // node_modules/lucide-react/dist/esm/icons/send.mjs
   var Send = createLucideIcon$1("Send", [
     ["path", { d: "m22 2-7 20-4-9-9-4Z", key: "1q3vgg" }],
@@ -24556,7 +24562,7 @@
   ]);
 
   // node_modules/lucide-react/dist/esm/icons/trash-2.mjs
-  var Trash22 = createLucideIcon$1("Trash2", [
+  var Trash2 = createLucideIcon$1("Trash2", [
     ["path", { d: "M3 6h18", key: "d0wm0j" }],
     ["path", { d: "M19 6v14c0 1-1 2-2 2H7c-1 0-2-1-2-2V6", key: "4alrt4" }],
     ["path", { d: "M8 6V4c0-1 1-2 2-2h4c1 0 2 1 2 2v2", key: "v07s0e" }],
@@ -24577,619 +24583,936 @@
     ["circle", { cx: "12", cy: "7", r: "4", key: "17ys0d" }]
   ]);
 
-  // static/js/components/chat-assistant.jsx
-  var import_react2 = __toESM(require_react(), 1);
+  var lucide_react_exports = { Bot, ExternalLink, Folder, MessageSquare, Plus, Search, Send, Trash2, Upload, User };
+
+  var import_client = __toESM(require_client(), 1);
   var import_jsx_runtime = __toESM(require_jsx_runtime(), 1);
-  var formatMessage = (content) => {
-    if (!content)
-      return "";
-    return content.split("\n\n").map((paragraph) => `<p>${paragraph.trim()}</p>`).join("").replace(/^\d+\.\s+(.+)$/gm, "<li>$1</li>").replace(/(<li>.*<\/li>\n?)+/g, "<ol>$&</ol>").replace(/^[-•]\s+(.+)$/gm, "<li>$1</li>").replace(/(<li>.*<\/li>\n?)+/g, "<ul>$&</ul>").replace(/^(#{1,6})\s+(.+)$/gm, (_, hashes, text) => `<h${hashes.length} class="text-lg font-semibold mt-4 mb-2">${text.trim()}</h${hashes.length}>`).replace(/\*\*(.*?)\*\*/g, "<strong>$1</strong>").replace(/\*(.*?)\*/g, "<em>$1</em>").replace(/`([^`]+)`/g, '<code class="bg-gray-100 px-1 rounded">$1</code>');
-  };
-  var FormattedMessage = ({ content, type }) => {
-    const messageClass = type === "user" ? "bg-blue-500 text-white" : "bg-gray-100 text-gray-800";
-    return /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: `p-4 rounded-lg max-w-[80%] prose ${messageClass}`, children: /* @__PURE__ */ (0, import_jsx_runtime.jsx)(
-      "div",
-      {
-        className: "message-content",
-        dangerouslySetInnerHTML: {
-          __html: formatMessage(content)
-        }
+
+  // static/js/utils/event-stream.js
+  var event_stream_exports = /* @__PURE__ */ (() => {
+    const readEventStream = async (response, onEvent) => {
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done)
+          break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        events.forEach((rawEvent) => {
+          let eventName = "message";
+          let data = "";
+          rawEvent.split("\n").forEach((line) => {
+            if (line.startsWith("event: "))
+              eventName = line.slice(7);
+            else if (line.startsWith("data: "))
+              data += line.slice(6);
+          });
+          if (data)
+            onEvent(eventName, JSON.parse(data));
+        });
       }
-    ) });
-  };
-  var ChatAssistant = ({ selectedFolder, folderContents }) => {
-    const [messages, setMessages] = (0, import_react2.useState)([]);
-    const [input, setInput] = (0, import_react2.useState)("");
-    const [loading, setLoading] = (0, import_react2.useState)(false);
-    const [errorMessage, setErrorMessage] = (0, import_react2.useState)(null);
-    const messagesEndRef = (0, import_react2.useRef)(null);
-    const scrollToBottom = () => {
-      messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
     };
-    (0, import_react2.useEffect)(() => {
-      if (selectedFolder) {
-        loadChatHistory();
-      } else {
-        setMessages([]);
-      }
-    }, [selectedFolder]);
-    (0, import_react2.useEffect)(() => {
-      scrollToBottom();
-    }, [messages]);
-    const loadChatHistory = async () => {
-      if (!selectedFolder)
-        return;
-      try {
-        console.log("Loading chat history for folder:", selectedFolder);
-        const response = await fetch(`/api/chat/history/${selectedFolder}`);
-        const data = await response.json();
-        if (data.success) {
-          console.log("Chat history loaded:", data.messages);
-          setMessages(data.messages);
-        } else {
-          throw new Error(data.error || "Failed to load chat history");
+    return { readEventStream };
+  })();
+
+  // static/js/components/chat-assistant.jsx
+  var chat_assistant_exports = (() => {
+    const { jsx, jsxs } = import_jsx_runtime;
+    const React = import_react.default;
+    const { useState: useState2, useEffect: useEffect2, useRef } = import_react;
+    const { Send, Bot, User } = lucide_react_exports;
+    const { readEventStream } = event_stream_exports;
+    const formatMessage = (content) => {
+      if (!content)
+        return "";
+      return content.split("\n\n").map((paragraph) => `<p>${paragraph.trim()}</p>`).join("").replace(/^\d+\.\s+(.+)$/gm, "<li>$1</li>").replace(/(<li>.*<\/li>\n?)+/g, "<ol>$&</ol>").replace(/^[-•]\s+(.+)$/gm, "<li>$1</li>").replace(/(<li>.*<\/li>\n?)+/g, "<ul>$&</ul>").replace(/^(#{1,6})\s+(.+)$/gm, (_, hashes, text) => `<h${hashes.length} class="text-lg font-semibold mt-4 mb-2">${text.trim()}</h${hashes.length}>`).replace(/\*\*(.*?)\*\*/g, "<strong>$1</strong>").replace(/\*(.*?)\*/g, "<em>$1</em>").replace(/`([^`]+)`/g, '<code class="bg-gray-100 px-1 rounded">$1</code>');
+    };
+    const FormattedMessage = ({ content, type }) => {
+      const messageClass = type === "user" ? "bg-blue-500 text-white" : "bg-gray-100 text-gray-800";
+      return /* @__PURE__ */ jsx("div", { className: `p-4 rounded-lg max-w-[80%] prose ${messageClass}`, children: /* @__PURE__ */ jsx(
+        "div",
+        {
+          className: "message-content",
+          dangerouslySetInnerHTML: {
+            __html: formatMessage(content)
+          }
         }
-      } catch (err) {
-        console.error("Error loading chat history:", err);
-        setErrorMessage("Failed to load chat history");
-      }
+      ) });
     };
-    const handleSend = async () => {
-      if (!input.trim() || !selectedFolder)
-        return;
-      const userMessage = {
-        content: input,
-        type: "user",
-        timestamp: (/* @__PURE__ */ new Date()).toISOString()
+    const ChatAssistant = ({ selectedFolder }) => {
+      const [messages, setMessages] = useState2([]);
+      const [input, setInput] = useState2("");
+      const [loading, setLoading] = useState2(false);
+      const [errorMessage, setErrorMessage] = useState2(null);
+      const [olderCursor, setOlderCursor] = useState2(null);
+      const [loadingOlder, setLoadingOlder] = useState2(false);
+      const messagesEndRef = useRef(null);
+      const skipScrollRef = useRef(false);
+      const scrollToBottom = () => {
+        messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
       };
-      setMessages((prev) => [...prev, userMessage]);
-      setInput("");
-      setLoading(true);
-      setErrorMessage(null);
-      try {
-        const response = await fetch("/api/chat/message", {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json"
-          },
-          body: JSON.stringify({
-            message: input,
-            folderId: selectedFolder,
-            folderContents: folderContents || []
-          })
-        });
-        const data = await response.json();
-        if (data.success) {
-          const assistantMessage = {
-            content: data.response,
-            type: "assistant",
-            timestamp: (/* @__PURE__ */ new Date()).toISOString(),
-            provider: data.provider
-          };
-          setMessages((prev) => [...prev, assistantMessage]);
+      useEffect2(() => {
+        if (selectedFolder) {
+          loadChatHistory();
         } else {
-          throw new Error(data.error || "Failed to process message");
+          setMessages([]);
+          setOlderCursor(null);
+        }
+      }, [selectedFolder]);
+      useEffect2(() => {
+        if (skipScrollRef.current) {
+          skipScrollRef.current = false;
+          return;
         }
-      } catch (err) {
-        console.error("Error sending message:", err);
-        setErrorMessage(err.message);
-      } finally {
-        setLoading(false);
         scrollToBottom();
-      }
-    };
-    return /* @__PURE__ */ (0, import_jsx_runtime.jsxs)("div", { className: "flex flex-col h-full", children: [
-      errorMessage && /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "bg-red-100 border border-red-400 text-red-700 px-4 py-3 rounded relative mb-4", children: errorMessage }),
-      /* @__PURE__ */ (0, import_jsx_runtime.jsxs)("div", { className: "flex-1 overflow-y-auto mb-4 space-y-4 p-4", children: [
-        !selectedFolder ? /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "text-center text-gray-500 p-4", children: "Select a folder to start chatting about its contents" }) : messages.length === 0 ? /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "text-center text-gray-500 p-4", children: "No messages yet. Start a conversation about the folder's contents!" }) : messages.map((message, index) => /* @__PURE__ */ (0, import_jsx_runtime.jsxs)(
-          "div",
-          {
-            className: `flex items-start space-x-2 ${message.type === "user" ? "justify-end" : "justify-start"}`,
-            children: [
-              message.type === "assistant" && /* @__PURE__ */ (0, import_jsx_runtime.jsx)(Bot, { className: "w-6 h-6 text-blue-500" }),
-              /* @__PURE__ */ (0, import_jsx_runtime.jsx)(FormattedMessage, { content: message.content, type: message.type }),
-              message.type === "user" && /* @__PURE__ */ (0, import_jsx_runtime.jsx)(User, { className: "w-6 h-6 text-blue-500" })
-            ]
-          },
-          index
-        )),
-        loading && /* @__PURE__ */ (0, import_jsx_runtime.jsxs)("div", { className: "flex items-center space-x-2", children: [
-          /* @__PURE__ */ (0, import_jsx_runtime.jsx)(Bot, { className: "w-6 h-6 text-blue-500" }),
-          /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "bg-gray-100 rounded-lg p-4", children: /* @__PURE__ */ (0, import_jsx_runtime.jsxs)("div", { className: "flex space-x-2", children: [
-            /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "w-2 h-2 bg-gray-500 rounded-full animate-bounce" }),
-            /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "w-2 h-2 bg-gray-500 rounded-full animate-bounce delay-100" }),
-            /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "w-2 h-2 bg-gray-500 rounded-full animate-bounce delay-200" })
-          ] }) })
+      }, [messages]);
+      const loadChatHistory = async () => {
+        if (!selectedFolder)
+          return;
+        try {
+          console.log("Loading chat history for folder:", selectedFolder);
+          const response = await fetch(`/api/chat/history/${selectedFolder}`);
+          const data = await response.json();
+          if (data.success) {
+            console.log("Chat history loaded:", data.messages);
+            setMessages(data.messages);
+            setOlderCursor(data.next_cursor);
+          } else {
+            throw new Error(data.error || "Failed to load chat history");
+          }
+        } catch (err) {
+          console.error("Error loading chat history:", err);
+          setErrorMessage("Failed to load chat history");
+        }
+      };
+      const loadOlderMessages = async () => {
+        if (!selectedFolder || !olderCursor || loadingOlder)
+          return;
+        setLoadingOlder(true);
+        try {
+          const response = await fetch(
+            `/api/chat/history/${selectedFolder}?before=${encodeURIComponent(olderCursor)}`
+          );
+          const data = await response.json();
+          if (data.success) {
+            skipScrollRef.current = true;
+            setMessages((prev) => [...data.messages, ...prev]);
+            setOlderCursor(data.next_cursor);
+          } else {
+            throw new Error(data.error || "Failed to load chat history");
+          }
+        } catch (err) {
+          console.error("Error loading older messages:", err);
+          setErrorMessage("Failed to load older messages");
+        } finally {
+          setLoadingOlder(false);
+        }
+      };
+      const handleSend = async () => {
+        if (!input.trim() || !selectedFolder)
+          return;
+        const userMessage = {
+          content: input,
+          type: "user",
+          timestamp: (/* @__PURE__ */ new Date()).toISOString()
+        };
+        setMessages((prev) => [...prev, userMessage]);
+        setInput("");
+        setLoading(true);
+        setErrorMessage(null);
+        try {
+          const response = await fetch("/api/chat/message/stream", {
+            method: "POST",
+            headers: {
+              "Content-Type": "application/json",
+              "Accept": "text/event-stream"
+            },
+            body: JSON.stringify({
+              message: input,
+              folderId: selectedFolder
+            })
+          });
+          if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error || "Failed to process message");
+          }
+          setMessages((prev) => [...prev, {
+            content: "",
+            type: "assistant",
+            timestamp: (/* @__PURE__ */ new Date()).toISOString()
+          }]);
+          setLoading(false);
+          const updateAssistantMessage = (update) => {
+            setMessages((prev) => {
+              const last = prev[prev.length - 1];
+              return [...prev.slice(0, -1), { ...last, ...update(last) }];
+            });
+          };
+          let streamError = null;
+          await readEventStream(response, (event, data) => {
+            if (event === "error") {
+              streamError = data.error;
+            } else if (event === "done") {
+              updateAssistantMessage(() => ({ provider: data.provider }));
+            } else if (data.token) {
+              updateAssistantMessage((last) => ({ content: last.content + data.token }));
+            }
+          });
+          if (streamError) {
+            throw new Error(streamError);
+          }
+        } catch (err) {
+          console.error("Error sending message:", err);
+          setErrorMessage(err.message);
+        } finally {
+          setLoading(false);
+          scrollToBottom();
+        }
+      };
+      return /* @__PURE__ */ jsxs("div", { className: "flex flex-col h-full", children: [
+        errorMessage && /* @__PURE__ */ jsx("div", { className: "bg-red-100 border border-red-400 text-red-700 px-4 py-3 rounded relative mb-4", children: errorMessage }),
+        /* @__PURE__ */ jsxs("div", { className: "flex-1 overflow-y-auto mb-4 space-y-4 p-4", children: [
+          selectedFolder && olderCursor && /* @__PURE__ */ jsx("div", { className: "text-center", children: /* @__PURE__ */ jsx(
+            "button",
+            {
+              onClick: loadOlderMessages,
+              disabled: loadingOlder,
+              className: "text-sm text-blue-500 hover:text-blue-700 disabled:text-gray-400",
+              children: loadingOlder ? "Loading..." : "Load earlier messages"
+            }
+          ) }),
+          !selectedFolder ? /* @__PURE__ */ jsx("div", { className: "text-center text-gray-500 p-4", children: "Select a folder to start chatting about its contents" }) : messages.length === 0 ? /* @__PURE__ */ jsx("div", { className: "text-center text-gray-500 p-4", children: "No messages yet. Start a conversation about the folder's contents!" }) : messages.map((message, index) => /* @__PURE__ */ jsxs(
+            "div",
+            {
+              className: `flex items-start space-x-2 ${message.type === "user" ? "justify-end" : "justify-start"}`,
+              children: [
+                message.type === "assistant" && /* @__PURE__ */ jsx(Bot, { className: "w-6 h-6 text-blue-500" }),
+                /* @__PURE__ */ jsx(FormattedMessage, { content: message.content, type: message.type }),
+                message.type === "user" && /* @__PURE__ */ jsx(User, { className: "w-6 h-6 text-blue-500" })
+              ]
+            },
+            index
+          )),
+          loading && /* @__PURE__ */ jsxs("div", { className: "flex items-center space-x-2", children: [
+            /* @__PURE__ */ jsx(Bot, { className: "w-6 h-6 text-blue-500" }),
+            /* @__PURE__ */ jsx("div", { className: "bg-gray-100 rounded-lg p-4", children: /* @__PURE__ */ jsxs("div", { className: "flex space-x-2", children: [
+              /* @__PURE__ */ jsx("div", { className: "w-2 h-2 bg-gray-500 rounded-full animate-bounce" }),
+              /* @__PURE__ */ jsx("div", { className: "w-2 h-2 bg-gray-500 rounded-full animate-bounce delay-100" }),
+              /* @__PURE__ */ jsx("div", { className: "w-2 h-2 bg-gray-500 rounded-full animate-bounce delay-200" })
+            ] }) })
+          ] }),
+          /* @__PURE__ */ jsx("div", { ref: messagesEndRef })
         ] }),
-        /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { ref: messagesEndRef })
-      ] }),
-      /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "border-t border-gray-200 p-4", children: /* @__PURE__ */ (0, import_jsx_runtime.jsxs)("div", { className: "flex space-x-2", children: [
-        /* @__PURE__ */ (0, import_jsx_runtime.jsx)(
-          "input",
-          {
-            type: "text",
-            value: input,
-            onChange: (e) => setInput(e.target.value),
-            onKeyPress: (e) => e.key === "Enter" && !e.shiftKey && handleSend(),
-            placeholder: selectedFolder ? "Ask about the contents of this folder..." : "Select a folder to start chatting",
-            disabled: !selectedFolder || loading,
-            className: "flex-1 p-2 border rounded-md focus:ring-2 focus:ring-blue-500 disabled:bg-gray-100"
-          }
-        ),
-        /* @__PURE__ */ (0, import_jsx_runtime.jsx)(
-          "button",
-          {
-            onClick: handleSend,
-            disabled: !selectedFolder || !input.trim() || loading,
-            className: "bg-blue-500 text-white p-2 rounded-md hover:bg-blue-600 disabled:bg-gray-300 disabled:cursor-not-allowed",
-            children: /* @__PURE__ */ (0, import_jsx_runtime.jsx)(Send, { className: "w-5 h-5" })
-          }
-        )
-      ] }) })
-    ] });
-  };
-  var chat_assistant_default = ChatAssistant;
+        /* @__PURE__ */ jsx("div", { className: "border-t border-gray-200 p-4", children: /* @__PURE__ */ jsxs("div", { className: "flex space-x-2", children: [
+          /* @__PURE__ */ jsx(
+            "input",
+            {
+              type: "text",
+              value: input,
+              onChange: (e) => setInput(e.target.value),
+              onKeyPress: (e) => e.key === "Enter" && !e.shiftKey && handleSend(),
+              placeholder: selectedFolder ? "Ask about the contents of this folder..." : "Select a folder to start chatting",
+              disabled: !selectedFolder || loading,
+              className: "flex-1 p-2 border rounded-md focus:ring-2 focus:ring-blue-500 disabled:bg-gray-100"
+            }
+          ),
+          /* @__PURE__ */ jsx(
+            "button",
+            {
+              onClick: handleSend,
+              disabled: !selectedFolder || !input.trim() || loading,
+              className: "bg-blue-500 text-white p-2 rounded-md hover:bg-blue-600 disabled:bg-gray-300 disabled:cursor-not-allowed",
+              children: /* @__PURE__ */ jsx(Send, { className: "w-5 h-5" })
+            }
+          )
+        ] }) })
+      ] });
+    };
+    var __default = ChatAssistant;
+    return { default: __default };
+  })();
 
   // static/js/components/folder-viewer.jsx
-  var import_jsx_runtime2 = __toESM(require_jsx_runtime(), 1);
-  var FolderViewer = () => {
-    const [folders, setFolders] = (0, import_react3.useState)([]);
-    const [selectedFolder, setSelectedFolder] = (0, import_react3.useState)(null);
-    const [folderContents, setFolderContents] = (0, import_react3.useState)([]);
-    const [loading, setLoading] = (0, import_react3.useState)(false);
-    const [error, setError] = (0, import_react3.useState)(null);
-    const [showNewFolderInput, setShowNewFolderInput] = (0, import_react3.useState)(false);
-    const [newFolderName, setNewFolderName] = (0, import_react3.useState)("");
-    const fileInputRef = (0, import_react3.useRef)(null);
-    (0, import_react3.useEffect)(() => {
-      fetchFolders();
-    }, []);
-    (0, import_react3.useEffect)(() => {
-      if (selectedFolder) {
-        fetchFolderContents(selectedFolder);
-      } else {
-        setFolderContents([]);
-      }
-    }, [selectedFolder]);
-    const fetchFolders = async () => {
-      try {
-        setLoading(true);
-        const response = await fetch("/api/folders");
-        const data = await response.json();
-        if (data.success) {
-          setFolders(data.folders);
-        } else {
-          throw new Error(data.error || "Failed to fetch folders");
+  var folder_viewer_exports = (() => {
+    const { jsx, jsxs } = import_jsx_runtime;
+    const React = import_react.default;
+    const { useState: useState2, useEffect: useEffect2, useRef } = import_react;
+    const { ExternalLink: ExternalLink2, Folder: Folder2, MessageSquare, Trash2: Trash22, Upload, Plus, Search } = lucide_react_exports;
+    const ChatAssistant = chat_assistant_exports.default;
+    const SafeLink = ({ url, title }) => {
+      const handleClick = (e) => {
+        e.preventDefault();
+        e.stopPropagation();
+        setTimeout(() => {
+          const newWindow = window.open();
+          if (newWindow) {
+            newWindow.opener = null;
+            newWindow.location = url;
+          }
+        }, 100);
+      };
+      return /* @__PURE__ */ jsxs(
+        "button",
+        {
+          onClick: handleClick,
+          className: "text-blue-600 hover:text-blue-800 flex items-center text-left",
+          children: [
+            /* @__PURE__ */ jsx("span", { children: title }),
+            /* @__PURE__ */ jsx(ExternalLink2, { className: "w-4 h-4 ml-1" })
+          ]
         }
-      } catch (error2) {
-        console.error("Error fetching folders:", error2);
-        setError("Failed to load folders");
-      } finally {
-        setLoading(false);
-      }
+      );
     };
-    const fetchFolderContents = async (folderId) => {
-      try {
-        setLoading(true);
-        const response = await fetch(`/api/folders/${folderId}/results`);
-        const data = await response.json();
-        if (data.success) {
-          setFolderContents(data.results);
+    const FolderViewer = () => {
+      const [folders, setFolders] = useState2([]);
+      const [selectedFolder, setSelectedFolder] = useState2(null);
+      const [folderContents, setFolderContents] = useState2([]);
+      const [loading, setLoading] = useState2(false);
+      const [error, setError] = useState2(null);
+      const [showNewFolderInput, setShowNewFolderInput] = useState2(false);
+      const [newFolderName, setNewFolderName] = useState2("");
+      const [pendingResults, setPendingResults] = useState2([]);
+      const [nextCursor, setNextCursor] = useState2(null);
+      const [loadingMore, setLoadingMore] = useState2(false);
+      const fileInputRef = useRef(null);
+      const loadMoreRef = useRef(null);
+      const [libraryQuery, setLibraryQuery] = useState2("");
+      const [libraryEngine, setLibraryEngine] = useState2("");
+      const [librarySearch, setLibrarySearch] = useState2(null);
+      useEffect2(() => {
+        fetchFolders();
+      }, []);
+      useEffect2(() => {
+        if (!selectedFolder || pendingResults.length === 0)
+          return;
+        const interval = setInterval(async () => {
+          try {
+            const response = await fetch(`/api/folders/${selectedFolder}/jobs`);
+            const data = await response.json();
+            if (!data.success)
+              return;
+            const running = new Set(data.jobs.map((job) => job.result_id));
+            pendingResults.filter((resultId) => !running.has(resultId)).forEach((resultId) => refreshFolderItem(resultId));
+            setPendingResults(pendingResults.filter((resultId) => running.has(resultId)));
+          } catch (error2) {
+            console.error("Error polling summary jobs:", error2);
+          }
+        }, 3e3);
+        return () => clearInterval(interval);
+      }, [selectedFolder, pendingResults]);
+      useEffect2(() => {
+        setPendingResults([]);
+        if (selectedFolder) {
+          fetchFolderContents(selectedFolder);
         } else {
-          throw new Error(data.error || "Failed to fetch folder contents");
+          setFolderContents([]);
+          setNextCursor(null);
         }
-      } catch (error2) {
-        console.error("Error fetching folder contents:", error2);
-        setError("Failed to load folder contents");
-      } finally {
-        setLoading(false);
-      }
-    };
-    const handleCreateFolder = async () => {
-      if (!newFolderName.trim()) {
-        setError("Please enter a folder name");
-        return;
-      }
-      try {
-        setLoading(true);
-        const response = await fetch("/api/folders", {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json"
-          },
-          body: JSON.stringify({ name: newFolderName.trim() })
+      }, [selectedFolder]);
+      useEffect2(() => {
+        if (!nextCursor || !loadMoreRef.current)
+          return;
+        const observer = new IntersectionObserver((entries) => {
+          if (entries[0].isIntersecting) {
+            fetchMoreFolderContents();
+          }
         });
-        const data = await response.json();
-        if (data.success) {
-          const newFolder = { id: data.folderId, name: newFolderName.trim() };
-          setFolders([...folders, newFolder]);
-          setSelectedFolder(data.folderId);
-          setNewFolderName("");
-          setShowNewFolderInput(false);
-          setError(null);
-        } else {
-          throw new Error(data.error || "Failed to create folder");
+        observer.observe(loadMoreRef.current);
+        return () => observer.disconnect();
+      }, [nextCursor, selectedFolder]);
+      const fetchFolders = async () => {
+        try {
+          setLoading(true);
+          const response = await fetch("/api/folders");
+          const data = await response.json();
+          if (data.success) {
+            setFolders(data.folders);
+          } else {
+            throw new Error(data.error || "Failed to fetch folders");
+          }
+        } catch (error2) {
+          console.error("Error fetching folders:", error2);
+          setError("Failed to load folders");
+        } finally {
+          setLoading(false);
         }
-      } catch (error2) {
-        console.error("Error creating folder:", error2);
-        setError(error2.message);
-      } finally {
-        setLoading(false);
-      }
-    };
-    const handleDeleteFolder = async (folderId, e) => {
-      e.stopPropagation();
-      if (!confirm("Are you sure you want to delete this folder and all its contents?")) {
-        return;
-      }
-      try {
-        setLoading(true);
-        const response = await fetch(`/api/folders/${folderId}`, {
-          method: "DELETE"
-        });
-        const data = await response.json();
-        if (data.success) {
-          setFolders(folders.filter((f) => f.id !== folderId));
-          if (selectedFolder === folderId) {
-            setSelectedFolder(null);
-            setFolderContents([]);
+      };
+      const fetchFolderContents = async (folderId) => {
+        try {
+          setLoading(true);
+          const response = await fetch(`/api/folders/${folderId}/results`);
+          const data = await response.json();
+          if (data.success) {
+            setFolderContents(data.results);
+            setNextCursor(data.next_cursor);
+          } else {
+            throw new Error(data.error || "Failed to fetch folder contents");
           }
-        } else {
-          throw new Error(data.error || "Failed to delete folder");
+        } catch (error2) {
+          console.error("Error fetching folder contents:", error2);
+          setError("Failed to load folder contents");
+        } finally {
+          setLoading(false);
         }
-      } catch (error2) {
-        console.error("Error deleting folder:", error2);
-        setError(error2.message);
-      } finally {
-        setLoading(false);
-      }
-    };
-    const handleFileUpload = async (event) => {
-      if (!selectedFolder) {
-        setError("Please select a folder first");
-        return;
-      }
-      const files = event.target.files;
-      if (!files || files.length === 0)
-        return;
-      const formData = new FormData();
-      formData.append("folder_id", selectedFolder);
-      Array.from(files).forEach((file) => {
-        formData.append("files", file);
-      });
-      try {
-        setLoading(true);
-        const response = await fetch("/api/folders/upload", {
-          method: "POST",
-          body: formData
-        });
-        const data = await response.json();
-        if (data.success) {
-          fetchFolderContents(selectedFolder);
-        } else {
-          throw new Error(data.error || "Failed to upload files");
+      };
+      const fetchMoreFolderContents = async () => {
+        if (!nextCursor || loadingMore)
+          return;
+        try {
+          setLoadingMore(true);
+          const response = await fetch(
+            `/api/folders/${selectedFolder}/results?cursor=${encodeURIComponent(nextCursor)}`
+          );
+          const data = await response.json();
+          if (data.success) {
+            setFolderContents((prev) => [...prev, ...data.results]);
+            setNextCursor(data.next_cursor);
+          } else {
+            throw new Error(data.error || "Failed to fetch folder contents");
+          }
+        } catch (error2) {
+          console.error("Error fetching more folder contents:", error2);
+          setError("Failed to load folder contents");
+        } finally {
+          setLoadingMore(false);
         }
-      } catch (error2) {
-        console.error("Error uploading files:", error2);
-        setError(error2.message);
-      } finally {
-        setLoading(false);
-        if (fileInputRef.current) {
-          fileInputRef.current.value = "";
+      };
+      const refreshFolderItem = async (contentId) => {
+        try {
+          const response = await fetch(`/api/folders/${selectedFolder}/results/${contentId}`);
+          const data = await response.json();
+          if (data.success) {
+            setFolderContents((prev) => prev.map(
+              (item) => item.id === contentId ? { ...item, ...data.result, ai_summary_truncated: false } : item
+            ));
+          }
+        } catch (error2) {
+          console.error("Error refreshing folder item:", error2);
         }
-      }
-    };
-    const handleDeleteContent = async (contentId) => {
-      if (!confirm("Are you sure you want to delete this item?")) {
-        return;
-      }
-      try {
-        setLoading(true);
-        const response = await fetch(`/api/folders/${selectedFolder}/results/${contentId}`, {
-          method: "DELETE"
+      };
+      const handleExpandSummary = async (contentId) => {
+        try {
+          const response = await fetch(`/api/folders/${selectedFolder}/results/${contentId}`);
+          const data = await response.json();
+          if (data.success) {
+            setFolderContents((prev) => prev.map(
+              (item) => item.id === contentId ? { ...item, ...data.result, ai_summary_truncated: false } : item
+            ));
+          } else {
+            throw new Error(data.error || "Failed to load summary");
+          }
+        } catch (error2) {
+          console.error("Error loading full summary:", error2);
+          setError(error2.message);
+        }
+      };
+      const searchLibrary = async (engine = libraryEngine) => {
+        if (!libraryQuery.trim()) {
+          setLibrarySearch(null);
+          return;
+        }
+        try {
+          const params = new URLSearchParams({ q: libraryQuery.trim() });
+          if (engine)
+            params.append("engine", engine);
+          const response = await fetch(`/api/library/search?${params}`);
+          const data = await response.json();
+          if (data.success) {
+            setLibraryEngine(engine);
+            setLibrarySearch(data);
+          } else {
+            throw new Error(data.error || "Failed to search library");
+          }
+        } catch (error2) {
+          console.error("Error searching library:", error2);
+          setError(error2.message);
+        }
+      };
+      const handleCreateFolder = async () => {
+        if (!newFolderName.trim()) {
+          setError("Please enter a folder name");
+          return;
+        }
+        try {
+          setLoading(true);
+          const response = await fetch("/api/folders", {
+            method: "POST",
+            headers: {
+              "Content-Type": "application/json"
+            },
+            body: JSON.stringify({ name: newFolderName.trim() })
+          });
+          const data = await response.json();
+          if (data.success) {
+            const newFolder = { id: data.folderId, name: newFolderName.trim() };
+            setFolders([...folders, newFolder]);
+            setSelectedFolder(data.folderId);
+            setNewFolderName("");
+            setShowNewFolderInput(false);
+            setError(null);
+          } else {
+            throw new Error(data.error || "Failed to create folder");
+          }
+        } catch (error2) {
+          console.error("Error creating folder:", error2);
+          setError(error2.message);
+        } finally {
+          setLoading(false);
+        }
+      };
+      const handleDeleteFolder = async (folderId, e) => {
+        e.stopPropagation();
+        if (!confirm("Are you sure you want to delete this folder and all its contents?")) {
+          return;
+        }
+        try {
+          setLoading(true);
+          const response = await fetch(`/api/folders/${folderId}`, {
+            method: "DELETE"
+          });
+          const data = await response.json();
+          if (data.success) {
+            setFolders(folders.filter((f) => f.id !== folderId));
+            if (selectedFolder === folderId) {
+              setSelectedFolder(null);
+              setFolderContents([]);
+            }
+          } else {
+            throw new Error(data.error || "Failed to delete folder");
+          }
+        } catch (error2) {
+          console.error("Error deleting folder:", error2);
+          setError(error2.message);
+        } finally {
+          setLoading(false);
+        }
+      };
+      const handleFileUpload = async (event) => {
+        if (!selectedFolder) {
+          setError("Please select a folder first");
+          return;
+        }
+        const files = event.target.files;
+        if (!files || files.length === 0)
+          return;
+        const formData = new FormData();
+        formData.append("folder_id", selectedFolder);
+        Array.from(files).forEach((file) => {
+          formData.append("files", file);
         });
-        const data = await response.json();
-        if (data.success) {
-          setFolderContents(folderContents.filter((item) => item.id !== contentId));
-        } else {
-          throw new Error(data.error || "Failed to delete item");
+        try {
+          setLoading(true);
+          const response = await fetch("/api/folders/upload", {
+            method: "POST",
+            body: formData
+          });
+          const data = await response.json();
+          if (data.success) {
+            fetchFolderContents(selectedFolder);
+            setPendingResults(data.files.filter((file) => file.job_id).map((file) => file.id));
+          } else {
+            throw new Error(data.error || "Failed to upload files");
+          }
+        } catch (error2) {
+          console.error("Error uploading files:", error2);
+          setError(error2.message);
+        } finally {
+          setLoading(false);
+          if (fileInputRef.current) {
+            fileInputRef.current.value = "";
+          }
         }
-      } catch (error2) {
-        console.error("Error deleting content:", error2);
-        setError(error2.message);
-      } finally {
-        setLoading(false);
-      }
-    };
-    return /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "grid grid-cols-1 lg:grid-cols-2 gap-6 p-6", children: [
-      /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "space-y-6", children: [
-        /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "bg-white rounded-lg shadow-lg p-6", children: [
-          /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "flex justify-between items-center mb-6", children: [
-            /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("h2", { className: "text-xl font-bold", children: "Research Folders" }),
-            /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "flex space-x-2", children: [
-              selectedFolder && /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "relative", children: [
-                /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(
-                  "input",
-                  {
-                    type: "file",
-                    ref: fileInputRef,
-                    onChange: handleFileUpload,
-                    className: "hidden",
-                    multiple: true,
-                    accept: ".pdf,.doc,.docx"
-                  }
-                ),
-                /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)(
+      };
+      const handleDeleteContent = async (contentId) => {
+        if (!confirm("Are you sure you want to delete this item?")) {
+          return;
+        }
+        try {
+          setLoading(true);
+          const response = await fetch(`/api/folders/${selectedFolder}/results/${contentId}`, {
+            method: "DELETE"
+          });
+          const data = await response.json();
+          if (data.success) {
+            setFolderContents(folderContents.filter((item) => item.id !== contentId));
+          } else {
+            throw new Error(data.error || "Failed to delete item");
+          }
+        } catch (error2) {
+          console.error("Error deleting content:", error2);
+          setError(error2.message);
+        } finally {
+          setLoading(false);
+        }
+      };
+      return /* @__PURE__ */ jsxs("div", { className: "grid grid-cols-1 lg:grid-cols-2 gap-6 p-6", children: [
+        /* @__PURE__ */ jsxs("div", { className: "space-y-6", children: [
+          /* @__PURE__ */ jsxs("div", { className: "bg-white rounded-lg shadow-lg p-6", children: [
+            /* @__PURE__ */ jsxs("div", { className: "flex justify-between items-center mb-6", children: [
+              /* @__PURE__ */ jsx("h2", { className: "text-xl font-bold", children: "Research Folders" }),
+              /* @__PURE__ */ jsxs("div", { className: "flex space-x-2", children: [
+                selectedFolder && /* @__PURE__ */ jsxs("div", { className: "relative", children: [
+                  /* @__PURE__ */ jsx(
+                    "input",
+                    {
+                      type: "file",
+                      ref: fileInputRef,
+                      onChange: handleFileUpload,
+                      className: "hidden",
+                      multiple: true,
+                      accept: ".pdf,.doc,.docx"
+                    }
+                  ),
+                  /* @__PURE__ */ jsxs(
+                    "button",
+                    {
+                      onClick: () => fileInputRef.current?.click(),
+                      disabled: loading,
+                      className: "bg-blue-500 text-white px-4 py-2 rounded hover:bg-blue-600 disabled:bg-blue-300 flex items-center",
+                      children: [
+                        /* @__PURE__ */ jsx(Upload, { className: "w-4 h-4 mr-2" }),
+                        "Upload Files"
+                      ]
+                    }
+                  )
+                ] }),
+                /* @__PURE__ */ jsxs(
                   "button",
                   {
-                    onClick: () => fileInputRef.current?.click(),
+                    onClick: () => setShowNewFolderInput(true),
                     disabled: loading,
-                    className: "bg-blue-500 text-white px-4 py-2 rounded hover:bg-blue-600 disabled:bg-blue-300 flex items-center",
+                    className: "bg-green-500 text-white px-4 py-2 rounded hover:bg-green-600 disabled:bg-green-300 flex items-center",
                     children: [
-                      /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(Upload, { className: "w-4 h-4 mr-2" }),
-                      "Upload Files"
+                      /* @__PURE__ */ jsx(Plus, { className: "w-4 h-4 mr-2" }),
+                      "New Folder"
                     ]
                   }
                 )
-              ] }),
-              /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)(
+              ] })
+            ] }),
+            error && /* @__PURE__ */ jsx("div", { className: "bg-red-100 border-l-4 border-red-500 text-red-700 p-4 mb-4", children: error }),
+            showNewFolderInput && /* @__PURE__ */ jsxs("div", { className: "flex space-x-2 mb-4", children: [
+              /* @__PURE__ */ jsx(
+                "input",
+                {
+                  type: "text",
+                  value: newFolderName,
+                  onChange: (e) => setNewFolderName(e.target.value),
+                  placeholder: "Enter folder name",
+                  className: "flex-1 px-3 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500",
+                  disabled: loading
+                }
+              ),
+              /* @__PURE__ */ jsx(
                 "button",
                 {
-                  onClick: () => setShowNewFolderInput(true),
+                  onClick: handleCreateFolder,
                   disabled: loading,
-                  className: "bg-green-500 text-white px-4 py-2 rounded hover:bg-green-600 disabled:bg-green-300 flex items-center",
-                  children: [
-                    /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(Plus, { className: "w-4 h-4 mr-2" }),
-                    "New Folder"
-                  ]
+                  className: "bg-green-500 text-white px-4 py-2 rounded hover:bg-green-600 disabled:bg-green-300",
+                  children: "Create"
+                }
+              ),
+              /* @__PURE__ */ jsx(
+                "button",
+                {
+                  onClick: () => {
+                    setShowNewFolderInput(false);
+                    setNewFolderName("");
+                  },
+                  disabled: loading,
+                  className: "bg-gray-500 text-white px-4 py-2 rounded hover:bg-gray-600 disabled:bg-gray-300",
+                  children: "Cancel"
                 }
               )
+            ] }),
+            /* @__PURE__ */ jsxs("div", { className: "space-y-2", children: [
+              folders.map((folder) => /* @__PURE__ */ jsxs(
+                "div",
+                {
+                  onClick: () => setSelectedFolder(folder.id),
+                  className: `p-4 rounded-lg cursor-pointer transition-colors flex items-center justify-between ${selectedFolder === folder.id ? "bg-blue-100 hover:bg-blue-200" : "bg-gray-50 hover:bg-gray-100"}`,
+                  children: [
+                    /* @__PURE__ */ jsxs("div", { className: "flex items-center space-x-2", children: [
+                      /* @__PURE__ */ jsx(Folder2, { className: `w-5 h-5 ${selectedFolder === folder.id ? "text-blue-500" : "text-gray-500"}` }),
+                      /* @__PURE__ */ jsx("span", { className: "font-medium", children: folder.name })
+                    ] }),
+                    /* @__PURE__ */ jsx(
+                      "button",
+                      {
+                        onClick: (e) => handleDeleteFolder(folder.id, e),
+                        disabled: loading,
+                        className: "text-red-500 hover:text-red-700 disabled:text-red-300",
+                        children: /* @__PURE__ */ jsx(Trash22, { className: "w-4 h-4" })
+                      }
+                    )
+                  ]
+                },
+                folder.id
+              )),
+              folders.length === 0 && !loading && /* @__PURE__ */ jsx("div", { className: "text-center text-gray-500 py-4", children: "No folders yet. Create one to get started!" }),
+              loading && /* @__PURE__ */ jsx("div", { className: "flex justify-center py-4", children: /* @__PURE__ */ jsx("div", { className: "animate-spin rounded-full h-8 w-8 border-b-2 border-blue-500" }) })
             ] })
           ] }),
-          error && /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "bg-red-100 border-l-4 border-red-500 text-red-700 p-4 mb-4", children: error }),
-          showNewFolderInput && /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "flex space-x-2 mb-4", children: [
-            /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(
-              "input",
-              {
-                type: "text",
-                value: newFolderName,
-                onChange: (e) => setNewFolderName(e.target.value),
-                placeholder: "Enter folder name",
-                className: "flex-1 px-3 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500",
-                disabled: loading
-              }
-            ),
-            /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(
-              "button",
-              {
-                onClick: handleCreateFolder,
-                disabled: loading,
-                className: "bg-green-500 text-white px-4 py-2 rounded hover:bg-green-600 disabled:bg-green-300",
-                children: "Create"
-              }
-            ),
-            /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(
-              "button",
-              {
-                onClick: () => {
-                  setShowNewFolderInput(false);
-                  setNewFolderName("");
+          /* @__PURE__ */ jsxs("div", { className: "bg-white rounded-lg shadow-lg p-6", children: [
+            /* @__PURE__ */ jsx("h2", { className: "text-xl font-bold mb-4", children: "Search Library" }),
+            /* @__PURE__ */ jsxs("div", { className: "flex space-x-2", children: [
+              /* @__PURE__ */ jsx(
+                "input",
+                {
+                  type: "text",
+                  value: libraryQuery,
+                  onChange: (e) => setLibraryQuery(e.target.value),
+                  onKeyPress: (e) => e.key === "Enter" && searchLibrary(""),
+                  placeholder: "Search titles, summaries, notes and uploads...",
+                  className: "flex-1 px-3 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500"
+                }
+              ),
+              /* @__PURE__ */ jsx(
+                "button",
+                {
+                  onClick: () => searchLibrary(""),
+                  className: "bg-blue-500 text-white px-4 py-2 rounded hover:bg-blue-600 flex items-center",
+                  children: /* @__PURE__ */ jsx(Search, { className: "w-4 h-4" })
+                }
+              )
+            ] }),
+            librarySearch && /* @__PURE__ */ jsxs("div", { className: "mt-4 space-y-3", children: [
+              /* @__PURE__ */ jsxs("div", { className: "flex flex-wrap gap-2 text-sm", children: [
+                /* @__PURE__ */ jsxs("span", { className: "text-gray-500", children: [
+                  librarySearch.total,
+                  " matches"
+                ] }),
+                librarySearch.facets.engine.map((facet) => /* @__PURE__ */ jsxs(
+                  "button",
+                  {
+                    onClick: () => searchLibrary(libraryEngine === facet.value ? "" : facet.value),
+                    className: `px-2 py-0.5 rounded-full ${libraryEngine === facet.value ? "bg-blue-500 text-white" : "bg-gray-100 text-gray-700"}`,
+                    children: [
+                      facet.value || "unknown",
+                      " (",
+                      facet.count,
+                      ")"
+                    ]
+                  },
+                  facet.value
+                ))
+              ] }),
+              librarySearch.results.map((item) => /* @__PURE__ */ jsxs(
+                "div",
+                {
+                  onClick: () => setSelectedFolder(item.folder_id),
+                  className: "border rounded-lg p-3 cursor-pointer hover:bg-gray-50",
+                  children: [
+                    /* @__PURE__ */ jsx("div", { className: "font-medium text-blue-600", children: item.title }),
+                    /* @__PURE__ */ jsxs("div", { className: "text-xs text-gray-500 mt-1", children: [
+                      folders.find((folder) => folder.id === item.folder_id)?.name,
+                      " \xB7 ",
+                      item.engine
+                    ] })
+                  ]
                 },
-                disabled: loading,
-                className: "bg-gray-500 text-white px-4 py-2 rounded hover:bg-gray-600 disabled:bg-gray-300",
-                children: "Cancel"
-              }
-            )
+                item.id
+              ))
+            ] })
           ] }),
-          /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "space-y-2", children: [
-            folders.map((folder) => /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)(
-              "div",
-              {
-                onClick: () => setSelectedFolder(folder.id),
-                className: `p-4 rounded-lg cursor-pointer transition-colors flex items-center justify-between ${selectedFolder === folder.id ? "bg-blue-100 hover:bg-blue-200" : "bg-gray-50 hover:bg-gray-100"}`,
-                children: [
-                  /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "flex items-center space-x-2", children: [
-                    /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(Folder2, { className: `w-5 h-5 ${selectedFolder === folder.id ? "text-blue-500" : "text-gray-500"}` }),
-                    /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("span", { className: "font-medium", children: folder.name })
-                  ] }),
-                  /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(
+          selectedFolder && /* @__PURE__ */ jsxs("div", { className: "bg-white rounded-lg shadow-lg p-6", children: [
+            /* @__PURE__ */ jsx("h2", { className: "text-xl font-bold mb-4", children: "Folder Contents" }),
+            /* @__PURE__ */ jsxs("div", { className: "space-y-4", children: [
+              folderContents.map((item) => /* @__PURE__ */ jsxs("div", { className: "border rounded-lg p-4", children: [
+                /* @__PURE__ */ jsxs("div", { className: "flex justify-between items-start", children: [
+                  /* @__PURE__ */ jsxs(
+                    "a",
+                    {
+                      href: item.url,
+                      target: "_blank",
+                      rel: "noopener noreferrer",
+                      className: "text-blue-600 hover:text-blue-800 flex items-center",
+                      children: [
+                        item.title,
+                        /* @__PURE__ */ jsx(ExternalLink2, { className: "w-4 h-4 ml-1" })
+                      ]
+                    }
+                  ),
+                  /* @__PURE__ */ jsx(
                     "button",
                     {
-                      onClick: (e) => handleDeleteFolder(folder.id, e),
+                      onClick: () => handleDeleteContent(item.id),
                       disabled: loading,
                       className: "text-red-500 hover:text-red-700 disabled:text-red-300",
-                      children: /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(Trash22, { className: "w-4 h-4" })
+                      children: /* @__PURE__ */ jsx(Trash22, { className: "w-4 h-4" })
                     }
                   )
-                ]
-              },
-              folder.id
-            )),
-            folders.length === 0 && !loading && /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "text-center text-gray-500 py-4", children: "No folders yet. Create one to get started!" }),
-            loading && /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "flex justify-center py-4", children: /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "animate-spin rounded-full h-8 w-8 border-b-2 border-blue-500" }) })
+                ] }),
+                item.ai_summary && /* @__PURE__ */ jsxs("div", { className: "mt-4 bg-blue-50 p-3 rounded", children: [
+                  /* @__PURE__ */ jsx("div", { className: "font-medium text-gray-700", children: "AI Summary:" }),
+                  /* @__PURE__ */ jsxs("div", { className: "text-gray-600 text-sm whitespace-pre-line mt-1", children: [
+                    item.ai_summary,
+                    item.ai_summary_truncated && "..."
+                  ] }),
+                  item.ai_summary_truncated && /* @__PURE__ */ jsx(
+                    "button",
+                    {
+                      onClick: () => handleExpandSummary(item.id),
+                      className: "text-blue-500 hover:text-blue-700 text-sm mt-1",
+                      children: "Show full summary"
+                    }
+                  )
+                ] }),
+                item.custom_notes && /* @__PURE__ */ jsxs("div", { className: "mt-4 bg-gray-50 p-3 rounded", children: [
+                  /* @__PURE__ */ jsx("div", { className: "font-medium text-gray-700", children: "Notes:" }),
+                  /* @__PURE__ */ jsx("div", { className: "text-gray-600 text-sm mt-1", children: item.custom_notes })
+                ] })
+              ] }, item.id)),
+              nextCursor && /* @__PURE__ */ jsx("div", { ref: loadMoreRef, className: "flex justify-center py-4", children: loadingMore && /* @__PURE__ */ jsx("div", { className: "animate-spin rounded-full h-6 w-6 border-b-2 border-blue-500" }) }),
+              folderContents.length === 0 && !loading && /* @__PURE__ */ jsx("div", { className: "text-center text-gray-500 py-4", children: "No items in this folder yet. Add some from the search results!" })
+            ] })
           ] })
         ] }),
-        selectedFolder && /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "bg-white rounded-lg shadow-lg p-6", children: [
-          /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("h2", { className: "text-xl font-bold mb-4", children: "Folder Contents" }),
-          /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "space-y-4", children: [
-            folderContents.map((item) => /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "border rounded-lg p-4", children: [
-              /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "flex justify-between items-start", children: [
-                /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)(
-                  "a",
-                  {
-                    href: item.url,
-                    target: "_blank",
-                    rel: "noopener noreferrer",
-                    className: "text-blue-600 hover:text-blue-800 flex items-center",
-                    children: [
-                      item.title,
-                      /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(ExternalLink2, { className: "w-4 h-4 ml-1" })
-                    ]
-                  }
-                ),
-                /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(
-                  "button",
-                  {
-                    onClick: () => handleDeleteContent(item.id),
-                    disabled: loading,
-                    className: "text-red-500 hover:text-red-700 disabled:text-red-300",
-                    children: /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(Trash22, { className: "w-4 h-4" })
-                  }
-                )
-              ] }),
-              item.ai_summary && /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "mt-4 bg-blue-50 p-3 rounded", children: [
-                /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "font-medium text-gray-700", children: "AI Summary:" }),
-                /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "text-gray-600 text-sm whitespace-pre-line mt-1", children: item.ai_summary })
-              ] }),
-              item.custom_notes && /* @__PURE__ */ (0, import_jsx_runtime2.jsxs)("div", { className: "mt-4 bg-gray-50 p-3 rounded", children: [
-                /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "font-medium text-gray-700", children: "Notes:" }),
-                /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "text-gray-600 text-sm mt-1", children: item.custom_notes })
-              ] })
-            ] }, item.id)),
-            folderContents.length === 0 && !loading && /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "text-center text-gray-500 py-4", children: "No items in this folder yet. Add some from the search results!" })
-          ] })
-        ] })
-      ] }),
-      /* @__PURE__ */ (0, import_jsx_runtime2.jsx)("div", { className: "bg-white rounded-lg shadow-lg p-6 h-[calc(100vh-2rem)]", children: /* @__PURE__ */ (0, import_jsx_runtime2.jsx)(
-        chat_assistant_default,
-        {
-          selectedFolder,
-          folderContents
-        }
-      ) })
-    ] });
-  };
-  var folder_viewer_default = FolderViewer;
+        /* @__PURE__ */ jsx("div", { className: "bg-white rounded-lg shadow-lg p-6 h-[calc(100vh-2rem)]", children: /* @__PURE__ */ jsx(ChatAssistant, { selectedFolder }) })
+      ] });
+    };
+    var __default = FolderViewer;
+    return { default: __default };
+  })();
 
   // static/js/folders.js
-  var import_jsx_runtime3 = __toESM(require_jsx_runtime(), 1);
-  document.addEventListener("DOMContentLoaded", () => {
-    const container = document.getElementById("app-root");
-    if (container) {
-      const root = (0, import_client.createRoot)(container);
-      root.render(
-        /* @__PURE__ */ (0, import_jsx_runtime3.jsx)(import_react4.default.StrictMode, { children: /* @__PURE__ */ (0, import_jsx_runtime3.jsx)(folder_viewer_default, {}) })
-      );
-    } else {
-      console.error("Could not find app-root element");
-    }
-  });
-  var FoldersView = () => {
-    const [folders, setFolders] = useState([]);
-    const [expandedFolders, setExpandedFolders] = useState({});
-    const [loading, setLoading] = useState(true);
-    const [error, setError] = useState(null);
-    useEffect(() => {
-      fetchFolders();
-    }, []);
-    const fetchFolders = async () => {
-      try {
-        const response = await fetch("/api/folders");
-        if (!response.ok)
-          throw new Error("Failed to fetch folders");
-        const data = await response.json();
-        if (data.success) {
-          setFolders(data.folders);
-          await Promise.all(data.folders.map((folder) => fetchFolderContents(folder.id)));
-        }
-      } catch (error2) {
-        setError(error2.message);
-      } finally {
-        setLoading(false);
+  var folders_exports = (() => {
+    const { jsx, jsxs } = import_jsx_runtime;
+    const React = import_react.default;
+    const { createRoot } = import_client;
+    const FolderViewer = folder_viewer_exports.default;
+    document.addEventListener("DOMContentLoaded", () => {
+      const container = document.getElementById("app-root");
+      if (container) {
+        const root = createRoot(container);
+        root.render(
+          /* @__PURE__ */ jsx(React.StrictMode, { children: /* @__PURE__ */ jsx(FolderViewer, {}) })
+        );
+      } else {
+        console.error("Could not find app-root element");
       }
-    };
-    const fetchFolderContents = async (folderId) => {
-      try {
-        const response = await fetch(`/api/folders/${folderId}/results`);
-        if (!response.ok)
-          throw new Error("Failed to fetch folder contents");
-        const data = await response.json();
-        if (data.success) {
-          setExpandedFolders((prev) => ({
-            ...prev,
-            [folderId]: data.results
-          }));
+    });
+    const FoldersView = () => {
+      const [folders, setFolders] = useState([]);
+      const [expandedFolders, setExpandedFolders] = useState({});
+      const [loading, setLoading] = useState(true);
+      const [error, setError] = useState(null);
+      useEffect(() => {
+        fetchFolders();
+      }, []);
+      const fetchFolders = async () => {
+        try {
+          const response = await fetch("/api/folders");
+          if (!response.ok)
+            throw new Error("Failed to fetch folders");
+          const data = await response.json();
+          if (data.success) {
+            setFolders(data.folders);
+            await Promise.all(data.folders.map((folder) => fetchFolderContents(folder.id)));
+          }
+        } catch (error2) {
+          setError(error2.message);
+        } finally {
+          setLoading(false);
         }
-      } catch (error2) {
-        console.error(`Error fetching contents for folder ${folderId}:`, error2);
-      }
-    };
-    const deleteFolder = async (folderId) => {
-      if (!confirm("Are you sure you want to delete this folder and all its contents?"))
-        return;
-      try {
-        const response = await fetch(`/api/folders/${folderId}`, {
-          method: "DELETE"
-        });
-        if (!response.ok)
-          throw new Error("Failed to delete folder");
-        const data = await response.json();
-        if (data.success) {
-          setFolders(folders.filter((folder) => folder.id !== folderId));
-          const newExpandedFolders = { ...expandedFolders };
-          delete newExpandedFolders[folderId];
-          setExpandedFolders(newExpandedFolders);
+      };
+      const fetchFolderContents = async (folderId) => {
+        try {
+          const response = await fetch(`/api/folders/${folderId}/results`);
+          if (!response.ok)
+            throw new Error("Failed to fetch folder contents");
+          const data = await response.json();
+          if (data.success) {
+            setExpandedFolders((prev) => ({
+              ...prev,
+              [folderId]: data.results
+            }));
+          }
+        } catch (error2) {
+          console.error(`Error fetching contents for folder ${folderId}:`, error2);
+        }
+      };
+      const deleteFolder = async (folderId) => {
+        if (!confirm("Are you sure you want to delete this folder and all its contents?"))
+          return;
+        try {
+          const response = await fetch(`/api/folders/${folderId}`, {
+            method: "DELETE"
+          });
+          if (!response.ok)
+            throw new Error("Failed to delete folder");
+          const data = await response.json();
+          if (data.success) {
+            setFolders(folders.filter((folder) => folder.id !== folderId));
+            const newExpandedFolders = { ...expandedFolders };
+            delete newExpandedFolders[folderId];
+            setExpandedFolders(newExpandedFolders);
+          }
+        } catch (error2) {
+          console.error("Error deleting folder:", error2);
         }
-      } catch (error2) {
-        console.error("Error deleting folder:", error2);
+      };
+      if (loading) {
+        return /* @__PURE__ */ jsx("div", { className: "flex justify-center items-center", children: /* @__PURE__ */ jsx("div", { className: "animate-spin rounded-full h-8 w-8 border-b-2 border-blue-500" }) });
       }
-    };
-    if (loading) {
-      return /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("div", { className: "flex justify-center items-center", children: /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("div", { className: "animate-spin rounded-full h-8 w-8 border-b-2 border-blue-500" }) });
-    }
-    if (error) {
-      return /* @__PURE__ */ (0, import_jsx_runtime3.jsxs)("div", { className: "text-red-500", children: [
-        "Error: ",
-        error
-      ] });
-    }
-    return /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("div", { className: "grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6", children: folders.map((folder) => /* @__PURE__ */ (0, import_jsx_runtime3.jsxs)("div", { className: "bg-white rounded-lg shadow-lg p-6", children: [
-      /* @__PURE__ */ (0, import_jsx_runtime3.jsxs)("div", { className: "flex items-center justify-between mb-4", children: [
-        /* @__PURE__ */ (0, import_jsx_runtime3.jsxs)("div", { className: "flex items-center space-x-2", children: [
-          /* @__PURE__ */ (0, import_jsx_runtime3.jsx)(Folder, { className: "w-6 h-6 text-blue-500" }),
-          /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("h2", { className: "text-xl font-semibold", children: folder.name })
-        ] }),
-        /* @__PURE__ */ (0, import_jsx_runtime3.jsx)(
-          "button",
-          {
-            onClick: () => deleteFolder(folder.id),
-            className: "text-red-500 hover:text-red-700",
-            children: /* @__PURE__ */ (0, import_jsx_runtime3.jsx)(Trash2, { className: "w-5 h-5" })
-          }
-        )
-      ] }),
-      /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("div", { className: "space-y-4", children: expandedFolders[folder.id]?.map((item) => /* @__PURE__ */ (0, import_jsx_runtime3.jsxs)("div", { className: "border-l-2 border-blue-200 pl-4", children: [
-        /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("div", { className: "flex items-start justify-between", children: /* @__PURE__ */ (0, import_jsx_runtime3.jsxs)(
-          "a",
-          {
-            href: item.url,
-            target: "_blank",
-            rel: "noopener noreferrer",
-            className: "text-blue-600 hover:text-blue-800 flex items-center",
-            children: [
-              /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("span", { className: "mr-2", children: item.title }),
-              /* @__PURE__ */ (0, import_jsx_runtime3.jsx)(ExternalLink, { className: "w-4 h-4" })
-            ]
-          }
-        ) }),
-        item.ai_summary && /* @__PURE__ */ (0, import_jsx_runtime3.jsxs)("div", { className: "mt-2 text-sm text-gray-600", children: [
-          /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("div", { className: "font-semibold", children: "Summary:" }),
-          /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("div", { className: "whitespace-pre-line", children: item.ai_summary })
+      if (error) {
+        return /* @__PURE__ */ jsxs("div", { className: "text-red-500", children: [
+          "Error: ",
+          error
+        ] });
+      }
+      return /* @__PURE__ */ jsx("div", { className: "grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6", children: folders.map((folder) => /* @__PURE__ */ jsxs("div", { className: "bg-white rounded-lg shadow-lg p-6", children: [
+        /* @__PURE__ */ jsxs("div", { className: "flex items-center justify-between mb-4", children: [
+          /* @__PURE__ */ jsxs("div", { className: "flex items-center space-x-2", children: [
+            /* @__PURE__ */ jsx(Folder, { className: "w-6 h-6 text-blue-500" }),
+            /* @__PURE__ */ jsx("h2", { className: "text-xl font-semibold", children: folder.name })
+          ] }),
+          /* @__PURE__ */ jsx(
+            "button",
+            {
+              onClick: () => deleteFolder(folder.id),
+              className: "text-red-500 hover:text-red-700",
+              children: /* @__PURE__ */ jsx(Trash2, { className: "w-5 h-5" })
+            }
+          )
         ] }),
-        item.custom_notes && /* @__PURE__ */ (0, import_jsx_runtime3.jsxs)("div", { className: "mt-2 text-sm bg-gray-50 p-2 rounded", children: [
-          /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("div", { className: "font-semibold", children: "Notes:" }),
-          /* @__PURE__ */ (0, import_jsx_runtime3.jsx)("div", { children: item.custom_notes })
-        ] })
-      ] }, item.id)) })
-    ] }, folder.id)) });
-  };
-  document.addEventListener("DOMContentLoaded", () => {
-    const container = document.getElementById("folders-container");
-    if (container) {
-      const root = (0, import_client.createRoot)(container);
-      root.render(/* @__PURE__ */ (0, import_jsx_runtime3.jsx)(FoldersView, {}));
-    }
-  });
+        /* @__PURE__ */ jsx("div", { className: "space-y-4", children: expandedFolders[folder.id]?.map((item) => /* @__PURE__ */ jsxs("div", { className: "border-l-2 border-blue-200 pl-4", children: [
+          /* @__PURE__ */ jsx("div", { className: "flex items-start justify-between", children: /* @__PURE__ */ jsxs(
+            "a",
+            {
+              href: item.url,
+              target: "_blank",
+              rel: "noopener noreferrer",
+              className: "text-blue-600 hover:text-blue-800 flex items-center",
+              children: [
+                /* @__PURE__ */ jsx("span", { className: "mr-2", children: item.title }),
+                /* @__PURE__ */ jsx(ExternalLink, { className: "w-4 h-4" })
+              ]
+            }
+          ) }),
+          item.ai_summary && /* @__PURE__ */ jsxs("div", { className: "mt-2 text-sm text-gray-600", children: [
+            /* @__PURE__ */ jsx("div", { className: "font-semibold", children: "Summary:" }),
+            /* @__PURE__ */ jsx("div", { className: "whitespace-pre-line", children: item.ai_summary })
+          ] }),
+          item.custom_notes && /* @__PURE__ */ jsxs("div", { className: "mt-2 text-sm bg-gray-50 p-2 rounded", children: [
+            /* @__PURE__ */ jsx("div", { className: "font-semibold", children: "Notes:" }),
+            /* @__PURE__ */ jsx("div", { children: item.custom_notes })
+          ] })
+        ] }, item.id)) })
+      ] }, folder.id)) });
+    };
+    document.addEventListener("DOMContentLoaded", () => {
+      const container = document.getElementById("folders-container");
+      if (container) {
+        const root = createRoot(container);
+        root.render(/* @__PURE__ */ jsx(FoldersView, {}));
+      }
+    });
+    return {};
+  })();
 })();
 /*! Bundled license information:
 
@@ -24457,11 +24457,6 @@
     }
   });
 
-  // static/js/utils/search-utils.js
-  var import_react3 = __toESM(require_react(), 1);
-  var import_client = __toESM(require_client(), 1);
-
-  // node_modules/lucide-react/dist/esm/createLucideIcon.mjs
   var import_react = __toESM(require_react(), 1);
 
   // node_modules/lucide-react/dist/esm/defaultAttributes.mjs
@@ -24504,6 +24499,19 @@
   };
   var createLucideIcon$1 = createLucideIcon;
 
+  // node_modules/lucide-react/dist/esm/icons/external-link.mjs
+  var ExternalLink = createLucideIcon$1("ExternalLink", [
+    [
+      "path",
+      {
+        d: "M18 13v6a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V8a2 2 0 0 1 2-2h6",
+        key: "a6xqqp"
+      }
+    ],
+    ["polyline", { points: "15 3 21 3 21 9", key: "mznyad" }],
+    ["line", { x1: "10", x2: "21", y1: "14", y2: "3", key: "18c3s4" }]
+  ]);
+
   // node_modules/lucide-react/dist/esm/icons/folder-plus.mjs
   var FolderPlus = createLucideIcon$1("FolderPlus", [
     [
@@ -24530,201 +24538,311 @@
     ["polyline", { points: "7 3 7 8 15 8", key: "8nz8an" }]
   ]);
 
-  // static/js/components/folder-manager.jsx
-  var import_react2 = __toESM(require_react(), 1);
+  var lucide_react_exports = { ExternalLink, FolderPlus, Save };
+
+  var import_client = __toESM(require_client(), 1);
   var import_jsx_runtime = __toESM(require_jsx_runtime(), 1);
-  var FolderManager = ({ resultData, onBeforeSave, onSave }) => {
-    const [folders, setFolders] = (0, import_react2.useState)([]);
-    const [selectedFolder, setSelectedFolder] = (0, import_react2.useState)("");
-    const [isCreating, setIsCreating] = (0, import_react2.useState)(false);
-    const [newFolderName, setNewFolderName] = (0, import_react2.useState)("");
-    const [error, setError] = (0, import_react2.useState)(null);
-    (0, import_react2.useEffect)(() => {
-      fetchFolders();
-    }, []);
-    const fetchFolders = async () => {
-      try {
-        const response = await fetch("/api/folders");
-        const data = await response.json();
-        if (data.success) {
-          setFolders(data.folders);
+
+  // static/js/components/folder-manager.jsx
+  var folder_manager_exports = (() => {
+    const { jsx, jsxs } = import_jsx_runtime;
+    const React = import_react.default;
+    const { useState, useEffect } = import_react;
+    const { FolderPlus, Save } = lucide_react_exports;
+    const FolderManager = ({ resultData, onBeforeSave, onSave }) => {
+      const [folders, setFolders] = useState([]);
+      const [selectedFolder, setSelectedFolder] = useState("");
+      const [isCreating, setIsCreating] = useState(false);
+      const [newFolderName, setNewFolderName] = useState("");
+      const [error, setError] = useState(null);
+      useEffect(() => {
+        fetchFolders();
+      }, []);
+      const fetchFolders = async () => {
+        try {
+          const response = await fetch("/api/folders");
+          const data = await response.json();
+          if (data.success) {
+            setFolders(data.folders);
+          }
+        } catch (error2) {
+          console.error("Error fetching folders:", error2);
+          setError("Failed to load folders");
         }
-      } catch (error2) {
-        console.error("Error fetching folders:", error2);
-        setError("Failed to load folders");
-      }
-    };
-    const handleSave = async () => {
-      if (!selectedFolder) {
-        setError("Please select a folder");
-        return;
-      }
-      try {
-        const dataToSave = onSave ? onSave() : resultData;
-        console.log("Saving data to folder:", dataToSave);
-        const response = await fetch("/api/folders/save", {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json"
-          },
-          body: JSON.stringify({
-            folderId: selectedFolder,
-            result: {
-              ...dataToSave,
-              custom_notes: dataToSave.custom_notes || "",
-              ai_summary: dataToSave.ai_summary || ""
-            }
-          })
-        });
-        const data = await response.json();
-        if (data.success) {
-          showNotification("Saved successfully!");
-          console.log("Save response:", data);
-        } else {
-          throw new Error(data.error || "Failed to save");
+      };
+      const handleSave = async () => {
+        if (!selectedFolder) {
+          setError("Please select a folder");
+          return;
         }
-      } catch (error2) {
-        console.error("Error saving to folder:", error2);
-        setError(error2.message);
-      }
-    };
-    const createFolder = async () => {
-      if (!newFolderName.trim()) {
-        setError("Please enter a folder name");
-        return;
-      }
-      try {
-        const response = await fetch("/api/folders", {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json"
-          },
-          body: JSON.stringify({ name: newFolderName })
-        });
-        const data = await response.json();
-        if (data.success) {
-          setFolders([...folders, { id: data.folderId, name: data.name }]);
-          setSelectedFolder(data.folderId);
-          setIsCreating(false);
-          setNewFolderName("");
-          setError(null);
-        } else {
-          throw new Error(data.error || "Failed to create folder");
+        try {
+          const dataToSave = onSave ? onSave() : resultData;
+          console.log("Saving data to folder:", dataToSave);
+          const response = await fetch("/api/folders/save", {
+            method: "POST",
+            headers: {
+              "Content-Type": "application/json"
+            },
+            body: JSON.stringify({
+              folderId: selectedFolder,
+              result: {
+                ...dataToSave,
+                custom_notes: dataToSave.custom_notes || "",
+                ai_summary: dataToSave.ai_summary || ""
+              }
+            })
+          });
+          const data = await response.json();
+          if (data.success) {
+            showNotification("Saved successfully!");
+            console.log("Save response:", data);
+          } else {
+            throw new Error(data.error || "Failed to save");
+          }
+        } catch (error2) {
+          console.error("Error saving to folder:", error2);
+          setError(error2.message);
+        }
+      };
+      const createFolder = async () => {
+        if (!newFolderName.trim()) {
+          setError("Please enter a folder name");
+          return;
         }
-      } catch (error2) {
-        console.error("Error creating folder:", error2);
-        setError(error2.message);
+        try {
+          const response = await fetch("/api/folders", {
+            method: "POST",
+            headers: {
+              "Content-Type": "application/json"
+            },
+            body: JSON.stringify({ name: newFolderName })
+          });
+          const data = await response.json();
+          if (data.success) {
+            setFolders([...folders, { id: data.folderId, name: data.name }]);
+            setSelectedFolder(data.folderId);
+            setIsCreating(false);
+            setNewFolderName("");
+            setError(null);
+          } else {
+            throw new Error(data.error || "Failed to create folder");
+          }
+        } catch (error2) {
+          console.error("Error creating folder:", error2);
+          setError(error2.message);
+        }
+      };
+      if (isCreating) {
+        return /* @__PURE__ */ jsxs("div", { className: "flex flex-col space-y-2", children: [
+          error && /* @__PURE__ */ jsx("div", { className: "text-red-500 text-sm", children: error }),
+          /* @__PURE__ */ jsxs("div", { className: "flex space-x-2", children: [
+            /* @__PURE__ */ jsx(
+              "input",
+              {
+                type: "text",
+                value: newFolderName,
+                onChange: (e) => setNewFolderName(e.target.value),
+                placeholder: "Enter folder name",
+                className: "flex-1 border p-2 rounded focus:ring-2 focus:ring-blue-500",
+                onKeyPress: (e) => e.key === "Enter" && createFolder()
+              }
+            ),
+            /* @__PURE__ */ jsx(
+              "button",
+              {
+                onClick: createFolder,
+                className: "bg-green-500 text-white p-2 rounded hover:bg-green-600",
+                children: /* @__PURE__ */ jsx(Save, { className: "w-5 h-5" })
+              }
+            ),
+            /* @__PURE__ */ jsx(
+              "button",
+              {
+                onClick: () => {
+                  setIsCreating(false);
+                  setError(null);
+                },
+                className: "bg-gray-500 text-white p-2 rounded hover:bg-gray-600",
+                children: "Cancel"
+              }
+            )
+          ] })
+        ] });
       }
-    };
-    if (isCreating) {
-      return /* @__PURE__ */ (0, import_jsx_runtime.jsxs)("div", { className: "flex flex-col space-y-2", children: [
-        error && /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "text-red-500 text-sm", children: error }),
-        /* @__PURE__ */ (0, import_jsx_runtime.jsxs)("div", { className: "flex space-x-2", children: [
-          /* @__PURE__ */ (0, import_jsx_runtime.jsx)(
-            "input",
-            {
-              type: "text",
-              value: newFolderName,
-              onChange: (e) => setNewFolderName(e.target.value),
-              placeholder: "Enter folder name",
+      return /* @__PURE__ */ jsxs("div", { className: "flex flex-col space-y-2", children: [
+        error && /* @__PURE__ */ jsx("div", { className: "text-red-500 text-sm", children: error }),
+        /* @__PURE__ */ jsxs("div", { className: "flex space-x-2", children: [
+          /* @__PURE__ */ jsxs(
+            "select",
+            {
+              value: selectedFolder,
+              onChange: (e) => {
+                setSelectedFolder(e.target.value);
+                setError(null);
+              },
               className: "flex-1 border p-2 rounded focus:ring-2 focus:ring-blue-500",
-              onKeyPress: (e) => e.key === "Enter" && createFolder()
+              children: [
+                /* @__PURE__ */ jsx("option", { value: "", children: "Select folder..." }),
+                folders.map((folder) => /* @__PURE__ */ jsx("option", { value: folder.id, children: folder.name }, folder.id))
+              ]
             }
           ),
-          /* @__PURE__ */ (0, import_jsx_runtime.jsx)(
+          /* @__PURE__ */ jsx(
             "button",
             {
-              onClick: createFolder,
+              onClick: () => {
+                setIsCreating(true);
+                setError(null);
+              },
               className: "bg-green-500 text-white p-2 rounded hover:bg-green-600",
-              children: /* @__PURE__ */ (0, import_jsx_runtime.jsx)(Save, { className: "w-5 h-5" })
+              title: "Create new folder",
+              children: /* @__PURE__ */ jsx(FolderPlus, { className: "w-5 h-5" })
             }
           ),
-          /* @__PURE__ */ (0, import_jsx_runtime.jsx)(
+          /* @__PURE__ */ jsx(
             "button",
             {
-              onClick: () => {
-                setIsCreating(false);
-                setError(null);
-              },
-              className: "bg-gray-500 text-white p-2 rounded hover:bg-gray-600",
-              children: "Cancel"
+              onClick: handleSave,
+              className: "bg-blue-500 text-white p-2 rounded hover:bg-blue-600",
+              title: "Save to selected folder",
+              children: /* @__PURE__ */ jsx(Save, { className: "w-5 h-5" })
             }
           )
         ] })
       ] });
-    }
-    return /* @__PURE__ */ (0, import_jsx_runtime.jsxs)("div", { className: "flex flex-col space-y-2", children: [
-      error && /* @__PURE__ */ (0, import_jsx_runtime.jsx)("div", { className: "text-red-500 text-sm", children: error }),
-      /* @__PURE__ */ (0, import_jsx_runtime.jsxs)("div", { className: "flex space-x-2", children: [
-        /* @__PURE__ */ (0, import_jsx_runtime.jsxs)(
-          "select",
-          {
-            value: selectedFolder,
-            onChange: (e) => {
-              setSelectedFolder(e.target.value);
-              setError(null);
-            },
-            className: "flex-1 border p-2 rounded focus:ring-2 focus:ring-blue-500",
-            children: [
-              /* @__PURE__ */ (0, import_jsx_runtime.jsx)("option", { value: "", children: "Select folder..." }),
-              folders.map((folder) => /* @__PURE__ */ (0, import_jsx_runtime.jsx)("option", { value: folder.id, children: folder.name }, folder.id))
-            ]
-          }
-        ),
-        /* @__PURE__ */ (0, import_jsx_runtime.jsx)(
-          "button",
-          {
-            onClick: () => {
-              setIsCreating(true);
-              setError(null);
-            },
-            className: "bg-green-500 text-white p-2 rounded hover:bg-green-600",
-            title: "Create new folder",
-            children: /* @__PURE__ */ (0, import_jsx_runtime.jsx)(FolderPlus, { className: "w-5 h-5" })
+    };
+    var __default = FolderManager;
+    return { default: __default };
+  })();
+
+  // static/js/utils/event-stream.js
+  var event_stream_exports = /* @__PURE__ */ (() => {
+    const readEventStream = async (response, onEvent) => {
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done)
+          break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        events.forEach((rawEvent) => {
+          let eventName = "message";
+          let data = "";
+          rawEvent.split("\n").forEach((line) => {
+            if (line.startsWith("event: "))
+              eventName = line.slice(7);
+            else if (line.startsWith("data: "))
+              data += line.slice(6);
+          });
+          if (data)
+            onEvent(eventName, JSON.parse(data));
+        });
+      }
+    };
+    return { readEventStream };
+  })();
+
+  // static/js/components/summary-handler.jsx
+  var summary_handler_exports = (() => {
+    const React = import_react.default;
+    const { useState } = import_react;
+    const { readEventStream } = event_stream_exports;
+    const handleSummarize = async (result, onToken = () => {
+    }) => {
+      try {
+        console.log("Generating summary for:", result.title);
+        const response = await fetch("/summarize/stream", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream"
+          },
+          body: JSON.stringify({
+            url: result.url,
+            title: result.title
+          })
+        });
+        if (!response.ok) {
+          const errorText = await response.text();
+          console.error("Summary response error:", errorText);
+          throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        let summary = "";
+        let streamError = null;
+        await readEventStream(response, (event, data) => {
+          if (event === "error") {
+            streamError = data.error;
+          } else if (data.token) {
+            summary += data.token;
+            onToken(summary);
           }
-        ),
-        /* @__PURE__ */ (0, import_jsx_runtime.jsx)(
-          "button",
-          {
-            onClick: handleSave,
-            className: "bg-blue-500 text-white p-2 rounded hover:bg-blue-600",
-            title: "Save to selected folder",
-            children: /* @__PURE__ */ (0, import_jsx_runtime.jsx)(Save, { className: "w-5 h-5" })
-          }
-        )
-      ] })
-    ] });
-  };
-  var folder_manager_default = FolderManager;
+        });
+        if (streamError || !summary) {
+          throw new Error(streamError || "Failed to generate summary");
+        }
+        return summary;
+      } catch (error) {
+        console.error("Error in handleSummarize:", error);
+        throw error;
+      }
+    };
+    return { handleSummarize };
+  })();
 
   // static/js/utils/search-utils.js
-  var showNotification2 = (message, type = "success") => {
-    const notification = document.createElement("div");
-    notification.className = `fixed bottom-4 right-4 ${type === "success" ? "bg-green-500" : "bg-red-500"} text-white px-6 py-3 rounded shadow-lg z-50`;
-    notification.textContent = message;
-    document.body.appendChild(notification);
-    setTimeout(() => {
-      notification.classList.add("opacity-0", "transition-opacity", "duration-500");
-      setTimeout(() => notification.remove(), 500);
-    }, 3e3);
-  };
-  var createResultCard = (result, engine) => {
-    const resultId = `result-${Date.now()}`;
-    const resultData = {
-      ...result,
-      id: resultId,
-      engine,
-      description: result.description || "",
-      ai_summary: result.ai_summary || "",
-      custom_notes: result.custom_notes || "",
-      url: result.url || "",
-      title: result.title || ""
+  var search_utils_exports = (() => {
+    const React = import_react.default;
+    const { createRoot } = import_client;
+    const { ExternalLink } = lucide_react_exports;
+    const FolderManager = folder_manager_exports.default;
+    const { handleSummarize: streamSummary } = summary_handler_exports;
+    const showNotification2 = (message, type = "success") => {
+      const notification = document.createElement("div");
+      notification.className = `fixed bottom-4 right-4 ${type === "success" ? "bg-green-500" : "bg-red-500"} text-white px-6 py-3 rounded shadow-lg z-50`;
+      notification.textContent = message;
+      document.body.appendChild(notification);
+      setTimeout(() => {
+        notification.classList.add("opacity-0", "transition-opacity", "duration-500");
+        setTimeout(() => notification.remove(), 500);
+      }, 3e3);
     };
-    window[`resultData_${resultId}`] = resultData;
-    const safeUrl = resultData.url.replace(/"/g, "&quot;");
-    const card = document.createElement("div");
-    card.className = "bg-white p-4 rounded-lg shadow mb-4 search-card";
-    card.innerHTML = `
+    const createResultCard = (result, engine) => {
+      const resultId = `result-${Date.now()}`;
+      const resultData = {
+        ...result,
+        id: resultId,
+        engine,
+        description: result.description || "",
+        ai_summary: result.ai_summary || "",
+        custom_notes: result.custom_notes || "",
+        url: result.url || "",
+        title: result.title || ""
+      };
+      window[`resultData_${resultId}`] = resultData;
+      const safeUrl = resultData.url.replace(/"/g, "&quot;");
+      const engineNames = {
+        duckduckgo: "DuckDuckGo",
+        arxiv: "arXiv",
+        biorxiv: "bioRxiv",
+        semantic_scholar: "Semantic Scholar"
+      };
+      const sourceLinks = Object.entries(resultData.sources || {}).map(([source, sourceUrl]) => `
+        <a
+            href="${(sourceUrl || "#").replace(/"/g, "&quot;")}"
+            target="_blank"
+            rel="noopener noreferrer"
+            class="bg-gray-100 hover:bg-gray-200 text-gray-700 px-2 py-0.5 rounded"
+        >${engineNames[source] || source}</a>
+    `).join("");
+      const summarizable = (resultData.engines || [engine]).some(
+        (source) => ["arxiv", "biorxiv", "semantic_scholar"].includes(source)
+      );
+      const card = document.createElement("div");
+      card.className = "bg-white p-4 rounded-lg shadow mb-4 search-card";
+      card.innerHTML = `
         <div class="space-y-2">
             <div class="flex items-center justify-between">
                 <a 
@@ -24748,6 +24866,13 @@
                 ` : ""}
             </div>
             
+            ${sourceLinks ? `
+                <div class="flex flex-wrap items-center gap-1 text-xs text-gray-500">
+                    <span>Found in:</span>
+                    ${sourceLinks}
+                </div>
+            ` : ""}
+            
             <p class="text-gray-600">${resultData.description}</p>
             
             <div id="summary-${resultId}" class="mt-4">
@@ -24771,7 +24896,7 @@
             </div>
             
             <div class="flex space-x-2 mt-4">
-                ${["arxiv", "biorxiv", "semantic_scholar"].includes(engine) ? `
+                ${summarizable ? `
                     <button 
                         onclick="window.handleSummarize('${resultId}')"
                         class="bg-green-500 hover:bg-green-600 text-white px-4 py-2 rounded flex items-center space-x-2"
@@ -24784,69 +24909,69 @@
             <div id="folder-manager-${resultId}" class="mt-4"></div>
         </div>
     `;
-    const folderManagerContainer = card.querySelector(`#folder-manager-${resultId}`);
-    const root = (0, import_client.createRoot)(folderManagerContainer);
-    if (root) {
-      root.render(import_react3.default.createElement(folder_manager_default, {
-        resultData,
-        onSave: () => {
-          const notesElem = card.querySelector(`#notes-${resultId}`);
-          const summaryElem = card.querySelector(".summary-content");
-          const updatedResult = {
-            ...resultData,
-            custom_notes: notesElem ? notesElem.value : "",
-            ai_summary: summaryElem ? summaryElem.textContent.trim() : resultData.ai_summary
-          };
-          window[`resultData_${resultId}`] = updatedResult;
-          console.log("Saving updated result:", updatedResult);
-          return updatedResult;
+      const folderManagerContainer = card.querySelector(`#folder-manager-${resultId}`);
+      const root = createRoot(folderManagerContainer);
+      if (root) {
+        root.render(React.createElement(FolderManager, {
+          resultData,
+          onSave: () => {
+            const notesElem = card.querySelector(`#notes-${resultId}`);
+            const summaryElem = card.querySelector(".summary-content");
+            const updatedResult = {
+              ...resultData,
+              custom_notes: notesElem ? notesElem.value : "",
+              ai_summary: summaryElem ? summaryElem.textContent.trim() : resultData.ai_summary
+            };
+            window[`resultData_${resultId}`] = updatedResult;
+            console.log("Saving updated result:", updatedResult);
+            return updatedResult;
+          }
+        }));
+      }
+      return card;
+    };
+    const handlePdfDownload = async (pdfUrl, engine) => {
+      if (!pdfUrl) {
+        showNotification2("No PDF URL provided", "error");
+        return;
+      }
+      try {
+        if (engine === "arxiv") {
+          window.open(pdfUrl, "_blank");
+          return;
         }
-      }));
-    }
-    return card;
-  };
-  var handlePdfDownload = async (pdfUrl, engine) => {
-    if (!pdfUrl) {
-      showNotification2("No PDF URL provided", "error");
-      return;
-    }
-    try {
-      if (engine === "arxiv") {
-        window.open(pdfUrl, "_blank");
+        const response = await fetch("/proxy_pdf", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json"
+          },
+          body: JSON.stringify({ url: pdfUrl })
+        });
+        if (!response.ok)
+          throw new Error("PDF download failed");
+        const blob = await response.blob();
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement("a");
+        a.href = url;
+        a.download = `paper_${Date.now()}.pdf`;
+        document.body.appendChild(a);
+        a.click();
+        window.URL.revokeObjectURL(url);
+        document.body.removeChild(a);
+      } catch (error) {
+        console.error("Error downloading PDF:", error);
+        showNotification2("Failed to download PDF", "error");
+      }
+    };
+    const handleSummarize = async (resultId) => {
+      const resultData = window[`resultData_${resultId}`];
+      const summaryContainer = document.getElementById(`summary-${resultId}`);
+      if (!resultData || !summaryContainer) {
+        console.error("Missing required data for summary");
         return;
       }
-      const response = await fetch("/proxy_pdf", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json"
-        },
-        body: JSON.stringify({ url: pdfUrl })
-      });
-      if (!response.ok)
-        throw new Error("PDF download failed");
-      const blob = await response.blob();
-      const url = window.URL.createObjectURL(blob);
-      const a = document.createElement("a");
-      a.href = url;
-      a.download = `paper_${Date.now()}.pdf`;
-      document.body.appendChild(a);
-      a.click();
-      window.URL.revokeObjectURL(url);
-      document.body.removeChild(a);
-    } catch (error) {
-      console.error("Error downloading PDF:", error);
-      showNotification2("Failed to download PDF", "error");
-    }
-  };
-  var handleSummarize = async (resultId) => {
-    const resultData = window[`resultData_${resultId}`];
-    const summaryContainer = document.getElementById(`summary-${resultId}`);
-    if (!resultData || !summaryContainer) {
-      console.error("Missing required data for summary");
-      return;
-    }
-    try {
-      summaryContainer.innerHTML = `
+      try {
+        summaryContainer.innerHTML = `
             <div class="animate-pulse flex space-x-4 items-center">
                 <div class="flex-1 space-y-4 py-1">
                     <div class="h-4 bg-gray-200 rounded w-3/4"></div>
@@ -24854,97 +24979,86 @@
                 </div>
             </div>
         `;
-      const response = await fetch("/summarize", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json"
-        },
-        body: JSON.stringify({
-          url: resultData.url,
-          title: resultData.title
-        })
-      });
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
-      const data = await response.json();
-      if (data.success) {
-        summaryContainer.innerHTML = `
+        const renderSummary = (text) => {
+          summaryContainer.innerHTML = `
                 <div class="prose">
                     <h4 class="text-lg font-semibold mb-2">AI Summary</h4>
-                    <div class="summary-content whitespace-pre-line text-gray-700 bg-blue-50 p-3 rounded">
-                        ${data.summary}
-                    </div>
+                    <div class="summary-content whitespace-pre-line text-gray-700 bg-blue-50 p-3 rounded"></div>
                 </div>
             `;
-        resultData.ai_summary = data.summary;
+          summaryContainer.querySelector(".summary-content").textContent = text;
+        };
+        const summary = await streamSummary(resultData, renderSummary);
+        renderSummary(summary);
+        resultData.ai_summary = summary;
         window[`resultData_${resultId}`] = resultData;
         showNotification2("Summary generated successfully");
-      } else {
-        throw new Error(data.error || "Failed to generate summary");
-      }
-    } catch (error) {
-      console.error("Error generating summary:", error);
-      summaryContainer.innerHTML = `
+      } catch (error) {
+        console.error("Error generating summary:", error);
+        summaryContainer.innerHTML = `
             <div class="text-red-500 p-3 rounded-lg bg-red-50">
                 Failed to generate summary: ${error.message}
             </div>
         `;
-      showNotification2("Failed to generate summary", "error");
-    }
-  };
-  window.handlePdfDownload = handlePdfDownload;
-  window.handleSummarize = handleSummarize;
+        showNotification2("Failed to generate summary", "error");
+      }
+    };
+    window.handlePdfDownload = handlePdfDownload;
+    window.handleSummarize = handleSummarize;
+    return { showNotification: showNotification2, createResultCard, handlePdfDownload, handleSummarize };
+  })();
 
   // static/js/main.js
-  window.updateNotes = (resultId) => {
-    const notesElem = document.querySelector(`#notes-${resultId}`);
-    if (notesElem && window[`resultData_${resultId}`]) {
-      window[`resultData_${resultId}`].custom_notes = notesElem.value;
-    }
-  };
-  window.downloadPdf = async (pdfUrl, engine) => {
-    if (engine === "arxiv") {
-      window.open(pdfUrl, "_blank");
-      return;
-    }
-    try {
-      const response = await fetch("/proxy_pdf", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json"
-        },
-        body: JSON.stringify({ url: pdfUrl })
-      });
-      if (!response.ok)
-        throw new Error("PDF download failed");
-      const blob = await response.blob();
-      const url = window.URL.createObjectURL(blob);
-      const a = document.createElement("a");
-      a.href = url;
-      a.download = `paper_${Date.now()}.pdf`;
-      document.body.appendChild(a);
-      a.click();
-      window.URL.revokeObjectURL(url);
-      document.body.removeChild(a);
-    } catch (error) {
-      console.error("Error downloading PDF:", error);
-      showNotification2("Failed to download PDF", "error");
-    }
-  };
-  window.generateSummary = async (resultId) => {
-    const result = window[`resultData_${resultId}`];
-    if (!result) {
-      console.error("Result data not found");
-      return;
-    }
-    const summaryContainer = document.getElementById(`summary-${resultId}`);
-    if (!summaryContainer) {
-      console.error("Summary container not found");
-      return;
-    }
-    try {
-      summaryContainer.innerHTML = `
+  var main_exports = (() => {
+    const { createResultCard, showNotification: showNotification2 } = search_utils_exports;
+    window.updateNotes = (resultId) => {
+      const notesElem = document.querySelector(`#notes-${resultId}`);
+      if (notesElem && window[`resultData_${resultId}`]) {
+        window[`resultData_${resultId}`].custom_notes = notesElem.value;
+      }
+    };
+    window.downloadPdf = async (pdfUrl, engine) => {
+      if (engine === "arxiv") {
+        window.open(pdfUrl, "_blank");
+        return;
+      }
+      try {
+        const response = await fetch("/proxy_pdf", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json"
+          },
+          body: JSON.stringify({ url: pdfUrl })
+        });
+        if (!response.ok)
+          throw new Error("PDF download failed");
+        const blob = await response.blob();
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement("a");
+        a.href = url;
+        a.download = `paper_${Date.now()}.pdf`;
+        document.body.appendChild(a);
+        a.click();
+        window.URL.revokeObjectURL(url);
+        document.body.removeChild(a);
+      } catch (error) {
+        console.error("Error downloading PDF:", error);
+        showNotification2("Failed to download PDF", "error");
+      }
+    };
+    window.generateSummary = async (resultId) => {
+      const result = window[`resultData_${resultId}`];
+      if (!result) {
+        console.error("Result data not found");
+        return;
+      }
+      const summaryContainer = document.getElementById(`summary-${resultId}`);
+      if (!summaryContainer) {
+        console.error("Summary container not found");
+        return;
+      }
+      try {
+        summaryContainer.innerHTML = `
             <div class="animate-pulse flex space-x-4 items-center">
                 <div class="flex-1 space-y-4 py-1">
                     <div class="h-4 bg-gray-200 rounded w-3/4"></div>
@@ -24952,19 +25066,19 @@
                 </div>
             </div>
         `;
-      const response = await fetch("/summarize", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json"
-        },
-        body: JSON.stringify({
-          url: result.url,
-          title: result.title
-        })
-      });
-      const data = await response.json();
-      if (data.success) {
-        summaryContainer.innerHTML = `
+        const response = await fetch("/summarize", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json"
+          },
+          body: JSON.stringify({
+            url: result.url,
+            title: result.title
+          })
+        });
+        const data = await response.json();
+        if (data.success) {
+          summaryContainer.innerHTML = `
                 <div class="prose">
                     <h4 class="text-lg font-semibold mb-2">AI Summary</h4>
                     <div class="summary-content whitespace-pre-line text-gray-700 bg-blue-50 p-3 rounded">
@@ -24972,112 +25086,153 @@
                     </div>
                 </div>
             `;
-        window[`resultData_${resultId}`].ai_summary = data.summary;
-      } else {
-        throw new Error(data.error || "Failed to generate summary");
-      }
-    } catch (error) {
-      console.error("Error generating summary:", error);
-      summaryContainer.innerHTML = `
+          window[`resultData_${resultId}`].ai_summary = data.summary;
+        } else {
+          throw new Error(data.error || "Failed to generate summary");
+        }
+      } catch (error) {
+        console.error("Error generating summary:", error);
+        summaryContainer.innerHTML = `
             <div class="text-red-500 p-3 rounded-lg bg-red-50">
                 Failed to generate summary: ${error.message}
             </div>
         `;
-    }
-  };
-  window.saveToFolder = async (folderId, resultId) => {
-    const result = window[`resultData_${resultId}`];
-    if (!result) {
-      console.error("Result data not found");
-      return false;
-    }
-    try {
-      const response = await fetch("/api/folders/save", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json"
-        },
-        body: JSON.stringify({
-          folderId,
-          result: {
-            ...result,
-            custom_notes: result.custom_notes || document.querySelector(`#notes-${resultId}`).value
-          }
-        })
-      });
-      const data = await response.json();
-      if (data.success) {
-        showNotification2("Saved successfully!");
-        return true;
-      } else {
-        throw new Error(data.error || "Failed to save to folder");
       }
-    } catch (error) {
-      console.error("Error saving to folder:", error);
-      showNotification2("Failed to save to folder", "error");
-      return false;
-    }
-  };
-  async function handleSearch(engine) {
-    const input = document.querySelector(`input[data-engine="${engine}"]`);
-    const query = input?.value.trim();
-    if (!query)
-      return;
-    const loadingEl = document.getElementById("loading");
-    const resultsContainer = document.getElementById("results-container");
-    if (!loadingEl || !resultsContainer) {
-      console.error("Required DOM elements not found");
-      return;
-    }
-    loadingEl.classList.remove("hidden");
-    resultsContainer.innerHTML = "";
-    try {
-      const formData = new FormData();
-      formData.append("query", query);
-      const response = await fetch(`/search/${engine}`, {
-        method: "POST",
-        body: formData
-      });
-      const data = await response.json();
-      if (data.success && data.results) {
-        resultsContainer.innerHTML = "";
-        data.results.forEach((result) => {
-          const card = createResultCard(result, engine);
-          if (card)
-            resultsContainer.appendChild(card);
+    };
+    window.saveToFolder = async (folderId, resultId) => {
+      const result = window[`resultData_${resultId}`];
+      if (!result) {
+        console.error("Result data not found");
+        return false;
+      }
+      try {
+        const response = await fetch("/api/folders/save", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json"
+          },
+          body: JSON.stringify({
+            folderId,
+            result: {
+              ...result,
+              custom_notes: result.custom_notes || document.querySelector(`#notes-${resultId}`).value
+            }
+          })
         });
-        if (data.results.length === 0) {
-          resultsContainer.innerHTML = '<p class="text-gray-500">No results found</p>';
+        const data = await response.json();
+        if (data.success) {
+          showNotification2("Saved successfully!");
+          return true;
+        } else {
+          throw new Error(data.error || "Failed to save to folder");
         }
-      } else {
-        throw new Error(data.error || "Failed to perform search");
+      } catch (error) {
+        console.error("Error saving to folder:", error);
+        showNotification2("Failed to save to folder", "error");
+        return false;
+      }
+    };
+    const searchEndpoint = (engine) => engine === "all" ? "/search" : `/search/${engine}`;
+    const renderResults = (resultsContainer, results, engine) => {
+      results.forEach((result) => {
+        const card = createResultCard(result, engine === "all" ? result.engine : engine);
+        if (card)
+          resultsContainer.appendChild(card);
+      });
+    };
+    function renderLoadMore(resultsContainer, engine, nextCursor) {
+      resultsContainer.querySelector(".load-more-results")?.remove();
+      if (!nextCursor)
+        return;
+      const button = document.createElement("button");
+      button.className = "load-more-results w-full mt-4 px-4 py-2 text-blue-500 hover:text-blue-700 disabled:text-gray-400";
+      button.textContent = "Load more";
+      button.addEventListener("click", async () => {
+        button.disabled = true;
+        button.textContent = "Loading...";
+        try {
+          const formData = new FormData();
+          formData.append("cursor", nextCursor);
+          const response = await fetch(searchEndpoint(engine), {
+            method: "POST",
+            body: formData
+          });
+          const data = await response.json();
+          if (!data.success) {
+            throw new Error(data.error || "Failed to load more results");
+          }
+          button.remove();
+          renderResults(resultsContainer, data.results, engine);
+          renderLoadMore(resultsContainer, engine, data.next_cursor);
+        } catch (error) {
+          console.error("Load more error:", error);
+          button.disabled = false;
+          button.textContent = "Load more";
+          showNotification2("Failed to load more results", "error");
+        }
+      });
+      resultsContainer.appendChild(button);
+    }
+    async function handleSearch(engine) {
+      const input = document.querySelector(`input[data-engine="${engine}"]`);
+      const query = input?.value.trim();
+      if (!query)
+        return;
+      const loadingEl = document.getElementById("loading");
+      const resultsContainer = document.getElementById("results-container");
+      if (!loadingEl || !resultsContainer) {
+        console.error("Required DOM elements not found");
+        return;
       }
-    } catch (error) {
-      console.error("Search error:", error);
-      resultsContainer.innerHTML = `
+      loadingEl.classList.remove("hidden");
+      resultsContainer.innerHTML = "";
+      try {
+        const formData = new FormData();
+        formData.append("query", query);
+        const response = await fetch(searchEndpoint(engine), {
+          method: "POST",
+          body: formData
+        });
+        const data = await response.json();
+        if (data.success && data.results) {
+          resultsContainer.innerHTML = "";
+          renderResults(resultsContainer, data.results, engine);
+          if (data.results.length === 0) {
+            resultsContainer.innerHTML = '<p class="text-gray-500">No results found</p>';
+          } else {
+            renderLoadMore(resultsContainer, engine, data.next_cursor);
+          }
+        } else {
+          throw new Error(data.error || "Failed to perform search");
+        }
+      } catch (error) {
+        console.error("Search error:", error);
+        resultsContainer.innerHTML = `
             <p class="text-red-500 bg-red-50 p-4 rounded-lg">
                 ${error.message || "An error occurred while searching"}
             </p>
         `;
-    } finally {
-      loadingEl.classList.add("hidden");
+      } finally {
+        loadingEl.classList.add("hidden");
+      }
     }
-  }
-  document.addEventListener("DOMContentLoaded", () => {
-    document.querySelectorAll("input[data-engine]").forEach((input) => {
-      input.addEventListener("keypress", (e) => {
-        if (e.key === "Enter") {
-          e.preventDefault();
-          handleSearch(input.dataset.engine);
-        }
+    document.addEventListener("DOMContentLoaded", () => {
+      document.querySelectorAll("input[data-engine]").forEach((input) => {
+        input.addEventListener("keypress", (e) => {
+          if (e.key === "Enter") {
+            e.preventDefault();
+            handleSearch(input.dataset.engine);
+          }
+        });
       });
-    });
-    document.querySelectorAll("button[data-engine]").forEach((button) => {
-      button.addEventListener("click", () => {
-        handleSearch(button.dataset.engine);
+      document.querySelectorAll("button[data-engine]").forEach((button) => {
+        button.addEventListener("click", () => {
+          handleSearch(button.dataset.engine);
+        });
       });
     });
-  });
+    return {};
+  })();
 })();
 /*! Bundled license information:
 
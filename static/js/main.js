@@ -140,6 +140,54 @@ window.saveToFolder = async (folderId, resultId) => {
     }
 };
 
+// "all" searches every engine through /search and gets one merged list back
+const searchEndpoint = (engine) => engine === 'all' ? '/search' : `/search/${engine}`;
+
+// Merged results carry the engine that ranked them first in result.engine
+const renderResults = (resultsContainer, results, engine) => {
+    results.forEach(result => {
+        const card = createResultCard(result, engine === 'all' ? result.engine : engine);
+        if (card) resultsContainer.appendChild(card);
+    });
+};
+
+// Append a "Load more" button that fetches the next page for an engine
+function renderLoadMore(resultsContainer, engine, nextCursor) {
+    resultsContainer.querySelector('.load-more-results')?.remove();
+    if (!nextCursor) return;
+
+    const button = document.createElement('button');
+    button.className = 'load-more-results w-full mt-4 px-4 py-2 text-blue-500 hover:text-blue-700 disabled:text-gray-400';
+    button.textContent = 'Load more';
+    button.addEventListener('click', async () => {
+        button.disabled = true;
+        button.textContent = 'Loading...';
+        try {
+            const formData = new FormData();
+            formData.append('cursor', nextCursor);
+
+            const response = await fetch(searchEndpoint(engine), {
+                method: 'POST',
+                body: formData
+            });
+            const data = await response.json();
+
+            if (!data.success) {
+                throw new Error(data.error || 'Failed to load more results');
+            }
+            button.remove();
+            renderResults(resultsContainer, data.results, engine);
+            renderLoadMore(resultsContainer, engine, data.next_cursor);
+        } catch (error) {
+            console.error('Load more error:', error);
+            button.disabled = false;
+            button.textContent = 'Load more';
+            showNotification('Failed to load more results', 'error');
+        }
+    });
+    resultsContainer.appendChild(button);
+}
+
 // Handle search functionality
 async function handleSearch(engine) {
     const input = document.querySelector(`input[data-engine="${engine}"]`);
@@ -162,7 +210,7 @@ async function handleSearch(engine) {
         const formData = new FormData();
         formData.append('query', query);
 
-        const response = await fetch(`/search/${engine}`, {
+        const response = await fetch(searchEndpoint(engine), {
             method: 'POST',
             body: formData
         });
@@ -171,13 +219,12 @@ async function handleSearch(engine) {
 
         if (data.success && data.results) {
             resultsContainer.innerHTML = '';
-            data.results.forEach(result => {
-                const card = createResultCard(result, engine);
-                if (card) resultsContainer.appendChild(card);
-            });
+            renderResults(resultsContainer, data.results, engine);
 
             if (data.results.length === 0) {
                 resultsContainer.innerHTML = '<p class="text-gray-500">No results found</p>';
+            } else {
+                renderLoadMore(resultsContainer, engine, data.next_cursor);
             }
         } else {
             throw new Error(data.error || 'Failed to perform search');
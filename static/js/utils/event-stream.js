@@ -0,0 +1,28 @@
+// static/js/utils/event-stream.js
+
+// Read a server-sent event stream from a fetch response.
+// Calls onEvent(eventName, data) for every event; eventName is 'message' by default.
+export const readEventStream = async (response, onEvent) => {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+
+        events.forEach(rawEvent => {
+            let eventName = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) eventName = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            if (data) onEvent(eventName, JSON.parse(data));
+        });
+    }
+};
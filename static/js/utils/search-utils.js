@@ -3,6 +3,7 @@ import React from 'react';
 import { createRoot } from 'react-dom/client';
 import { ExternalLink } from 'lucide-react';
 import FolderManager from '../components/folder-manager.jsx';
+import { handleSummarize as streamSummary } from '../components/summary-handler.jsx';
 
 // Notification function
 export const showNotification = (message, type = 'success') => {
@@ -39,6 +40,25 @@ export const createResultCard = (result, engine) => {
     
     // Escape any quotes in the URL for safety
     const safeUrl = resultData.url.replace(/"/g, '&quot;');
+
+    // Merged results list every engine that returned the paper
+    const engineNames = {
+        duckduckgo: 'DuckDuckGo',
+        arxiv: 'arXiv',
+        biorxiv: 'bioRxiv',
+        semantic_scholar: 'Semantic Scholar'
+    };
+    const sourceLinks = Object.entries(resultData.sources || {}).map(([source, sourceUrl]) => `
+        <a
+            href="${(sourceUrl || '#').replace(/"/g, '&quot;')}"
+            target="_blank"
+            rel="noopener noreferrer"
+            class="bg-gray-100 hover:bg-gray-200 text-gray-700 px-2 py-0.5 rounded"
+        >${engineNames[source] || source}</a>
+    `).join('');
+    const summarizable = (resultData.engines || [engine]).some(
+        source => ['arxiv', 'biorxiv', 'semantic_scholar'].includes(source)
+    );
     
     const card = document.createElement('div');
     card.className = 'bg-white p-4 rounded-lg shadow mb-4 search-card';
@@ -67,6 +87,13 @@ export const createResultCard = (result, engine) => {
                 ` : ''}
             </div>
             
+            ${sourceLinks ? `
+                <div class="flex flex-wrap items-center gap-1 text-xs text-gray-500">
+                    <span>Found in:</span>
+                    ${sourceLinks}
+                </div>
+            ` : ''}
+            
             <p class="text-gray-600">${resultData.description}</p>
             
             <div id="summary-${resultId}" class="mt-4">
@@ -90,7 +117,7 @@ export const createResultCard = (result, engine) => {
             </div>
             
             <div class="flex space-x-2 mt-4">
-                ${['arxiv', 'biorxiv', 'semantic_scholar'].includes(engine) ? `
+                ${summarizable ? `
                     <button 
                         onclick="window.handleSummarize('${resultId}')"
                         class="bg-green-500 hover:bg-green-600 text-white px-4 py-2 rounded flex items-center space-x-2"
@@ -192,41 +219,25 @@ export const handleSummarize = async (resultId) => {
             </div>
         `;
 
-        const response = await fetch('/summarize', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                url: resultData.url,
-                title: resultData.title
-            })
-        });
-
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-
-        const data = await response.json();
-        
-        if (data.success) {
+        const renderSummary = (text) => {
             summaryContainer.innerHTML = `
                 <div class="prose">
                     <h4 class="text-lg font-semibold mb-2">AI Summary</h4>
-                    <div class="summary-content whitespace-pre-line text-gray-700 bg-blue-50 p-3 rounded">
-                        ${data.summary}
-                    </div>
+                    <div class="summary-content whitespace-pre-line text-gray-700 bg-blue-50 p-3 rounded"></div>
                 </div>
             `;
-            
-            // Update the stored result data
-            resultData.ai_summary = data.summary;
-            window[`resultData_${resultId}`] = resultData;
-            
-            showNotification('Summary generated successfully');
-        } else {
-            throw new Error(data.error || 'Failed to generate summary');
-        }
+            summaryContainer.querySelector('.summary-content').textContent = text;
+        };
+
+        // Render tokens as they stream in
+        const summary = await streamSummary(resultData, renderSummary);
+        renderSummary(summary);
+        
+        // Update the stored result data
+        resultData.ai_summary = summary;
+        window[`resultData_${resultId}`] = resultData;
+        
+        showNotification('Summary generated successfully');
     } catch (error) {
         console.error('Error generating summary:', error);
         summaryContainer.innerHTML = `
@@ -0,0 +1,89 @@
+# tools/check_html_fixtures.py
+"""Check the HTML extractors against saved pages and time each parsing mode.
+
+Every fixture in tools/html_fixtures/manifest.json is extracted in each mode
+with each available parser (lxml if installed, plus html.parser) and compared
+with its expected output. Exits non-zero on any mismatch.
+
+Example:
+    python tools/check_html_fixtures.py --repeat 200
+
+After saving a new page, write its expected output with --update, which
+records what full mode with html.parser extracts, then review the diff.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_parsing  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'html_fixtures')
+MANIFEST_PATH = os.path.join(FIXTURE_DIR, 'manifest.json')
+
+
+def extract(case, markup, mode):
+    if case['extractor'] == 'duckduckgo':
+        return html_parsing.parse_duckduckgo_results(markup, case.get('limit', 5), mode)
+    if case['extractor'] == 'biorxiv':
+        return html_parsing.parse_biorxiv_results(markup, case.get('limit', 5), mode)
+    return html_parsing.extract_paper_abstract(case['url'], markup, mode)
+
+
+def available_parsers():
+    parsers = ['html.parser']
+    if html_parsing.HTML_PARSER != 'html.parser':
+        parsers.insert(0, html_parsing.HTML_PARSER)
+    return parsers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50, help='extractions per timing sample')
+    parser.add_argument('--update', action='store_true', help='rewrite expected outputs')
+    args = parser.parse_args()
+
+    with open(MANIFEST_PATH) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    default_parser = html_parsing.HTML_PARSER
+    failures = 0
+    for case in manifest:
+        with open(os.path.join(FIXTURE_DIR, case['fixture']), encoding='utf-8') as fixture_file:
+            markup = fixture_file.read()
+
+        if args.update:
+            html_parsing.HTML_PARSER = 'html.parser'
+            case['expected'] = extract(case, markup, 'full')
+            html_parsing.HTML_PARSER = default_parser
+
+        for parser_name in available_parsers():
+            html_parsing.HTML_PARSER = parser_name
+            for mode in html_parsing.PARSE_MODES:
+                if extract(case, markup, mode) != case['expected']:
+                    failures += 1
+                    print(f"MISMATCH {case['fixture']} [{parser_name}/{mode}]")
+                    continue
+
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    extract(case, markup, mode)
+                elapsed = (time.perf_counter() - started) / args.repeat
+                print(f"ok       {case['fixture']:<32} {parser_name:<12} {mode:<9} {elapsed * 1000:8.3f} ms")
+        html_parsing.HTML_PARSER = default_parser
+
+    if args.update:
+        with open(MANIFEST_PATH, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, ensure_ascii=False)
+            manifest_file.write('\n')
+
+    if failures:
+        print(f"\n{failures} mismatches")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# tools/loadtest.py
+"""Simple concurrent load generator for comparing serving modes.
+
+Example:
+    python tools/loadtest.py --url http://localhost:5000/search \
+        --form query="protein folding" --concurrency 100 --requests 500
+
+``{i}`` in a form value is replaced with the request number, e.g.
+``--form query="protein folding {i}"`` to keep every request out of the
+search cache.
+"""
+import argparse
+import statistics
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def send_request(url, body, headers, timeout):
+    started = time.monotonic()
+    try:
+        request = urllib.request.Request(url, data=body, headers=headers)
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            ok = response.status < 400
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return time.monotonic() - started, ok
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', required=True)
+    parser.add_argument('--form', action='append', default=[],
+                        help='key=value form field; sends a POST when given; {i} becomes the request number')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    fields = dict(field.split('=', 1) for field in args.form)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'} if fields else {}
+
+    def request_body(number):
+        if not fields:
+            return None
+        values = {key: value.replace('{i}', str(number)) for key, value in fields.items()}
+        return urllib.parse.urlencode(values).encode('utf-8')
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(
+            lambda number: send_request(args.url, request_body(number), headers, args.timeout),
+            range(args.requests)
+        ))
+    elapsed = time.monotonic() - started
+
+    latencies = [latency for latency, _ in outcomes]
+    failures = sum(1 for _, ok in outcomes if not ok)
+    print(f"requests:    {args.requests} at concurrency {args.concurrency}")
+    print(f"failures:    {failures}")
+    print(f"wall time:   {elapsed:.2f}s")
+    print(f"throughput:  {args.requests / elapsed:.1f} req/s")
+    print(f"latency p50: {percentile(latencies, 50) * 1000:.0f} ms")
+    print(f"latency p95: {percentile(latencies, 95) * 1000:.0f} ms")
+    print(f"latency p99: {percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"latency avg: {statistics.mean(latencies) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()